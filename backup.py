@@ -0,0 +1,283 @@
+"""Online backups of the SQLite database with the sqlite3 backup API.
+
+The database (and its archive of old results, see retention.py) is switched
+to WAL first, and both files are copied from one read transaction: the
+snapshots are consistent with each other and with the archive watermark, and
+in WAL mode a reader never blocks submissions. Pages are copied in batches
+with a pause between them to limit the I/O load of a multi-GB copy. Each
+snapshot is checked, gzip-compressed and rotated.
+
+Usage:
+    python backup.py create --db wida_app.db --dir backups --keep 14
+    python backup.py create --shard-directory shards/directory.db
+    python backup.py list --dir backups
+    python backup.py restore backups/wida_app-20250630T150000.db.gz --db wida_app.db --force
+
+Set WIDA_BACKUP_DIR (and optionally WIDA_BACKUP_INTERVAL_HOURS, default 24)
+to have the app take backups on a schedule.
+"""
+import argparse
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger('wida.backup')
+
+BACKUP_SUFFIX = '.db.gz'
+DEFAULT_PAGES_PER_STEP = 1024
+DEFAULT_STEP_PAUSE = 0.005
+DEFAULT_KEEP = 7
+
+
+def _use_wal(conn: sqlite3.Connection, schema: str):
+    """Switch a database to WAL (it stays in WAL), so a long read does not block writers"""
+    mode = conn.execute(f'PRAGMA {schema}.journal_mode = WAL').fetchone()[0]
+    if mode != 'wal':
+        raise sqlite3.OperationalError(f"Could not switch the {schema} database to WAL (journal_mode is {mode}); "
+                                       "a backup would block writers for the whole copy")
+
+
+def _snapshot(db_path: str, target_paths: Dict[str, str], pages: int, pause: float,
+              progress: Optional[Callable[[int, int], None]] = None,
+              archive_path: Optional[str] = None) -> Dict[str, Dict]:
+    """Copy each schema of db_path ('main', and 'archive' when archive_path is given) to its target path.
+
+    All copies come from one read transaction, so they show the same moment.
+    Returns copy statistics per schema.
+    """
+    source = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        _use_wal(source, 'main')
+        if archive_path:
+            source.execute('ATTACH DATABASE ? AS archive', (archive_path,))
+            _use_wal(source, 'archive')
+        # Every backup step reads from this snapshot; commits made meanwhile go to the WAL
+        # and neither wait for the copy nor make it start over
+        source.execute('BEGIN')
+        for schema in target_paths:
+            source.execute(f'SELECT COUNT(*) FROM {schema}.sqlite_master').fetchone()
+
+        stats = {}
+        for schema, target_path in target_paths.items():
+            steps = [0]
+
+            def on_progress(status, remaining, total):
+                steps[0] += 1
+                if progress:
+                    progress(total - remaining, total)
+                if pause:
+                    time.sleep(pause)  # spread the I/O of a large copy
+
+            target = sqlite3.connect(target_path)
+            try:
+                source.backup(target, pages=pages, progress=on_progress, name=schema)
+            finally:
+                target.close()
+            stats[schema] = {'steps': steps[0]}
+        source.execute('COMMIT')
+    finally:
+        source.close()
+
+    for schema, target_path in target_paths.items():
+        target = sqlite3.connect(target_path)
+        check = target.execute('PRAGMA quick_check').fetchone()[0]
+        stats[schema]['page_count'] = target.execute('PRAGMA page_count').fetchone()[0]
+        target.close()
+        if check != 'ok':
+            raise sqlite3.DatabaseError(f"Snapshot of {schema} database of {db_path} failed quick_check: {check}")
+    return stats
+
+
+def _compress(path: str, target_path: str):
+    partial_path = f"{target_path}.partial"
+    with open(path, 'rb') as src, gzip.open(partial_path, 'wb', compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+    os.replace(partial_path, target_path)
+
+
+def _backup_prefix(db_path: str) -> str:
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+
+def list_backups(backup_dir: str, prefix: str = None) -> List[Dict]:
+    """Backups in backup_dir, newest first"""
+    if not os.path.isdir(backup_dir):
+        return []
+    backups = []
+    for name in os.listdir(backup_dir):
+        if not name.endswith(BACKUP_SUFFIX):
+            continue
+        backup_prefix, _, stamp = name[:-len(BACKUP_SUFFIX)].rpartition('-')
+        if prefix and backup_prefix != prefix:
+            continue
+        path = os.path.join(backup_dir, name)
+        backups.append({'name': name, 'path': path, 'prefix': backup_prefix, 'created': stamp,
+                        'size_bytes': os.path.getsize(path)})
+    backups.sort(key=lambda b: (b['created'], b['name']), reverse=True)
+    return backups
+
+
+def rotate_backups(backup_dir: str, prefix: str, keep: int) -> List[str]:
+    """Delete all but the newest keep backups with this prefix; returns the deleted paths"""
+    removed = []
+    for backup in list_backups(backup_dir, prefix)[keep:]:
+        os.remove(backup['path'])
+        removed.append(backup['path'])
+    return removed
+
+
+def _archive_path(db_path: str) -> Optional[str]:
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute('SELECT archive_path FROM archive_state').fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    conn.close()
+    return row[0] if row and os.path.exists(row[0]) else None
+
+
+def create_backup(db_path: str, backup_dir: str, pages: int = DEFAULT_PAGES_PER_STEP,
+                  pause: float = DEFAULT_STEP_PAUSE, keep: int = DEFAULT_KEEP,
+                  progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+    """Take compressed, rotated snapshots of the database and, if results have been archived, its archive file.
+
+    Both snapshots carry the same timestamp and come from one read transaction.
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+    archive_path = _archive_path(db_path)
+    sources = {'main': db_path}
+    if archive_path:
+        sources['archive'] = archive_path
+
+    started = time.perf_counter()
+    snapshot_paths = {}
+    try:
+        for schema, path in sources.items():
+            fd, snapshot_paths[schema] = tempfile.mkstemp(prefix=f".{_backup_prefix(path)}-", suffix='.db',
+                                                          dir=backup_dir)
+            os.close(fd)
+        stats = _snapshot(db_path, snapshot_paths, pages, pause, progress, archive_path)
+        backup_paths = {}
+        for schema, path in sources.items():
+            backup_paths[schema] = os.path.join(backup_dir, f"{_backup_prefix(path)}-{stamp}{BACKUP_SUFFIX}")
+            _compress(snapshot_paths[schema], backup_paths[schema])
+    finally:
+        for path in snapshot_paths.values():
+            os.remove(path)
+    duration = round(time.perf_counter() - started, 3)
+
+    return [{
+        'db_path': path,
+        'backup_path': backup_paths[schema],
+        'size_bytes': os.path.getsize(backup_paths[schema]),
+        'page_count': stats[schema]['page_count'],
+        'steps': stats[schema]['steps'],
+        'duration_s': duration,
+        'rotated': rotate_backups(backup_dir, _backup_prefix(path), keep)
+    } for schema, path in sources.items()]
+
+
+def restore_backup(backup_path: str, db_path: str, force: bool = False) -> Dict:
+    """Restore a compressed snapshot into db_path.
+
+    The snapshot is written through the backup API, so connections that are
+    still open on db_path see either the old or the restored database.
+    """
+    if os.path.exists(db_path) and not force:
+        raise FileExistsError(f"{db_path} exists; pass force=True to overwrite it")
+
+    fd, snapshot_path = tempfile.mkstemp(suffix='.db', dir=os.path.dirname(os.path.abspath(db_path)))
+    os.close(fd)
+    try:
+        with gzip.open(backup_path, 'rb') as src, open(snapshot_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+
+        snapshot = sqlite3.connect(snapshot_path)
+        check = snapshot.execute('PRAGMA quick_check').fetchone()[0]
+        if check != 'ok':
+            snapshot.close()
+            raise sqlite3.DatabaseError(f"{backup_path} failed quick_check: {check}")
+        target = sqlite3.connect(db_path)
+        snapshot.backup(target)
+        page_count = target.execute('PRAGMA page_count').fetchone()[0]
+        target.close()
+        snapshot.close()
+    finally:
+        os.remove(snapshot_path)
+
+    return {'backup_path': backup_path, 'db_path': db_path, 'page_count': page_count}
+
+
+def shard_database_paths(directory_path: str) -> List[str]:
+    """The shard directory followed by every shard it lists"""
+    from sharding import ShardDirectory
+    return [directory_path] + list(ShardDirectory(directory_path).get_schools().values())
+
+
+def start_backup_scheduler(db_paths: List[str], backup_dir: str, interval_hours: float,
+                           keep: int = DEFAULT_KEEP) -> threading.Thread:
+    """Back up each database every interval_hours from a daemon thread"""
+    def run():
+        while True:
+            time.sleep(interval_hours * 3600)
+            for db_path in db_paths:
+                try:
+                    for report in create_backup(db_path, backup_dir, keep=keep):
+                        logger.info("Backed up %s to %s in %.1fs", report['db_path'], report['backup_path'],
+                                    report['duration_s'])
+                except Exception:
+                    logger.exception("Scheduled backup of %s failed", db_path)
+
+    thread = threading.Thread(target=run, daemon=True, name='wida-backup')
+    thread.start()
+    return thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Online backups of the WIDA SQLite database")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    create = subparsers.add_parser('create', help="Take a compressed snapshot and rotate old ones")
+    create.add_argument('--db', default='wida_app.db')
+    create.add_argument('--shard-directory', help="Back up this directory.db and every shard it lists")
+    create.add_argument('--dir', default=os.environ.get('WIDA_BACKUP_DIR', 'backups'))
+    create.add_argument('--keep', type=int, default=DEFAULT_KEEP, help="Snapshots to keep per database")
+    create.add_argument('--pages', type=int, default=DEFAULT_PAGES_PER_STEP, help="Pages copied per step")
+    create.add_argument('--pause', type=float, default=DEFAULT_STEP_PAUSE, help="Seconds to pause between steps")
+
+    listing = subparsers.add_parser('list', help="List snapshots, newest first")
+    listing.add_argument('--dir', default=os.environ.get('WIDA_BACKUP_DIR', 'backups'))
+
+    restore = subparsers.add_parser('restore', help="Restore a snapshot")
+    restore.add_argument('backup', help="Path to a .db.gz snapshot")
+    restore.add_argument('--db', default='wida_app.db')
+    restore.add_argument('--force', action='store_true', help="Overwrite an existing database")
+
+    args = parser.parse_args()
+
+    if args.command == 'create':
+        db_paths = shard_database_paths(args.shard_directory) if args.shard_directory else [args.db]
+        for db_path in db_paths:
+            for report in create_backup(db_path, args.dir, args.pages, args.pause, args.keep):
+                print(f"{report['db_path']} -> {report['backup_path']} ({report['size_bytes']:,} bytes, "
+                      f"{report['page_count']:,} pages, {report['steps']} steps, {report['duration_s']}s)")
+                for path in report['rotated']:
+                    print(f"  rotated out {path}")
+    elif args.command == 'list':
+        for backup in list_backups(args.dir):
+            print(f"{backup['name']:<50} {backup['size_bytes']:>14,} bytes")
+    else:
+        report = restore_backup(args.backup, args.db, args.force)
+        print(f"Restored {report['backup_path']} into {report['db_path']} ({report['page_count']:,} pages)")
+
+
+if __name__ == '__main__':
+    main()
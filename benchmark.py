@@ -0,0 +1,214 @@
+"""Benchmark harness for EnhancedDatabaseManager on synthetic data.
+
+Usage:
+    python benchmark.py --tier 100k --output bench_100k.json
+    python benchmark.py --tier 100k --output new.json --compare bench_100k.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from enhanced_backend import EnhancedDatabaseManager
+from synthetic_data import SYNTHETIC_PASSWORD, TIERS, generate_database
+
+REPORT_VERSION = 1
+
+# Iterations per operation for each tier. Whole-table scans and bcrypt logins
+# (slow by design) run a tenth as often.
+DEFAULT_ITERATIONS = {'1k': 200, '100k': 50, '10m': 10}
+HEAVY_OPERATIONS = {'get_all_results', 'get_analytics_data', 'authenticate_user'}
+
+
+def percentile(sorted_samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize_latencies(samples: List[float], elapsed: float = None) -> Dict:
+    """Throughput and latency percentiles (in milliseconds) for a list of durations in seconds"""
+    ordered = sorted(samples)
+    total = elapsed if elapsed is not None else sum(ordered)
+    return {
+        'count': len(ordered),
+        'total_s': round(total, 4),
+        'throughput_per_s': round(len(ordered) / total, 2) if total else 0.0,
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0
+    }
+
+
+def _sample_ids(db_path: str, query: str, limit: int, rng: random.Random) -> List[str]:
+    conn = sqlite3.connect(db_path)
+    ids = [row[0] for row in conn.execute(query)]
+    conn.close()
+    ids.sort()
+    return rng.sample(ids, min(limit, len(ids)))
+
+
+def _dataset_counts(db_path: str) -> Dict:
+    conn = sqlite3.connect(db_path)
+    counts = {table: conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+              for table in ('users', 'topics', 'questions', 'test_results')}
+    conn.close()
+    return counts
+
+
+def copy_database(db_path: str, target_path: str):
+    """Copy db_path with SQLite's backup API, so a run's writes leave the original untouched"""
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(target_path)
+    source.backup(target)
+    target.close()
+    source.close()
+
+
+def build_operations(db: EnhancedDatabaseManager, rng: random.Random) -> Dict[str, Callable[[], object]]:
+    """One callable per benchmarked method, each drawing deterministic arguments from rng"""
+    students = _sample_ids(db.db_path, "SELECT unique_id FROM users WHERE role = 'student'", 500, rng)
+    topics = db.get_topics()
+
+    def submit():
+        topic = rng.choice(topics)
+        return db.submit_test_result(rng.choice(students), topic['id'], topic['title'],
+                                     rng.randrange(101), rng.randrange(60, 1800))
+
+    # Ordered so the only writing operation runs last and cannot skew the reads
+    return {
+        'authenticate_user': lambda: db.authenticate_user(rng.choice(students), SYNTHETIC_PASSWORD),
+        'get_student_results': lambda: db.get_student_results(rng.choice(students)),
+        'calculate_student_analytics': lambda: db.calculate_student_analytics(rng.choice(students)),
+        'get_analytics_data': db.get_analytics_data,
+        'get_all_results': db.get_all_results,
+        'submit_test_result': submit
+    }
+
+
+def run_benchmark(db_path: str, tier: str, iterations: int = None, seed: int = 42,
+                  operations: List[str] = None) -> Dict:
+    """Time each operation and return a JSON-serializable report.
+
+    The operations run against a copy of db_path that is removed afterwards, so
+    the timed writes never accumulate and every run starts from the same data.
+    Statements are not timed by the query profiler, which would add its own cost.
+    """
+    iterations = iterations or DEFAULT_ITERATIONS[tier]
+    rng = random.Random(seed)
+    dataset = _dataset_counts(db_path)
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='wida-bench-', dir=os.path.dirname(os.path.abspath(db_path))) as workdir:
+        run_path = os.path.join(workdir, os.path.basename(db_path))
+        copy_database(db_path, run_path)
+        db = EnhancedDatabaseManager(db_path=run_path, use_github=False)
+        db.query_profiler = None
+
+        for name, operation in build_operations(db, rng).items():
+            if operations and name not in operations:
+                continue
+            runs = max(3, iterations // 10) if name in HEAVY_OPERATIONS else iterations
+            operation()  # warm-up: page cache, statement cache, imports
+
+            samples = []
+            started = time.perf_counter()
+            for _ in range(runs):
+                op_started = time.perf_counter()
+                operation()
+                samples.append(time.perf_counter() - op_started)
+            results[name] = summarize_latencies(samples, time.perf_counter() - started)
+            print(f"{name:<28} p50 {results[name]['p50_ms']:>10.3f} ms   p99 {results[name]['p99_ms']:>10.3f} ms   "
+                  f"{results[name]['throughput_per_s']:>10.2f} ops/s")
+        db.close()
+
+    return {
+        'version': REPORT_VERSION,
+        'tier': tier,
+        'seed': seed,
+        'iterations': iterations,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'processor': platform.processor() or platform.machine()
+        },
+        'dataset': dataset,
+        'operations': results
+    }
+
+
+def compare_reports(baseline: Dict, current: Dict, max_regression: float = 0.2) -> List[Dict]:
+    """Return the operations whose p50 or p99 grew by more than max_regression (a fraction)"""
+    if baseline.get('tier') != current.get('tier'):
+        print(f"Warning: comparing tier {current.get('tier')} against baseline tier {baseline.get('tier')}")
+
+    regressions = []
+    for name, stats in current['operations'].items():
+        base = baseline.get('operations', {}).get(name)
+        if not base:
+            continue
+        for metric in ('p50_ms', 'p99_ms'):
+            if base[metric] and stats[metric] > base[metric] * (1 + max_regression):
+                regressions.append({
+                    'operation': name,
+                    'metric': metric,
+                    'baseline': base[metric],
+                    'current': stats[metric],
+                    'change': round(stats[metric] / base[metric] - 1, 3)
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark EnhancedDatabaseManager on synthetic data")
+    parser.add_argument('--tier', choices=list(TIERS), default='1k')
+    parser.add_argument('--db', help="Benchmark database (default: bench_<tier>.db, generated if missing)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--iterations', type=int, help="Iterations per operation")
+    parser.add_argument('--operation', action='append', dest='operations', help="Only run this operation")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--compare', help="Baseline JSON report to compare against")
+    parser.add_argument('--max-regression', type=float, default=0.2,
+                        help="Allowed p50/p99 growth before failing, as a fraction (default: 0.2)")
+    args = parser.parse_args()
+
+    db_path = args.db or f"bench_{args.tier}.db"
+    if not os.path.exists(db_path):
+        print(f"Generating {args.tier} dataset in {db_path}...")
+        generate_database(db_path, args.tier, seed=args.seed)
+
+    report = run_benchmark(db_path, args.tier, iterations=args.iterations, seed=args.seed,
+                           operations=args.operations)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(baseline, report, args.max_regression)
+        for r in regressions:
+            print(f"REGRESSION {r['operation']} {r['metric']}: {r['baseline']} -> {r['current']} ms "
+                  f"(+{r['change'] * 100:.0f}%)")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
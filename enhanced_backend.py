@@ -1,33 +1,289 @@
-import streamlit as st
+import ast
 import sqlite3
 import bcrypt
 import uuid
 import json
 import base64
-import requests
-from datetime import datetime
-from typing import List, Dict, Optional, Tuple
-import pandas as pd
+import gzip
+import html
+import math
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
+from query_profiler import QueryProfiler, connect as profiled_connect
+from write_queue import WriteQueue
+
+def _report_error(message: str):
+    """Show an error in the app; streamlit is imported only when there is one to show"""
+    import streamlit as st
+    st.error(message)
+
+def parse_analytics(value: Optional[str]) -> Dict:
+    """profile_analytics is stored as the repr of a dict; read it back without eval"""
+    try:
+        return ast.literal_eval(value) if value else {}
+    except (ValueError, SyntaxError):
+        return {}
+
+def encode_ndjson(records: List[Dict]) -> bytes:
+    """One JSON document per line"""
+    return b''.join(json.dumps(record, default=str).encode() + b'\n' for record in records)
+
+def decode_ndjson(data: bytes) -> List[Dict]:
+    return [json.loads(line) for line in data.splitlines() if line.strip()]
 
 class GitHubStorage:
     """GitHub-based storage for student data and test results"""
     
-    def __init__(self, repo_owner: str, repo_name: str, token: str = None):
+    # 'files' writes one JSON file per record; 'ndjson' appends to one gzip NDJSON segment per day
+    SYNC_FORMATS = ('files', 'ndjson')
+    SEGMENT_SUFFIX = '.ndjson.gz'
+    # Field that identifies a record of each kind, used to drop duplicates when segments are read
+    RECORD_KEYS = {'test_results': 'id', 'users': 'unique_id'}
+    # Attempts at appending to a segment that another writer updated in between
+    MAX_APPEND_ATTEMPTS = 5
+    # A day's segment rolls over to a new part once it would exceed this many compressed bytes,
+    # which bounds the re-upload of each append and keeps segments within the contents API's 1 MB
+    MAX_SEGMENT_BYTES = 512 * 1024
+    # Segments whose sha and content are kept in memory for the next append
+    MAX_CACHED_SEGMENTS = 16
+    
+    def __init__(self, repo_owner: str, repo_name: str, token: str = None,
+                 api_url: str = "https://api.github.com", sync_format: str = None,
+                 branch: str = "main"):
         self.repo_owner = repo_owner
         self.repo_name = repo_name
-        self.token = token or st.secrets.get("github_token", "")
-        self.base_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}"
+        if not token:
+            import streamlit as st
+            token = st.secrets.get("github_token", "")
+        self.token = token
+        self.branch = branch
+        self.sync_format = sync_format or os.environ.get('WIDA_GITHUB_SYNC_FORMAT', 'files')
+        if self.sync_format not in self.SYNC_FORMATS:
+            raise ValueError(f"Unknown GitHub sync format: {self.sync_format}")
+        self.base_url = f"{api_url.rstrip('/')}/repos/{repo_owner}/{repo_name}"
         self.headers = {
             "Authorization": f"token {self.token}",
             "Accept": "application/vnd.github.v3+json"
         } if self.token else {}
+        # Segments as last written by this process, oldest first: path -> (blob sha, uncompressed NDJSON)
+        self._segments = {}
+        # Part of each day's segment that appends currently go to: (kind, day) -> part
+        self._segment_parts = {}
+        # One lock per day's segment, so appends to different days run in parallel;
+        # _cache_lock only guards the dicts above and is never held across a request
+        self._segment_locks = {}
+        self._cache_lock = threading.Lock()
+    
+    @classmethod
+    def segment_path(cls, kind: str, day: str, part: int = 0) -> str:
+        """Daily segments are {kind}/YYYY-MM-DD.ndjson.gz, rolling over to YYYY-MM-DD.partNNN.ndjson.gz;
+        compacted months are {kind}/YYYY-MM.ndjson.gz"""
+        name = f"{day}.part{part:03d}" if part else day
+        return f"{kind}/{name}{cls.SEGMENT_SUFFIX}"
+    
+    @classmethod
+    def segment_period(cls, name: str) -> str:
+        """The day (YYYY-MM-DD) or month (YYYY-MM) a segment file name covers"""
+        return name[:-len(cls.SEGMENT_SUFFIX)].split('.')[0]
+    
+    def _lock_for(self, kind: str, day: str) -> threading.Lock:
+        with self._cache_lock:
+            return self._segment_locks.setdefault((kind, day), threading.Lock())
+    
+    def _cached_segment(self, path: str) -> Optional[Tuple[Optional[str], bytes]]:
+        with self._cache_lock:
+            return self._segments.get(path)
+    
+    def _cache_segment(self, path: str, segment: Optional[Tuple[str, bytes]]):
+        """Remember (or with None, forget) a segment, keeping the most recently written ones"""
+        with self._cache_lock:
+            self._segments.pop(path, None)
+            if segment is not None:
+                self._segments[path] = segment
+                while len(self._segments) > self.MAX_CACHED_SEGMENTS:
+                    self._segments.pop(next(iter(self._segments)))
+    
+    def _fetch_segment(self, path: str) -> Tuple[Optional[str], bytes]:
+        """Blob sha and uncompressed content of a segment, or (None, b'') if it does not exist yet"""
+        import requests
+        
+        response = requests.get(f"{self.base_url}/contents/{path}", headers=self.headers,
+                                params={"ref": self.branch})
+        if response.status_code == 404:
+            return None, b''
+        response.raise_for_status()
+        info = response.json()
+        if info.get('content'):
+            compressed = base64.b64decode(info['content'])
+        else:
+            # The contents API leaves out files over 1 MB; fetch those through the blob
+            blob = requests.get(f"{self.base_url}/git/blobs/{info['sha']}", headers=self.headers)
+            blob.raise_for_status()
+            compressed = base64.b64decode(blob.json()['content'])
+        return info['sha'], gzip.decompress(compressed)
+    
+    def append_records(self, kind: str, records: List[Dict], day: str = None) -> bool:
+        """Append records to the day's NDJSON segment of kind ('test_results' or 'users')"""
+        if not self.token or not records:
+            return False
+        
+        import requests
+        
+        day = day or datetime.now().strftime('%Y-%m-%d')
+        addition = encode_ndjson(records)
+        with self._lock_for(kind, day):
+            part = self._segment_parts.get((kind, day), 0)
+            attempts = 0
+            while attempts < self.MAX_APPEND_ATTEMPTS:
+                path = self.segment_path(kind, day, part)
+                segment = self._cached_segment(path)
+                sha, existing = segment if segment else self._fetch_segment(path)
+                content = existing + addition
+                compressed = gzip.compress(content)
+                if existing and len(compressed) > self.MAX_SEGMENT_BYTES:
+                    # Full: later appends go to the next part, which may already exist
+                    self._cache_segment(path, None)
+                    part += 1
+                    continue
+                data = {
+                    "message": f"Append {len(records)} {kind} record(s) to {day}",
+                    "content": base64.b64encode(compressed).decode(),
+                    "branch": self.branch
+                }
+                if sha:
+                    data["sha"] = sha
+                
+                response = requests.put(f"{self.base_url}/contents/{path}", headers=self.headers, json=data)
+                if response.status_code in [200, 201]:
+                    self._segment_parts[(kind, day)] = part
+                    self._cache_segment(path, (response.json()['content']['sha'], content))
+                    return True
+                if response.status_code not in [409, 422]:
+                    return False
+                # Someone else appended first: re-read the segment and try again
+                self._cache_segment(path, None)
+                attempts += 1
+        return False
+    
+    def read_segments(self, kind: str) -> List[Dict]:
+        """All records of kind from its NDJSON segments, without duplicates"""
+        import requests
+        
+        response = requests.get(f"{self.base_url}/contents/{kind}", headers=self.headers,
+                                params={"ref": self.branch})
+        if response.status_code != 200:
+            return []
+        
+        key = self.RECORD_KEYS[kind]
+        records = {}
+        for file_info in sorted(response.json(), key=lambda f: f['name']):
+            if file_info['name'].endswith(self.SEGMENT_SUFFIX):
+                _, content = self._fetch_segment(file_info['path'])
+                for record in decode_ndjson(content):
+                    records[record.get(key)] = record
+        return list(records.values())
+    
+    def open_tarball(self, ref: str = None):
+        """Stream a gzip tarball of the whole repository at ref (default: the sync branch)"""
+        import requests
+        
+        response = requests.get(f"{self.base_url}/tarball/{ref or self.branch}", headers=self.headers,
+                                stream=True, timeout=60)
+        response.raise_for_status()
+        return response
+    
+    def compact_segments(self, before_day: str) -> Dict:
+        """Merge the daily segments older than before_day into monthly segments, in one commit.
+        
+        Uses the Git Data API so that any number of segments is rewritten with a
+        single commit instead of one contents API call per file.
+        """
+        import requests
+        
+        ref = requests.get(f"{self.base_url}/git/ref/heads/{self.branch}", headers=self.headers)
+        ref.raise_for_status()
+        head_sha = ref.json()['object']['sha']
+        head = requests.get(f"{self.base_url}/git/commits/{head_sha}", headers=self.headers)
+        head.raise_for_status()
+        tree = requests.get(f"{self.base_url}/git/trees/{head.json()['tree']['sha']}",
+                            headers=self.headers, params={"recursive": "1"})
+        tree.raise_for_status()
+        blobs = {entry['path']: entry['sha'] for entry in tree.json()['tree'] if entry['type'] == 'blob'}
+        
+        # (kind, month) -> daily segment paths to fold into that month
+        groups = {}
+        for path in blobs:
+            kind, _, name = path.partition('/')
+            if kind not in self.RECORD_KEYS or not name.endswith(self.SEGMENT_SUFFIX):
+                continue
+            day = self.segment_period(name)
+            if len(day) == 10 and day < before_day:
+                groups.setdefault((kind, day[:7]), []).append(path)
+        
+        report = {'segments_merged': 0, 'segments_written': 0, 'records': 0, 'commit': None,
+                  'truncated': tree.json().get('truncated', False)}
+        if not groups:
+            return report
+        
+        def read_blob(sha: str) -> bytes:
+            blob = requests.get(f"{self.base_url}/git/blobs/{sha}", headers=self.headers)
+            blob.raise_for_status()
+            return gzip.decompress(base64.b64decode(blob.json()['content']))
+        
+        tree_entries = []
+        for (kind, month), paths in sorted(groups.items()):
+            key = self.RECORD_KEYS[kind]
+            month_path = self.segment_path(kind, month)
+            sources = ([month_path] if month_path in blobs else []) + sorted(paths)
+            records = {}
+            for path in sources:
+                for record in decode_ndjson(read_blob(blobs[path])):
+                    records[record.get(key)] = record
+            
+            blob = requests.post(f"{self.base_url}/git/blobs", headers=self.headers, json={
+                "content": base64.b64encode(gzip.compress(encode_ndjson(list(records.values())), 9)).decode(),
+                "encoding": "base64"
+            })
+            blob.raise_for_status()
+            tree_entries.append({"path": month_path, "mode": "100644", "type": "blob", "sha": blob.json()['sha']})
+            tree_entries.extend({"path": path, "mode": "100644", "type": "blob", "sha": None} for path in paths)
+            report['segments_merged'] += len(paths)
+            report['segments_written'] += 1
+            report['records'] += len(records)
+        
+        new_tree = requests.post(f"{self.base_url}/git/trees", headers=self.headers,
+                                 json={"base_tree": head.json()['tree']['sha'], "tree": tree_entries})
+        new_tree.raise_for_status()
+        commit = requests.post(f"{self.base_url}/git/commits", headers=self.headers, json={
+            "message": f"Compact {report['segments_merged']} daily segments before {before_day}",
+            "tree": new_tree.json()['sha'],
+            "parents": [head_sha]
+        })
+        commit.raise_for_status()
+        # Not forced: if a writer committed meanwhile, the update fails and nothing is lost
+        update = requests.patch(f"{self.base_url}/git/refs/heads/{self.branch}", headers=self.headers,
+                                json={"sha": commit.json()['sha'], "force": False})
+        update.raise_for_status()
+        report['commit'] = commit.json()['sha']
+        return report
     
     def save_test_result(self, result_data: Dict) -> bool:
         """Save test result to GitHub repository"""
         if not self.token:
             return False
+        if self.sync_format == 'ndjson':
+            try:
+                return self.append_records('test_results', [result_data])
+            except Exception as e:
+                _report_error(f"GitHub storage error: {e}")
+                return False
             
         try:
+            import requests
+            
             # Create filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"test_results/{result_data['student_id']}_{timestamp}_{result_data['id']}.json"
@@ -46,15 +302,23 @@ class GitHubStorage:
                                   headers=self.headers, json=data)
             return response.status_code in [200, 201]
         except Exception as e:
-            st.error(f"GitHub storage error: {e}")
+            _report_error(f"GitHub storage error: {e}")
             return False
     
     def save_user_data(self, user_data: Dict) -> bool:
         """Save user registration data to GitHub"""
         if not self.token:
             return False
+        if self.sync_format == 'ndjson':
+            try:
+                return self.append_records('users', [user_data])
+            except Exception as e:
+                _report_error(f"GitHub user storage error: {e}")
+                return False
             
         try:
+            import requests
+            
             filename = f"users/{user_data['unique_id']}.json"
             content = base64.b64encode(json.dumps(user_data, default=str).encode()).decode()
             
@@ -68,7 +332,7 @@ class GitHubStorage:
                                   headers=self.headers, json=data)
             return response.status_code in [200, 201]
         except Exception as e:
-            st.error(f"GitHub user storage error: {e}")
+            _report_error(f"GitHub user storage error: {e}")
             return False
     
     def get_all_results(self) -> List[Dict]:
@@ -77,6 +341,8 @@ class GitHubStorage:
             return []
             
         try:
+            import requests
+            
             response = requests.get(f"{self.base_url}/contents/test_results", 
                                   headers=self.headers)
             if response.status_code != 200:
@@ -91,23 +357,154 @@ class GitHubStorage:
                     if file_response.status_code == 200:
                         results.append(file_response.json())
             
+            if any(f['name'].endswith(self.SEGMENT_SUFFIX) for f in files):
+                results.extend(self.read_segments('test_results'))
             return results
         except Exception as e:
-            st.error(f"GitHub retrieval error: {e}")
+            _report_error(f"GitHub retrieval error: {e}")
             return []
 
 class EnhancedDatabaseManager:
     """Enhanced database manager with GitHub integration and WIDA content"""
     
-    def __init__(self, db_path: str = "wida_app.db", use_github: bool = True):
+    # Number of students kept on each topic/category leaderboard
+    LEADERBOARD_SIZE = 10
+    
+    # password_hash of a student restored from the backup, which has no passwords; it matches
+    # no password, so the account stays locked until a master sets a new one
+    LOCKED_PASSWORD_HASH = b'!'
+    
+    # test_results columns read by queries that may span the archive database
+    RESULT_COLUMNS = 'id, student_id, topic_id, topic_title, score, time_taken, submitted_at, github_synced, seq'
+    
+    def __init__(self, db_path: str = "wida_app.db", use_github: bool = True,
+                 github_storage: GitHubStorage = None, query_profiler: QueryProfiler = None,
+                 use_write_queue: bool = None, archive_path: str = None):
         self.db_path = db_path
+        # Where archive_results() moves old results (WIDA_ARCHIVE_PATH, default <db>_archive.db)
+        self.archive_path = archive_path or os.environ.get('WIDA_ARCHIVE_PATH') or \
+            f"{os.path.splitext(db_path)[0]}_archive.db"
         self.use_github = use_github
-        self.github_storage = GitHubStorage("Unigalactix", "MR.COACH") if use_github else None
+        if github_storage is None and use_github:
+            github_storage = GitHubStorage("Unigalactix", "MR.COACH")
+        self.github_storage = github_storage
+        # Every statement is timed unless profiling is switched off with WIDA_QUERY_PROFILING=0
+        if query_profiler is None and os.environ.get('WIDA_QUERY_PROFILING', '1') != '0':
+            query_profiler = QueryProfiler()
+        self.query_profiler = query_profiler
+        # Called with each new test result after it is committed (see add_result_listener)
+        self.result_listeners = []
         self.init_database()
+        # Optionally funnel every write through one thread that group-commits (WIDA_WRITE_QUEUE=1)
+        if use_write_queue is None:
+            use_write_queue = os.environ.get('WIDA_WRITE_QUEUE') == '1'
+        self.write_queue = None
+        if use_write_queue:
+            self._enable_wal()
+            # The writer's connection is long-lived, so it attaches an archive created later between batches
+            self.write_queue = WriteQueue(self._connect, prepare=self._attach_archive)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the database, timed by the query profiler when enabled"""
+        if self.query_profiler:
+            conn = profiled_connect(self.db_path, self.query_profiler)
+        else:
+            conn = sqlite3.connect(self.db_path)
+        self._attach_archive(conn)
+        return conn
+    
+    def _attach_archive(self, conn: sqlite3.Connection) -> bool:
+        """Attach the archive database as 'archive' once results have been archived"""
+        try:
+            row = conn.execute('SELECT archive_path FROM archive_state').fetchone()
+        except sqlite3.OperationalError:
+            return False  # schema not created yet
+        if row is None:
+            return False
+        if not any(db[1] == 'archive' for db in conn.execute('PRAGMA database_list')):
+            if conn.in_transaction:
+                return False
+            conn.execute('ATTACH DATABASE ? AS archive', (row[0],))
+        return True
+    
+    def _results_source(self, cursor: sqlite3.Cursor, since: str = None, until: str = None,
+                        student_id: str = None, topic_id: str = None) -> Tuple[str, List]:
+        """FROM-clause subquery over test results in [since, until), and its parameters.
+        
+        The archive is only read when results older than its watermark are requested.
+        Raises sqlite3.OperationalError when those are needed but the archive cannot be
+        attached because the connection is inside a transaction.
+        """
+        conditions, params = [], []
+        if student_id is not None:
+            conditions.append('student_id = ?')
+            params.append(student_id)
+        if topic_id is not None:
+            conditions.append('topic_id = ?')
+            params.append(topic_id)
+        if since:
+            conditions.append('submitted_at >= ?')
+            params.append(since)
+        if until:
+            conditions.append('submitted_at < ?')
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        hot = f'SELECT {self.RESULT_COLUMNS} FROM main.test_results {where}'
+        
+        cursor.execute('SELECT archived_before FROM archive_state')
+        state = cursor.fetchone()
+        if state is None or (since and since >= state[0]):
+            return f'({hot})', params
+        if not self._attach_archive(cursor.connection):
+            raise sqlite3.OperationalError("archive database is not attached and cannot be inside a transaction")
+        return f'({hot} UNION ALL SELECT {self.RESULT_COLUMNS} FROM archive.test_results {where})', params * 2
+    
+    @staticmethod
+    def _add_archive_unsynced_index(cursor: sqlite3.Cursor):
+        """Archived rows may not have reached GitHub yet; index those for the reconciler like main's"""
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS archive.idx_archive_results_unsynced ON test_results (submitted_at, id)
+            WHERE github_synced = FALSE
+        ''')
+    
+    @staticmethod
+    def _add_seq_column(cursor: sqlite3.Cursor, schema: str):
+        """Add the seq column to a test_results table created before it existed"""
+        cursor.execute(f'PRAGMA {schema}.table_info(test_results)')
+        columns = [row[1] for row in cursor.fetchall()]
+        if columns and 'seq' not in columns:
+            cursor.execute(f'ALTER TABLE {schema}.test_results ADD COLUMN seq INTEGER')
+            if schema == 'main':
+                # Existing results are numbered in insertion order; archived ones keep no number
+                cursor.execute('UPDATE main.test_results SET seq = rowid')
+    
+    def _enable_wal(self):
+        """Switch the database to WAL so readers never wait on the writer"""
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.close()
+    
+    def _write(self, fn):
+        """Run fn(cursor) in a committed transaction, through the write queue when enabled"""
+        if self.write_queue:
+            return self.write_queue.run(fn)
+        
+        conn = self._connect()
+        try:
+            result = fn(conn.cursor())
+            conn.commit()
+            return result
+        finally:
+            conn.close()
+    
+    def close(self):
+        """Stop the write queue after its pending writes have committed"""
+        if self.write_queue:
+            self.write_queue.close()
     
     def init_database(self):
         """Initialize the database with comprehensive WIDA content"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Users table
@@ -163,20 +560,207 @@ class EnhancedDatabaseManager:
                 time_taken INTEGER,
                 github_synced BOOLEAN DEFAULT FALSE,
                 submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                seq INTEGER,
                 FOREIGN KEY (student_id) REFERENCES users (unique_id),
                 FOREIGN KEY (topic_id) REFERENCES topics (id)
             )
         ''')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_test_results_student ON test_results (student_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_test_results_submitted ON test_results (submitted_at)')
+        
+        # Monotonic result sequence: each new result takes the next value of its counter inside the
+        # write transaction, so results become visible in seq order and pollers can ask for seq > N
+        self._add_seq_column(cursor, 'main')
+        if self._attach_archive(conn):
+            self._add_seq_column(cursor, 'archive')
+            self._add_archive_unsynced_index(cursor)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sequences (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO sequences (name, value)
+            SELECT 'test_results', COALESCE(MAX(seq), 0) FROM main.test_results
+        ''')
+        cursor.executescript('''
+            CREATE TRIGGER IF NOT EXISTS test_results_seq AFTER INSERT ON test_results
+            WHEN new.seq IS NULL BEGIN
+                UPDATE sequences SET value = value + 1 WHERE name = 'test_results';
+                UPDATE test_results SET seq = (SELECT value FROM sequences WHERE name = 'test_results')
+                WHERE rowid = new.rowid;
+            END;
+            CREATE TRIGGER IF NOT EXISTS test_results_seq_copied AFTER INSERT ON test_results
+            WHEN new.seq IS NOT NULL BEGIN
+                UPDATE sequences SET value = MAX(value, new.seq) WHERE name = 'test_results';
+            END;
+        ''')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_test_results_seq ON test_results (seq)')
         
-        # Insert default users
+        # Partial indexes hold only rows still waiting for GitHub, so the reconciler never scans synced ones
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_test_results_unsynced ON test_results (submitted_at, id)
+            WHERE github_synced = FALSE
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_users_unsynced ON users (created_at, unique_id)
+            WHERE github_synced = FALSE
+        ''')
+        
+        # Per-question outcomes of each test, used to calibrate item parameters for adaptive tests
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS question_responses (
+                result_id TEXT NOT NULL,
+                question_id TEXT NOT NULL,
+                student_id TEXT NOT NULL,
+                correct INTEGER NOT NULL CHECK (correct IN (0, 1)),
+                PRIMARY KEY (result_id, question_id)
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_question_responses_question ON question_responses (question_id)')
+        
+        # 3PL item response theory parameters per question (see adaptive_testing.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS item_parameters (
+                question_id TEXT PRIMARY KEY,
+                discrimination REAL NOT NULL,
+                difficulty REAL NOT NULL,
+                guessing REAL NOT NULL,
+                response_count INTEGER NOT NULL,
+                calibrated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Top-N next topics per student, recomputed in batch by recommendations.py
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS topic_recommendations (
+                student_id TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                topic_id TEXT NOT NULL,
+                priority REAL NOT NULL,
+                predicted_score REAL NOT NULL,
+                reason TEXT NOT NULL CHECK (reason IN ('next_step', 'review', 'start_here')),
+                generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (student_id, rank)
+            )
+        ''')
+        
+        # Results older than archived_before live in a separate archive database file
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                archive_path TEXT NOT NULL,
+                archived_before TIMESTAMP NOT NULL,
+                archived_count INTEGER NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Leaderboards: bounded top-K of each student's best score per topic and per category
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS leaderboard_entries (
+                scope TEXT NOT NULL CHECK (scope IN ('topic', 'category')),
+                scope_key TEXT NOT NULL,
+                student_id TEXT NOT NULL,
+                best_score INTEGER NOT NULL,
+                achieved_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (scope, scope_key, student_id)
+            )
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_leaderboard_rank
+            ON leaderboard_entries (scope, scope_key, best_score DESC, achieved_at)
+        ''')
+
+        # Full-text search over the question bank and topic titles, kept in sync by triggers
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE name IN ('questions_fts', 'topics_fts')")
+        search_index_exists = cursor.fetchone()[0] == 2
+        
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+                question_text, option_a, option_b, option_c, option_d, explanation,
+                content='questions', content_rowid='rowid', tokenize='porter unicode61'
+            )
+        ''')
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS topics_fts USING fts5(
+                title, category,
+                content='topics', content_rowid='rowid', tokenize='porter unicode61'
+            )
+        ''')
+        
+        fts_columns = {
+            'questions': ['question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'explanation'],
+            'topics': ['title', 'category']
+        }
+        for table, columns in fts_columns.items():
+            column_list = ', '.join(columns)
+            new_values = ', '.join(f'new.{c}' for c in columns)
+            old_values = ', '.join(f'old.{c}' for c in columns)
+            cursor.executescript(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {table}_fts (rowid, {column_list}) VALUES (new.rowid, {new_values});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {table}_fts ({table}_fts, rowid, {column_list})
+                    VALUES ('delete', old.rowid, {old_values});
+                END;
+                CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE ON {table} BEGIN
+                    INSERT INTO {table}_fts ({table}_fts, rowid, {column_list})
+                    VALUES ('delete', old.rowid, {old_values});
+                    INSERT INTO {table}_fts (rowid, {column_list}) VALUES (new.rowid, {new_values});
+                END;
+            ''')
+        
+        if not search_index_exists:
+            # Weight question text and explanations above the answer options
+            cursor.execute("INSERT INTO questions_fts (questions_fts, rank) VALUES ('rank', 'bm25(5.0, 1.0, 1.0, 1.0, 1.0, 2.0)')")
+            cursor.execute("INSERT INTO topics_fts (topics_fts, rank) VALUES ('rank', 'bm25(5.0, 1.0)')")
+        
+        # Time-series rollups: per-day and per-week score aggregates for trend charts
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS result_rollups (
+                period TEXT NOT NULL CHECK (period IN ('day', 'week')),
+                bucket DATE NOT NULL,
+                scope TEXT NOT NULL CHECK (scope IN ('all', 'topic', 'category', 'student')),
+                scope_key TEXT NOT NULL,
+                test_count INTEGER NOT NULL,
+                score_sum INTEGER NOT NULL,
+                score_sq_sum INTEGER NOT NULL,
+                PRIMARY KEY (period, scope, scope_key, bucket)
+            )
+        ''')
+
+        # Progress of loading users and results from the GitHub backup (see hydration.py)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS hydration_state (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                source TEXT NOT NULL,
+                commit_sha TEXT,
+                status TEXT NOT NULL CHECK (status IN ('running', 'complete')),
+                members_done INTEGER NOT NULL DEFAULT 0,
+                users_loaded INTEGER NOT NULL DEFAULT 0,
+                results_loaded INTEGER NOT NULL DEFAULT 0,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        # Insert default users; the demo students only into a new database, so shards and
+        # databases whose demo students were removed do not get them back on every start
         default_users = [
             ('KRURA', 'master'),
             ('student1', 'student'),
             ('student2', 'student')
         ]
         
+        cursor.execute('SELECT 1 FROM users LIMIT 1')
+        new_database = cursor.fetchone() is None
         for user_id, role in default_users:
-            cursor.execute('INSERT OR IGNORE INTO users (unique_id, role) VALUES (?, ?)', (user_id, role))
+            if role == 'master' or new_database:
+                cursor.execute('INSERT OR IGNORE INTO users (unique_id, role) VALUES (?, ?)', (user_id, role))
         
         # Insert comprehensive WIDA syllabus topics
         wida_topics = [
@@ -296,12 +880,26 @@ class EnhancedDatabaseManager:
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', question_data)
         
+        # Index content that was stored before the search index existed
+        if not search_index_exists:
+            cursor.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+            cursor.execute("INSERT INTO topics_fts (topics_fts) VALUES ('rebuild')")
+        
+        # Backfill leaderboards for databases created before they existed
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM leaderboard_entries)')
+        if not cursor.fetchone()[0]:
+            self._rebuild_leaderboards(cursor)
+        
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM result_rollups)')
+        if not cursor.fetchone()[0]:
+            self._backfill_rollups(cursor)
+        
         conn.commit()
         conn.close()
     
     def authenticate_user(self, unique_id: str, password: str = None) -> Optional[Dict]:
         """Authenticate user and return user data"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT unique_id, role, password_hash FROM users WHERE unique_id = ?', (unique_id,))
@@ -310,68 +908,93 @@ class EnhancedDatabaseManager:
         conn.close()
         
         if user:
-            if user[2] is None or password is None:
+            # Users without a password sign in with their ID alone; a stored hash always needs the password
+            if user[2] == self.LOCKED_PASSWORD_HASH:
+                return None
+            elif user[2] is None:
                 return {'unique_id': user[0], 'role': user[1]}
-            elif bcrypt.checkpw(password.encode('utf-8'), user[2]):
+            elif password is not None and bcrypt.checkpw(password.encode('utf-8'), user[2]):
                 return {'unique_id': user[0], 'role': user[1]}
         
         return None
     
+    def is_password_locked(self, unique_id: str) -> bool:
+        """Whether the user was restored from the backup and needs a master to set a new password"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT password_hash = ? FROM users WHERE unique_id = ?',
+                       (self.LOCKED_PASSWORD_HASH, unique_id))
+        row = cursor.fetchone()
+        
+        conn.close()
+        return bool(row and row[0])
+    
+    def set_password(self, unique_id: str, password: str) -> bool:
+        """Give a student a new password, which also unlocks an account restored from the backup"""
+        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        
+        def write(cursor: sqlite3.Cursor) -> bool:
+            cursor.execute("UPDATE users SET password_hash = ? WHERE unique_id = ? AND role = 'student'",
+                           (password_hash, unique_id))
+            return cursor.rowcount > 0
+        
+        return self._write(write)
+    
     def register_user(self, unique_id: str, password: str = None, first_name: str = None, 
                       last_name: str = None, date_of_birth: str = None) -> bool:
         """Register a new user with detailed profile information and GitHub sync"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        # Hash before queueing the write so bcrypt never runs inside a transaction
+        password_hash = None
+        if password:
+            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
         
-        try:
-            password_hash = None
-            if password:
-                password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-            
-            # Create initial analytics profile
-            initial_analytics = {
-                'total_tests': 0,
-                'average_score': 0.0,
-                'tests_by_category': {},
-                'performance_trend': [],
-                'strengths': [],
-                'areas_for_improvement': [],
-                'study_time_tracking': {},
-                'goals': [],
-                'achievements': []
-            }
-            
+        # Create initial analytics profile
+        initial_analytics = {
+            'total_tests': 0,
+            'average_score': 0.0,
+            'tests_by_category': {},
+            'performance_trend': [],
+            'strengths': [],
+            'areas_for_improvement': [],
+            'study_time_tracking': {},
+            'goals': [],
+            'achievements': []
+        }
+        
+        def write(cursor: sqlite3.Cursor):
             cursor.execute('''
                 INSERT INTO users (unique_id, role, password_hash, first_name, last_name, 
                                  date_of_birth, github_synced, profile_analytics) 
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (unique_id, 'student', password_hash, first_name, last_name, 
                   date_of_birth, False, str(initial_analytics)))
-            
-            # Sync to GitHub if available
-            if self.github_storage:
-                user_data = {
-                    'unique_id': unique_id,
-                    'role': 'student',
-                    'first_name': first_name,
-                    'last_name': last_name,
-                    'date_of_birth': date_of_birth,
-                    'registered_at': datetime.now().isoformat(),
-                    'analytics': initial_analytics
-                }
-                if self.github_storage.save_user_data(user_data):
-                    cursor.execute('UPDATE users SET github_synced = TRUE WHERE unique_id = ?', (unique_id,))
-            
-            conn.commit()
-            conn.close()
-            return True
+        
+        try:
+            self._write(write)
         except sqlite3.IntegrityError:
-            conn.close()
             return False
+        
+        # Sync to GitHub if available, outside the write transaction
+        if self.github_storage:
+            user_data = {
+                'unique_id': unique_id,
+                'role': 'student',
+                'first_name': first_name,
+                'last_name': last_name,
+                'date_of_birth': date_of_birth,
+                'registered_at': datetime.now().isoformat(),
+                'analytics': initial_analytics
+            }
+            if self.github_storage.save_user_data(user_data):
+                self._write(lambda cursor: cursor.execute(
+                    'UPDATE users SET github_synced = TRUE WHERE unique_id = ?', (unique_id,)))
+        
+        return True
     
     def get_user_profile(self, unique_id: str) -> Dict:
         """Get detailed user profile information"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -384,10 +1007,7 @@ class EnhancedDatabaseManager:
         conn.close()
         
         if user:
-            try:
-                analytics = eval(user[5]) if user[5] else {}
-            except:
-                analytics = {}
+            analytics = parse_analytics(user[5])
                 
             return {
                 'unique_id': user[0],
@@ -403,19 +1023,12 @@ class EnhancedDatabaseManager:
     
     def update_user_analytics(self, unique_id: str, analytics_data: Dict) -> bool:
         """Update user analytics (only for master users editing student profiles)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         try:
-            cursor.execute('''
+            self._write(lambda cursor: cursor.execute('''
                 UPDATE users SET profile_analytics = ? WHERE unique_id = ?
-            ''', (str(analytics_data), unique_id))
-            
-            conn.commit()
-            conn.close()
+            ''', (str(analytics_data), unique_id)))
             return True
         except Exception:
-            conn.close()
             return False
     
     def calculate_student_analytics(self, unique_id: str) -> Dict:
@@ -429,7 +1042,8 @@ class EnhancedDatabaseManager:
                 'tests_by_category': {},
                 'performance_trend': [],
                 'strengths': [],
-                'areas_for_improvement': []
+                'areas_for_improvement': [],
+                'weekly_trend': []
             }
         
         # Calculate analytics
@@ -471,18 +1085,91 @@ class EnhancedDatabaseManager:
             'strengths': strengths,
             'areas_for_improvement': areas_for_improvement,
             'category_averages': {cat: round(sum(scores)/len(scores), 2) 
-                                for cat, scores in category_scores.items()}
+                                for cat, scores in category_scores.items()},
+            'weekly_trend': self.get_score_trend('student', unique_id, 'week')
         }
     
+    def get_report_card_data(self, since: str = None, until: str = None) -> List[Dict]:
+        """Profile, per-category results and weekly trend of every student for results in [since, until).
+        
+        Set-based queries cover all students instead of one analytics pass per student. The
+        weekly trend uses the rollups for whole weeks and clips the first and last weeks to the
+        period, so a week straddling since or until only counts results inside it.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT unique_id, first_name, last_name, date_of_birth, created_at, profile_analytics
+            FROM users WHERE role = 'student' ORDER BY unique_id
+        ''')
+        students = cursor.fetchall()
+        
+        source, params = self._results_source(cursor, since, until)
+        cursor.execute(f'''
+            SELECT tr.student_id, COALESCE(t.category, 'General'), COUNT(*), SUM(tr.score)
+            FROM {source} tr
+            LEFT JOIN topics t ON tr.topic_id = t.id
+            GROUP BY tr.student_id, COALESCE(t.category, 'General')
+        ''', params)
+        categories = {}
+        for student_id, category, test_count, score_sum in cursor.fetchall():
+            categories.setdefault(student_id, {})[category] = (test_count, score_sum)
+        
+        # Week buckets are labelled by their Monday. Whole weeks inside [since, until) come from
+        # the rollups; the partial weeks at either end are clipped from the raw results.
+        first_week, last_week = '', '9999-12-31'  # a date, not '9999': bucket has numeric affinity
+        if since:
+            day = datetime.strptime(since[:10], '%Y-%m-%d').date()
+            first_week = (day - timedelta(days=day.weekday())).isoformat()
+            if since > first_week:
+                first_week = (day + timedelta(days=7 - day.weekday())).isoformat()
+        if until:
+            day = datetime.strptime(until[:10], '%Y-%m-%d').date()
+            last_week = (day - timedelta(days=day.weekday())).isoformat()
+        cursor.execute('''
+            SELECT scope_key, bucket, test_count, score_sum, score_sq_sum
+            FROM result_rollups
+            WHERE period = 'week' AND scope = 'student' AND bucket >= ? AND bucket < ?
+        ''', (first_week, last_week))
+        weekly = {}
+        for student_id, *row in cursor.fetchall():
+            weekly.setdefault(student_id, []).append(tuple(row))
+        
+        cursor.execute(f'''
+            SELECT student_id, date(submitted_at, 'weekday 0', '-6 days'),
+                   COUNT(*), SUM(score), SUM(score * score)
+            FROM {source}
+            WHERE submitted_at < ? OR submitted_at >= ?
+            GROUP BY 1, 2
+        ''', params + [first_week, last_week])
+        for student_id, *row in cursor.fetchall():
+            weekly.setdefault(student_id, []).append(tuple(row))
+        for rows in weekly.values():
+            rows.sort()
+        
+        conn.close()
+        return [{
+            'unique_id': s[0],
+            'first_name': s[1],
+            'last_name': s[2],
+            'date_of_birth': s[3],
+            'created_at': s[4],
+            'analytics': parse_analytics(s[5]),
+            'categories': categories.get(s[0], {}),
+            'weekly_trend': self.trend_from_rollups(weekly.get(s[0], []))
+        } for s in students]
+    
     def get_all_users(self) -> List[Dict]:
         """Get all users with profile information"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
-            SELECT unique_id, role, first_name, last_name, date_of_birth, created_at 
+            SELECT unique_id, role, first_name, last_name, date_of_birth, created_at,
+                   COALESCE(password_hash = ?, FALSE)
             FROM users ORDER BY role, unique_id
-        ''')
+        ''', (self.LOCKED_PASSWORD_HASH,))
         users = cursor.fetchall()
         
         conn.close()
@@ -492,29 +1179,102 @@ class EnhancedDatabaseManager:
             'first_name': user[2],
             'last_name': user[3],
             'date_of_birth': user[4],
-            'created_at': user[5]
+            'created_at': user[5],
+            'password_locked': bool(user[6])
         } for user in users]
     
-    def remove_user(self, unique_id: str) -> bool:
-        """Remove a user (except master users)"""
-        conn = sqlite3.connect(self.db_path)
+    def get_student_ids(self) -> List[str]:
+        """Get the ids of all students"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('SELECT role FROM users WHERE unique_id = ?', (unique_id,))
-        user = cursor.fetchone()
+        cursor.execute("SELECT unique_id FROM users WHERE role = 'student' ORDER BY unique_id")
+        student_ids = [row[0] for row in cursor.fetchall()]
         
-        if user and user[0] == 'master':
-            conn.close()
-            return False
+        conn.close()
+        return student_ids
+    
+    def get_mastery_rows(self) -> List[Tuple[str, str, int, int]]:
+        """Get (student_id, topic_id, score_sum, attempts) for every student and topic with results"""
+        return self.get_mastery_snapshot()[0]
+    
+    def get_mastery_snapshot(self) -> Tuple[List[Tuple[str, str, int, int]], int]:
+        """Get the mastery rows and the result sequence number they include, read in one transaction"""
+        conn = self._connect()
+        cursor = conn.cursor()
         
-        cursor.execute('DELETE FROM users WHERE unique_id = ?', (unique_id,))
+        source, params = self._results_source(cursor)
+        cursor.execute('BEGIN')
+        cursor.execute("SELECT value FROM sequences WHERE name = 'test_results'")
+        sequence = cursor.fetchone()[0]
+        cursor.execute(f'''
+            SELECT student_id, topic_id, SUM(score), COUNT(*)
+            FROM {source} tr
+            GROUP BY student_id, topic_id
+        ''', params)
+        rows = cursor.fetchall()
         conn.commit()
+        
         conn.close()
-        return True
+        return rows, sequence
+    
+    def save_recommendations(self, rows: List[Tuple[str, int, str, float, float, str]]):
+        """Replace all recommendations with (student_id, rank, topic_id, priority, predicted_score, reason) rows"""
+        def write(cursor: sqlite3.Cursor):
+            cursor.execute('DELETE FROM topic_recommendations')
+            cursor.executemany('''
+                INSERT INTO topic_recommendations (student_id, rank, topic_id, priority, predicted_score, reason)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', rows)
+        
+        self._write(write)
+    
+    def get_recommendations(self, student_id: str) -> List[Dict]:
+        """Get the stored next-topic recommendations for a student, best first"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT r.topic_id, t.title, t.category, t.difficulty_level, r.predicted_score, r.reason
+            FROM topic_recommendations r
+            JOIN topics t ON t.id = r.topic_id
+            WHERE r.student_id = ?
+            ORDER BY r.rank
+        ''', (student_id,))
+        rows = cursor.fetchall()
+        
+        conn.close()
+        return [{
+            'id': r[0],
+            'title': r[1],
+            'category': r[2],
+            'difficulty': r[3],
+            'predicted_score': r[4],
+            'reason': r[5]
+        } for r in rows]
+    
+    def remove_user(self, unique_id: str) -> bool:
+        """Remove a user (except master users)"""
+        def write(cursor: sqlite3.Cursor) -> bool:
+            cursor.execute('SELECT role FROM users WHERE unique_id = ?', (unique_id,))
+            user = cursor.fetchone()
+            
+            if user and user[0] == 'master':
+                return False
+            
+            cursor.execute('DELETE FROM users WHERE unique_id = ?', (unique_id,))
+            
+            # Refill the boards the student was on from the remaining students
+            cursor.execute('SELECT EXISTS (SELECT 1 FROM leaderboard_entries WHERE student_id = ?)', (unique_id,))
+            if cursor.fetchone()[0]:
+                self._rebuild_leaderboards(cursor)
+            return True
+        
+        return self._write(write)
     
     def get_topics(self) -> List[Dict]:
         """Get all syllabus topics with categories"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -533,7 +1293,7 @@ class EnhancedDatabaseManager:
     
     def get_topics_by_category(self, category: str) -> List[Dict]:
         """Get topics filtered by category"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -550,23 +1310,19 @@ class EnhancedDatabaseManager:
             'difficulty': topic[3]
         } for topic in topics]
     
-    def add_topic(self, title: str, category: str = "Custom", difficulty: str = "Intermediate") -> bool:
+    def add_topic(self, title: str, category: str = "Custom", difficulty: str = "Intermediate",
+                  topic_id: str = None) -> bool:
         """Add a new topic"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        topic_id = f"custom-{uuid.uuid4().hex[:8]}"
-        cursor.execute('''
+        topic_id = topic_id or f"custom-{uuid.uuid4().hex[:8]}"
+        self._write(lambda cursor: cursor.execute('''
             INSERT INTO topics (id, title, category, difficulty_level) 
             VALUES (?, ?, ?, ?)
-        ''', (topic_id, title, category, difficulty))
-        conn.commit()
-        conn.close()
+        ''', (topic_id, title, category, difficulty)))
         return True
     
     def get_questions_for_topic(self, topic_id: str) -> List[Dict]:
         """Get all questions for a specific topic"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -584,19 +1340,166 @@ class EnhancedDatabaseManager:
             'explanation': q[7] or "No explanation available."
         } for q in questions]
     
-    def submit_test_result(self, student_id: str, topic_id: str, topic_title: str, 
-                          score: int, time_taken: int = None) -> str:
-        """Submit test result with GitHub sync"""
-        conn = sqlite3.connect(self.db_path)
+    def get_item_parameters(self, question_ids: List[str]) -> Dict[str, Dict]:
+        """Get calibrated 3PL parameters for the given questions; uncalibrated ones are left out"""
+        if not question_ids:
+            return {}
+        conn = self._connect()
         cursor = conn.cursor()
         
-        result_id = f"result-{uuid.uuid4().hex[:8]}"
+        placeholders = ','.join('?' * len(question_ids))
+        cursor.execute(f'''
+            SELECT question_id, discrimination, difficulty, guessing, response_count
+            FROM item_parameters WHERE question_id IN ({placeholders})
+        ''', list(question_ids))
+        rows = cursor.fetchall()
+        
+        conn.close()
+        return {r[0]: {
+            'discrimination': r[1],
+            'difficulty': r[2],
+            'guessing': r[3],
+            'response_count': r[4]
+        } for r in rows}
+    
+    def get_response_data(self) -> List[Tuple[str, str, int]]:
+        """Get every stored (result_id, question_id, correct) response for calibration"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT result_id, question_id, correct FROM question_responses')
+        rows = cursor.fetchall()
+        
+        conn.close()
+        return rows
+    
+    def save_item_parameters(self, parameters: List[Tuple[str, float, float, float, int]]):
+        """Replace item parameters with (question_id, discrimination, difficulty, guessing, response_count) rows"""
+        self._write(lambda cursor: cursor.executemany('''
+            INSERT INTO item_parameters (question_id, discrimination, difficulty, guessing, response_count)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (question_id) DO UPDATE SET
+                discrimination = excluded.discrimination, difficulty = excluded.difficulty,
+                guessing = excluded.guessing, response_count = excluded.response_count,
+                calibrated_at = CURRENT_TIMESTAMP
+        ''', parameters))
+    
+    def search_content(self, query: str, limit: int = 20) -> Dict[str, List[Dict]]:
+        """Full-text search over topics and questions, as {'topics': [...], 'questions': [...]}.
+        
+        Each term is matched as a prefix, and all terms must match. Each list holds up to
+        limit matches, best first; they are ranked separately because bm25 scores from
+        different indexes are not comparable. Snippets are HTML-escaped with the matched
+        terms wrapped in <mark> tags.
+        """
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return {'topics': [], 'questions': []}
+        match_expression = ' '.join(f'"{term}"*' for term in terms)
+        
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT t.id, t.title, t.category, t.difficulty_level,
+                   snippet(topics_fts, -1, char(2), char(3), '…', 12), topics_fts.rank
+            FROM topics_fts
+            JOIN topics t ON t.rowid = topics_fts.rowid
+            WHERE topics_fts MATCH ?
+            ORDER BY topics_fts.rank
+            LIMIT ?
+        ''', (match_expression, limit))
+        topic_matches = cursor.fetchall()
+        
         cursor.execute('''
-            INSERT INTO test_results (id, student_id, topic_id, topic_title, score, time_taken, github_synced) 
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (result_id, student_id, topic_id, topic_title, score, time_taken, False))
+            SELECT q.id, q.topic_id, t.title, q.question_text, q.option_a, q.option_b, q.option_c, q.option_d,
+                   q.correct_answer, q.explanation,
+                   snippet(questions_fts, -1, char(2), char(3), '…', 16), questions_fts.rank
+            FROM questions_fts
+            JOIN questions q ON q.rowid = questions_fts.rowid
+            LEFT JOIN topics t ON q.topic_id = t.id
+            WHERE questions_fts MATCH ?
+            ORDER BY questions_fts.rank
+            LIMIT ?
+        ''', (match_expression, limit))
+        question_matches = cursor.fetchall()
+        
+        conn.close()
+        
+        def highlight(snippet: str) -> str:
+            return html.escape(snippet).replace('\x02', '<mark>').replace('\x03', '</mark>')
+        
+        topics = [{
+            'id': t[0],
+            'title': t[1],
+            'category': t[2],
+            'difficulty': t[3],
+            'snippet': highlight(t[4]),
+            'rank': t[5]
+        } for t in topic_matches]
+        questions = [{
+            'id': q[0],
+            'topic_id': q[1],
+            'topic_title': q[2],
+            'question_text': q[3],
+            'options': [q[4], q[5], q[6], q[7]],
+            'correct_answer': q[8],
+            'explanation': q[9] or "No explanation available.",
+            'snippet': highlight(q[10]),
+            'rank': q[11]
+        } for q in question_matches]
+        
+        return {'topics': topics, 'questions': questions}
+    
+    def rebuild_search_index(self):
+        """Rebuild the full-text index from the questions and topics tables"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')")
+        cursor.execute("INSERT INTO topics_fts (topics_fts) VALUES ('rebuild')")
+        
+        conn.commit()
+        conn.close()
+    
+    def submit_test_result(self, student_id: str, topic_id: str, topic_title: str, 
+                          score: int, time_taken: int = None,
+                          responses: List[Tuple[str, bool]] = None) -> str:
+        """Submit test result with GitHub sync; responses are (question_id, correct) pairs"""
+        result_id = f"result-{uuid.uuid4().hex[:8]}"
+        
+        def write(cursor: sqlite3.Cursor):
+            cursor.execute('''
+                INSERT INTO test_results (id, student_id, topic_id, topic_title, score, time_taken, github_synced) 
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (result_id, student_id, topic_id, topic_title, score, time_taken, False))
+            if responses:
+                cursor.executemany('''
+                    INSERT OR IGNORE INTO question_responses (result_id, question_id, student_id, correct)
+                    VALUES (?, ?, ?, ?)
+                ''', [(result_id, question_id, student_id, int(bool(correct))) for question_id, correct in responses])
+            
+            cursor.execute('''
+                SELECT tr.submitted_at, t.category, tr.seq FROM test_results tr
+                LEFT JOIN topics t ON tr.topic_id = t.id
+                WHERE tr.id = ?
+            ''', (result_id,))
+            submitted_at, category, seq = cursor.fetchone()
+            self._update_leaderboards(cursor, student_id, topic_id, category, score, submitted_at)
+            self._update_rollups(cursor, student_id, topic_id, category, score, submitted_at)
+            return submitted_at, category, seq
         
-        # Sync to GitHub if available
+        submitted_at, category, seq = self._write(write)
+        
+        result = {'id': result_id, 'student_id': student_id, 'topic_id': topic_id, 'category': category,
+                  'score': score, 'submitted_at': submitted_at, 'seq': seq}
+        for listener in self.result_listeners:
+            try:
+                listener(result)
+            except Exception as e:
+                _report_error(f"Error updating in-memory views: {e}")
+        
+        # Sync to GitHub if available, outside the write transaction
         if self.github_storage:
             result_data = {
                 'id': result_id,
@@ -608,22 +1511,209 @@ class EnhancedDatabaseManager:
                 'submitted_at': datetime.now().isoformat()
             }
             if self.github_storage.save_test_result(result_data):
-                cursor.execute('UPDATE test_results SET github_synced = TRUE WHERE id = ?', (result_id,))
+                self._write(lambda cursor: cursor.execute(
+                    'UPDATE test_results SET github_synced = TRUE WHERE id = ?', (result_id,)))
+        
+        return result_id
+    
+    def add_result_listener(self, listener: Callable[[Dict], None]):
+        """Call listener with each new test result (id, student_id, topic_id, category, score, submitted_at, seq)"""
+        self.result_listeners.append(listener)
+    
+    def _update_leaderboards(self, cursor: sqlite3.Cursor, student_id: str, topic_id: str,
+                             category: Optional[str], score: int, submitted_at: str):
+        """Record a new score on the topic and category leaderboards, keeping each board at top-K"""
+        boards = [('topic', topic_id)]
+        if category:
+            boards.append(('category', category))
+        
+        for scope, scope_key in boards:
+            # Only a better score replaces a student's entry, so ties keep the earlier time
+            cursor.execute('''
+                INSERT INTO leaderboard_entries (scope, scope_key, student_id, best_score, achieved_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (scope, scope_key, student_id) DO UPDATE
+                SET best_score = excluded.best_score, achieved_at = excluded.achieved_at
+                WHERE excluded.best_score > leaderboard_entries.best_score
+            ''', (scope, scope_key, student_id, score, submitted_at))
+            
+            cursor.execute('''
+                DELETE FROM leaderboard_entries
+                WHERE scope = ? AND scope_key = ? AND student_id NOT IN (
+                    SELECT student_id FROM leaderboard_entries
+                    WHERE scope = ? AND scope_key = ?
+                    ORDER BY best_score DESC, achieved_at
+                    LIMIT ?
+                )
+            ''', (scope, scope_key, scope, scope_key, self.LEADERBOARD_SIZE))
+    
+    def _rebuild_leaderboards(self, cursor: sqlite3.Cursor):
+        """Recompute every leaderboard from the stored test results"""
+        source, _ = self._results_source(cursor)
+        cursor.execute('DELETE FROM leaderboard_entries')
+        
+        for scope, scope_key in (('topic', 'tr.topic_id'), ('category', 't.category')):
+            cursor.execute(f'''
+                INSERT INTO leaderboard_entries (scope, scope_key, student_id, best_score, achieved_at)
+                SELECT ?, scope_key, student_id, best_score, achieved_at FROM (
+                    SELECT scope_key, student_id, best_score, achieved_at,
+                           ROW_NUMBER() OVER (PARTITION BY scope_key
+                                              ORDER BY best_score DESC, achieved_at) AS board_rank
+                    FROM (
+                        SELECT {scope_key} AS scope_key, tr.student_id,
+                               tr.score AS best_score, tr.submitted_at AS achieved_at,
+                               ROW_NUMBER() OVER (PARTITION BY {scope_key}, tr.student_id
+                                                  ORDER BY tr.score DESC, tr.submitted_at) AS student_rank
+                        FROM {source} tr
+                        JOIN topics t ON tr.topic_id = t.id
+                        JOIN users u ON tr.student_id = u.unique_id
+                    )
+                    WHERE student_rank = 1
+                )
+                WHERE board_rank <= ?
+            ''', (scope, self.LEADERBOARD_SIZE))
+    
+    def rebuild_leaderboards(self):
+        """Recompute all leaderboards, e.g. after bulk-loading results"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        self._rebuild_leaderboards(cursor)
         
         conn.commit()
         conn.close()
-        return result_id
     
-    def get_student_results(self, student_id: str) -> List[Dict]:
-        """Get all test results for a student"""
-        conn = sqlite3.connect(self.db_path)
+    def get_leaderboard(self, scope: str, scope_key: str, limit: int = None) -> List[Dict]:
+        """Get the ranked leaderboard for a topic id or category name"""
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
+            SELECT le.student_id, u.first_name, le.best_score, le.achieved_at
+            FROM leaderboard_entries le
+            LEFT JOIN users u ON le.student_id = u.unique_id
+            WHERE le.scope = ? AND le.scope_key = ?
+            ORDER BY le.best_score DESC, le.achieved_at
+            LIMIT ?
+        ''', (scope, scope_key, limit or self.LEADERBOARD_SIZE))
+        entries = cursor.fetchall()
+        
+        conn.close()
+        return [{
+            'rank': rank,
+            'student_id': e[0],
+            'first_name': e[1],
+            'best_score': e[2],
+            'achieved_at': e[3]
+        } for rank, e in enumerate(entries, start=1)]
+    
+    def _update_rollups(self, cursor: sqlite3.Cursor, student_id: str, topic_id: str,
+                        category: Optional[str], score: int, submitted_at: str):
+        """Add a new score to the daily and weekly rollups it belongs to"""
+        day = datetime.strptime(submitted_at[:10], '%Y-%m-%d').date()
+        buckets = [('day', day.isoformat()),
+                   ('week', (day - timedelta(days=day.weekday())).isoformat())]
+        
+        scopes = [('all', ''), ('topic', topic_id), ('student', student_id)]
+        if category:
+            scopes.append(('category', category))
+        
+        cursor.executemany('''
+            INSERT INTO result_rollups (period, bucket, scope, scope_key, test_count, score_sum, score_sq_sum)
+            VALUES (?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT (period, scope, scope_key, bucket) DO UPDATE
+            SET test_count = test_count + 1,
+                score_sum = score_sum + excluded.score_sum,
+                score_sq_sum = score_sq_sum + excluded.score_sq_sum
+        ''', [(period, bucket, scope, scope_key, score, score * score)
+              for period, bucket in buckets for scope, scope_key in scopes])
+    
+    def _backfill_rollups(self, cursor: sqlite3.Cursor):
+        """Recompute every rollup row from the stored test results"""
+        source, _ = self._results_source(cursor)
+        cursor.execute('DELETE FROM result_rollups')
+        
+        bucket_expressions = {
+            'day': "date(tr.submitted_at)",
+            # Weeks start on Monday, matching _update_rollups
+            'week': "date(tr.submitted_at, 'weekday 0', '-6 days')"
+        }
+        scope_expressions = {
+            'all': "''",
+            'topic': 'tr.topic_id',
+            'category': 't.category',
+            'student': 'tr.student_id'
+        }
+        
+        for period, bucket in bucket_expressions.items():
+            for scope, scope_key in scope_expressions.items():
+                cursor.execute(f'''
+                    INSERT INTO result_rollups (period, bucket, scope, scope_key, test_count, score_sum, score_sq_sum)
+                    SELECT ?, {bucket}, ?, {scope_key}, COUNT(*), SUM(tr.score), SUM(tr.score * tr.score)
+                    FROM {source} tr
+                    LEFT JOIN topics t ON tr.topic_id = t.id
+                    WHERE {scope_key} IS NOT NULL
+                    GROUP BY {bucket}, {scope_key}
+                ''', (period, scope))
+    
+    def backfill_rollups(self):
+        """Rebuild the daily and weekly rollups from all existing test results"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        self._backfill_rollups(cursor)
+        
+        conn.commit()
+        conn.close()
+    
+    def get_score_trend(self, scope: str = 'all', scope_key: str = '', period: str = 'week',
+                        since: str = None) -> List[Dict]:
+        """Get count, average and spread of scores per day or week from the rollup table"""
+        return self.trend_from_rollups(self.get_rollup_rows(scope, scope_key, period, since))
+    
+    def get_rollup_rows(self, scope: str = 'all', scope_key: str = '', period: str = 'week',
+                        since: str = None) -> List[Tuple]:
+        """Get raw (bucket, test_count, score_sum, score_sq_sum) rollup rows, oldest first"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT bucket, test_count, score_sum, score_sq_sum
+            FROM result_rollups
+            WHERE period = ? AND scope = ? AND scope_key = ? AND bucket >= ?
+            ORDER BY bucket
+        ''', (period, scope, scope_key, since or ''))
+        rows = cursor.fetchall()
+        
+        conn.close()
+        return rows
+    
+    @staticmethod
+    def trend_from_rollups(rows: List[Tuple]) -> List[Dict]:
+        """Turn raw rollup rows into count, average and standard deviation per bucket"""
+        trend = []
+        for bucket, test_count, score_sum, score_sq_sum in rows:
+            mean = score_sum / test_count
+            variance = max(score_sq_sum / test_count - mean * mean, 0.0)
+            trend.append({
+                'bucket': bucket,
+                'test_count': test_count,
+                'avg_score': round(mean, 2),
+                'std_dev': round(math.sqrt(variance), 2)
+            })
+        return trend
+    
+    def get_student_results(self, student_id: str, since: str = None, until: str = None) -> List[Dict]:
+        """Get a student's test results, optionally only those submitted in [since, until)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        source, params = self._results_source(cursor, since, until, student_id)
+        cursor.execute(f'''
             SELECT id, topic_id, topic_title, score, time_taken, submitted_at, github_synced
-            FROM test_results WHERE student_id = ? 
+            FROM {source}
             ORDER BY submitted_at DESC
-        ''', (student_id,))
+        ''', params)
         results = cursor.fetchall()
         
         conn.close()
@@ -637,16 +1727,17 @@ class EnhancedDatabaseManager:
             'github_synced': bool(r[6])
         } for r in results]
     
-    def get_all_results(self) -> List[Dict]:
-        """Get all test results"""
-        conn = sqlite3.connect(self.db_path)
+    def get_all_results(self, since: str = None, until: str = None) -> List[Dict]:
+        """Get all test results, optionally only those submitted in [since, until)"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('''
+        source, params = self._results_source(cursor, since, until)
+        cursor.execute(f'''
             SELECT id, student_id, topic_id, topic_title, score, time_taken, submitted_at, github_synced
-            FROM test_results 
+            FROM {source}
             ORDER BY submitted_at DESC
-        ''')
+        ''', params)
         results = cursor.fetchall()
         
         conn.close()
@@ -661,9 +1752,32 @@ class EnhancedDatabaseManager:
             'github_synced': bool(r[7])
         } for r in results]
     
+    def iter_results(self, student_id: str = None, topic_id: str = None, since: str = None, until: str = None,
+                     batch_size: int = 1000) -> Iterator[Tuple]:
+        """Yield (id, student_id, topic_id, topic_title, category, score, time_taken, submitted_at) rows
+        matching the filters in submission order, fetching batch_size rows at a time"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            source, params = self._results_source(cursor, since, until, student_id, topic_id)
+            cursor.execute(f'''
+                SELECT tr.id, tr.student_id, tr.topic_id, tr.topic_title, t.category, tr.score,
+                       tr.time_taken, tr.submitted_at
+                FROM {source} tr
+                LEFT JOIN topics t ON tr.topic_id = t.id
+                ORDER BY tr.submitted_at, tr.id
+            ''', params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+    
     def get_result_by_id(self, result_id: str) -> Optional[Dict]:
         """Get a specific test result by ID"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -672,6 +1786,10 @@ class EnhancedDatabaseManager:
         ''', (result_id,))
         result = cursor.fetchone()
         
+        if result is None and self._attach_archive(conn):
+            cursor.execute(f'SELECT {self.RESULT_COLUMNS} FROM archive.test_results WHERE id = ?', (result_id,))
+            result = cursor.fetchone()
+        
         conn.close()
         
         if result:
@@ -687,35 +1805,349 @@ class EnhancedDatabaseManager:
             }
         return None
     
-    def get_analytics_data(self) -> Dict:
-        """Get comprehensive analytics data"""
-        conn = sqlite3.connect(self.db_path)
+    def get_latest_result_id(self, student_id: str) -> Optional[str]:
+        """Get the id of the most recently submitted result for a student"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT id FROM test_results WHERE student_id = ?
+            ORDER BY rowid DESC LIMIT 1
+        ''', (student_id,))
+        result = cursor.fetchone()
+
+        conn.close()
+        return result[0] if result else None
+
+    def get_result_sequence(self) -> int:
+        """Get a number that increases whenever any new test result is stored"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT value FROM sequences WHERE name = 'test_results'")
+        sequence = cursor.fetchone()[0]
+
+        conn.close()
+        return sequence
+
+    def get_results_since(self, after_seq: int = 0, limit: int = 500) -> List[Dict]:
+        """Get up to limit results with seq greater than after_seq, in seq order"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        # New results are always in the hot table, so the archive is never read
+        cursor.execute('''
+            SELECT tr.seq, tr.id, tr.student_id, tr.topic_id, tr.topic_title, t.category, tr.score,
+                   tr.time_taken, tr.submitted_at
+            FROM main.test_results tr
+            LEFT JOIN topics t ON tr.topic_id = t.id
+            WHERE tr.seq > ?
+            ORDER BY tr.seq
+            LIMIT ?
+        ''', (after_seq, limit))
+        results = cursor.fetchall()
+        
+        conn.close()
+        return [{
+            'seq': r[0],
+            'id': r[1],
+            'student_id': r[2],
+            'topic_id': r[3],
+            'topic_title': r[4],
+            'category': r[5],
+            'score': r[6],
+            'time_taken': r[7],
+            'submitted_at': r[8]
+        } for r in results]
+    
+    def get_table_counts(self) -> Dict[str, int]:
+        """Get row counts for the main tables"""
+        conn = self._connect()
+        cursor = conn.cursor()
+
+        counts = {}
+        for table in ('users', 'topics', 'questions', 'test_results'):
+            cursor.execute(f'SELECT COUNT(*) FROM {table}')
+            counts[table] = cursor.fetchone()[0]
+
+        conn.close()
+        return counts
+
+    def archive_results(self, cutoff: str, batch_size: int = 10000) -> int:
+        """Move results submitted before cutoff ('YYYY-MM-DD[ HH:MM:SS]') into the archive database.
+        
+        Leaderboards and rollups are left alone: they already include the archived scores.
+        Returns the number of results moved.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT archive_path, archived_before FROM archive_state')
+        state = cursor.fetchone()
+        archive_path = state[0] if state else os.path.abspath(self.archive_path)
+        # The watermark only moves forward, and moves before any rows do, so every
+        # query that needs archived rows reads both files while the move is in progress
+        watermark = max(cutoff, state[1]) if state else cutoff
+        
+        if not self._attach_archive(conn):
+            cursor.execute('ATTACH DATABASE ? AS archive', (archive_path,))
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS archive.test_results (
+                id TEXT PRIMARY KEY,
+                student_id TEXT NOT NULL,
+                topic_id TEXT NOT NULL,
+                topic_title TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                time_taken INTEGER,
+                github_synced BOOLEAN DEFAULT FALSE,
+                submitted_at TIMESTAMP,
+                seq INTEGER
+            )
+        ''')
+        self._add_seq_column(cursor, 'archive')
+        cursor.execute('CREATE INDEX IF NOT EXISTS archive.idx_archive_results_student ON test_results (student_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS archive.idx_archive_results_submitted ON test_results (submitted_at)')
+        self._add_archive_unsynced_index(cursor)
+        cursor.execute('''
+            INSERT INTO archive_state (id, archive_path, archived_before) VALUES (1, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET archived_before = excluded.archived_before,
+                                           updated_at = CURRENT_TIMESTAMP
+        ''', (archive_path, watermark))
+        conn.commit()
+        
+        cursor.execute('CREATE TEMP TABLE archive_batch (result_rowid INTEGER PRIMARY KEY)')
+        moved = 0
+        while True:
+            cursor.execute('DELETE FROM temp.archive_batch')
+            cursor.execute('''
+                INSERT INTO temp.archive_batch
+                SELECT rowid FROM main.test_results WHERE submitted_at < ? LIMIT ?
+            ''', (cutoff, batch_size))
+            if cursor.rowcount <= 0:
+                break
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO archive.test_results ({self.RESULT_COLUMNS})
+                SELECT {self.RESULT_COLUMNS} FROM main.test_results
+                WHERE rowid IN temp.archive_batch
+            ''')
+            cursor.execute('DELETE FROM main.test_results WHERE rowid IN temp.archive_batch')
+            moved += cursor.rowcount
+            cursor.execute('UPDATE archive_state SET archived_count = archived_count + ? WHERE id = 1',
+                           (cursor.rowcount,))
+            conn.commit()
+        
+        conn.close()
+        return moved
+    
+    def get_archive_status(self) -> Optional[Dict]:
+        """Get the archive location, watermark and size, or None if nothing was archived"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT archive_path, archived_before, archived_count, updated_at FROM archive_state')
+        state = cursor.fetchone()
+        
+        conn.close()
+        if state is None:
+            return None
+        return {
+            'archive_path': state[0],
+            'archived_before': state[1],
+            'archived_count': state[2],
+            'updated_at': state[3]
+        }
+    
+    def get_sync_backlog(self) -> Dict[str, int]:
+        """Count students and test results, archived ones included, that have not reached GitHub yet"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT COUNT(*) FROM users WHERE github_synced = FALSE AND role = 'student'")
+        users = cursor.fetchone()[0]
+        source, params = self._results_source(cursor)
+        cursor.execute(f'SELECT COUNT(*) FROM {source} WHERE github_synced = FALSE', params)
+        results = cursor.fetchone()[0]
+        
+        conn.close()
+        return {'users': users, 'test_results': results}
+    
+    def get_unsynced_batch(self, kind: str, after: Tuple[str, str] = None, limit: int = 200) -> List[Dict]:
+        """Next unsynced users or test results in (timestamp, id) order after the key `after`.
+        
+        Records have the same shape as the ones written by register_user and submit_test_result.
+        Archived test results are included: they are archived whether or not they were synced.
+        """
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        after_clause, params = '', []
+        if kind == 'users':
+            if after:
+                after_clause, params = 'AND (created_at, unique_id) > (?, ?)', list(after)
+            cursor.execute(f'''
+                SELECT unique_id, role, first_name, last_name, date_of_birth, created_at, profile_analytics
+                FROM users
+                WHERE github_synced = FALSE AND role = 'student' {after_clause}
+                ORDER BY created_at, unique_id
+                LIMIT ?
+            ''', params + [limit])
+            rows = cursor.fetchall()
+            conn.close()
+            return [{
+                'unique_id': r[0],
+                'role': r[1],
+                'first_name': r[2],
+                'last_name': r[3],
+                'date_of_birth': r[4],
+                'registered_at': r[5],
+                'analytics': parse_analytics(r[6])
+            } for r in rows]
+        
+        if after:
+            after_clause, params = 'AND (submitted_at, id) > (?, ?)', list(after)
+        source, source_params = self._results_source(cursor)
+        cursor.execute(f'''
+            SELECT id, student_id, topic_id, topic_title, score, time_taken, submitted_at
+            FROM {source}
+            WHERE github_synced = FALSE {after_clause}
+            ORDER BY submitted_at, id
+            LIMIT ?
+        ''', source_params + params + [limit])
+        rows = cursor.fetchall()
+        conn.close()
+        return [{
+            'id': r[0],
+            'student_id': r[1],
+            'topic_id': r[2],
+            'topic_title': r[3],
+            'score': r[4],
+            'time_taken': r[5],
+            'submitted_at': r[6]
+        } for r in rows]
+    
+    def mark_synced(self, kind: str, ids: List[str]):
+        """Set github_synced for many users or test results in one transaction"""
+        if not ids:
+            return
+        def write(cursor: sqlite3.Cursor):
+            if kind == 'users':
+                tables, key = ['users'], 'unique_id'
+            else:
+                tables, key = ['main.test_results'], 'id'
+                if self._attach_archive(cursor.connection):
+                    tables.append('archive.test_results')
+            for table in tables:
+                cursor.executemany(f'UPDATE {table} SET github_synced = TRUE WHERE {key} = ?', [(i,) for i in ids])
+        
+        self._write(write)
+    
+    def get_hydration_state(self) -> Optional[Dict]:
+        """Get the progress of the last hydration from GitHub, or None if there was none"""
+        conn = self._connect()
         cursor = conn.cursor()
         
-        # Get category performance
         cursor.execute('''
+            SELECT source, commit_sha, status, members_done, users_loaded, results_loaded, started_at, updated_at
+            FROM hydration_state
+        ''')
+        state = cursor.fetchone()
+        
+        conn.close()
+        if state is None:
+            return None
+        return {
+            'source': state[0],
+            'commit_sha': state[1],
+            'status': state[2],
+            'members_done': state[3],
+            'users_loaded': state[4],
+            'results_loaded': state[5],
+            'started_at': state[6],
+            'updated_at': state[7]
+        }
+    
+    def start_hydration(self, source: str, commit_sha: str = None):
+        """Record that a hydration of this source and commit starts from the beginning"""
+        self._write(lambda cursor: cursor.execute('''
+            INSERT OR REPLACE INTO hydration_state (id, source, commit_sha, status)
+            VALUES (1, ?, ?, 'running')
+        ''', (source, commit_sha)))
+    
+    def load_hydration_batch(self, users: List[Tuple], results: List[Tuple], members_done: int) -> Tuple[int, int]:
+        """Bulk-insert users and results that are not present yet, together with the hydration progress.
+        
+        users are (unique_id, role, password_hash, first_name, last_name, date_of_birth,
+        created_at, profile_analytics); results are (id, student_id, topic_id, topic_title,
+        score, time_taken, submitted_at). Returns the number of users and results inserted.
+        """
+        def write(cursor: sqlite3.Cursor):
+            cursor.executemany('''
+                INSERT OR IGNORE INTO users (unique_id, role, password_hash, first_name, last_name,
+                                             date_of_birth, created_at, profile_analytics, github_synced)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, TRUE)
+            ''', users)
+            users_inserted = max(cursor.rowcount, 0)
+            cursor.executemany('''
+                INSERT OR IGNORE INTO test_results (id, student_id, topic_id, topic_title, score, time_taken,
+                                                    submitted_at, github_synced)
+                VALUES (?, ?, ?, ?, ?, ?, ?, TRUE)
+            ''', results)
+            results_inserted = max(cursor.rowcount, 0)
+            cursor.execute('''
+                UPDATE hydration_state
+                SET members_done = ?, users_loaded = users_loaded + ?, results_loaded = results_loaded + ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = 1
+            ''', (members_done, users_inserted, results_inserted))
+            return users_inserted, results_inserted
+        
+        return self._write(write)
+    
+    def finish_hydration(self):
+        """Rebuild the tables derived from test results and mark the hydration complete"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        self._rebuild_leaderboards(cursor)
+        self._backfill_rollups(cursor)
+        cursor.execute('''
+            UPDATE hydration_state SET status = 'complete', updated_at = CURRENT_TIMESTAMP WHERE id = 1
+        ''')
+        
+        conn.commit()
+        conn.close()
+    
+    def get_analytics_data(self, since: str = None, until: str = None) -> Dict:
+        """Get comprehensive analytics data, optionally for results submitted in [since, until)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        source, params = self._results_source(cursor, since, until)
+        
+        # Get category performance
+        cursor.execute(f'''
             SELECT t.category, AVG(tr.score) as avg_score, COUNT(tr.id) as test_count
-            FROM test_results tr
+            FROM {source} tr
             JOIN topics t ON tr.topic_id = t.id
             GROUP BY t.category
-        ''')
+        ''', params)
         category_stats = cursor.fetchall()
         
         # Get difficulty level performance
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT t.difficulty_level, AVG(tr.score) as avg_score, COUNT(tr.id) as test_count
-            FROM test_results tr
+            FROM {source} tr
             JOIN topics t ON tr.topic_id = t.id
             GROUP BY t.difficulty_level
-        ''')
+        ''', params)
         difficulty_stats = cursor.fetchall()
         
         # Get student performance summary
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT student_id, COUNT(id) as total_tests, AVG(score) as avg_score, MAX(score) as best_score
-            FROM test_results
+            FROM {source}
             GROUP BY student_id
-        ''')
+        ''', params)
         student_stats = cursor.fetchall()
         
         conn.close()
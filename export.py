@@ -0,0 +1,145 @@
+"""Export test results as CSV or Excel without holding them all in memory.
+
+Rows are read from the database in batches with fetchmany and written out
+as they arrive, so memory use stays the same however many results match.
+Excel export uses openpyxl in write-only mode and is only available when
+openpyxl is installed (pip install openpyxl).
+
+Usage:
+    python export.py --db wida_app.db --out results.csv
+    python export.py --student student1 --since 2025-01-01 --until 2025-07-01 --out student1.xlsx
+"""
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+from typing import IO, Iterator, Tuple
+
+EXPORT_HEADER = ['Result ID', 'Student ID', 'Topic ID', 'Topic', 'Category', 'Score (%)', 'Time Taken (s)',
+                 'Submitted At']
+# Rows formatted per CSV chunk
+CHUNK_ROWS = 1000
+FORMATS = {'csv': 'text/csv', 'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'}
+SPOOL_PREFIX = 'wida-export-'
+# Spooled files older than this (seconds) are deleted whenever a new one is spooled,
+# so the files of sessions that never came back do not pile up
+SPOOL_MAX_AGE = 3600
+
+
+def excel_available() -> bool:
+    """Whether the optional openpyxl dependency for Excel export is installed"""
+    import importlib.util
+    return importlib.util.find_spec('openpyxl') is not None
+
+
+def csv_chunks(rows: Iterator[Tuple], chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    """CSV text for the header and rows, one chunk of up to chunk_rows rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADER)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def write_csv(rows: Iterator[Tuple], out: IO[bytes]) -> int:
+    """Write the rows to a binary file as UTF-8 CSV; returns the number of bytes written"""
+    written = 0
+    for chunk in csv_chunks(rows):
+        written += out.write(chunk.encode('utf-8'))
+    return written
+
+
+def write_xlsx(rows: Iterator[Tuple], out: IO[bytes]):
+    """Write the rows to a binary file as an Excel workbook, streaming them into a write-only sheet"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append(EXPORT_HEADER)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(out)
+
+
+def export_results(db, out: IO[bytes], fmt: str = 'csv', student_id: str = None, topic_id: str = None,
+                   since: str = None, until: str = None):
+    """Write the results matching the filters to out in the given format ('csv' or 'xlsx')"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(FORMATS)}")
+    rows = db.iter_results(student_id, topic_id, since, until)
+    if fmt == 'xlsx':
+        write_xlsx(rows, out)
+    else:
+        write_csv(rows, out)
+
+
+def remove_stale_spools(prefix: str, max_age: float = SPOOL_MAX_AGE) -> int:
+    """Delete temporary files named prefix* that are older than max_age seconds; returns how many"""
+    cutoff = time.time() - max_age
+    removed = 0
+    for entry in os.scandir(tempfile.gettempdir()):
+        if not entry.name.startswith(prefix):
+            continue
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # another session removed it first
+    return removed
+
+
+def spool_export(db, fmt: str = 'csv', **filters) -> str:
+    """Export to a temporary file and return its path.
+
+    The caller deletes it when it is replaced; files left behind are swept after SPOOL_MAX_AGE.
+    """
+    remove_stale_spools(SPOOL_PREFIX)
+    handle, path = tempfile.mkstemp(prefix=SPOOL_PREFIX, suffix=f'.{fmt}')
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            export_results(db, out, fmt, **filters)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export test results as CSV or Excel")
+    parser.add_argument('--db', default='wida_app.db')
+    parser.add_argument('--shard-directory', help="Export from every shard in this directory.db")
+    parser.add_argument('--student', help="Only this student's results")
+    parser.add_argument('--topic', help="Only results for this topic id")
+    parser.add_argument('--since', help="Submitted on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--until', help="Submitted before this date (YYYY-MM-DD)")
+    parser.add_argument('--out', required=True, help="Output file; .xlsx writes Excel, anything else CSV")
+    args = parser.parse_args()
+
+    fmt = 'xlsx' if args.out.endswith('.xlsx') else 'csv'
+    if fmt == 'xlsx' and not excel_available():
+        parser.error("Excel export needs openpyxl (pip install openpyxl)")
+
+    if args.shard_directory:
+        from sharding import ShardedDatabaseManager
+        db = ShardedDatabaseManager(args.shard_directory, use_github=False, use_write_queue=False)
+    else:
+        from enhanced_backend import EnhancedDatabaseManager
+        db = EnhancedDatabaseManager(db_path=args.db, use_github=False, use_write_queue=False)
+
+    with open(args.out, 'wb') as out:
+        export_results(db, out, fmt, args.student, args.topic, args.since, args.until)
+    print(f"Wrote {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
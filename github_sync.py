@@ -0,0 +1,171 @@
+"""Maintenance for the GitHub backup repository.
+
+With WIDA_GITHUB_SYNC_FORMAT=ndjson, users and test results are appended to
+one gzip NDJSON segment per day instead of one JSON file per record.
+`compact` folds the daily segments of past days into one segment per month in
+a single commit, and `status` counts the files of each kind.
+
+`reconcile` pushes the users and test results whose sync failed
+(github_synced = FALSE) in batches, with a bounded number of requests in
+flight, and marks each batch synced in one transaction.
+
+Usage:
+    python github_sync.py status
+    python github_sync.py compact --older-than-days 7
+    python github_sync.py reconcile --db wida_app.db --loop --interval 300
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import metrics
+from enhanced_backend import EnhancedDatabaseManager, GitHubStorage
+
+DEFAULT_COMPACT_AFTER_DAYS = 7
+DEFAULT_RECONCILE_BATCH = 200
+DEFAULT_RECONCILE_WORKERS = 4
+DEFAULT_RECONCILE_INTERVAL = 300
+
+# Field that orders the unsynced rows of each kind
+TIMESTAMP_FIELDS = {'users': 'registered_at', 'test_results': 'submitted_at'}
+
+
+def _push(storage: GitHubStorage, pool: ThreadPoolExecutor, kind: str, records: List[Dict]) -> List[str]:
+    """Push records to GitHub; returns the keys of the ones that were stored"""
+    key = storage.RECORD_KEYS[kind]
+    if storage.sync_format == 'ndjson':
+        # One append per day segment instead of one request per record
+        by_day = {}
+        for record in records:
+            by_day.setdefault(str(record[TIMESTAMP_FIELDS[kind]])[:10], []).append(record)
+        groups = list(by_day.items())
+
+        def append(group) -> bool:
+            try:
+                return storage.append_records(kind, group[1], day=group[0])
+            except Exception:
+                return False  # the rows stay unsynced for the next run
+
+        stored = pool.map(append, groups)
+        return [record[key] for (_, group), ok in zip(groups, stored) if ok for record in group]
+
+    save = storage.save_user_data if kind == 'users' else storage.save_test_result
+    return [record[key] for record, ok in zip(records, pool.map(save, records)) if ok]
+
+
+def reconcile(db: EnhancedDatabaseManager, storage: GitHubStorage = None,
+              batch_size: int = DEFAULT_RECONCILE_BATCH, max_workers: int = DEFAULT_RECONCILE_WORKERS,
+              max_batches: int = None) -> Dict[str, Dict]:
+    """Push unsynced users, then unsynced test results, and report what happened per kind"""
+    storage = storage or db.github_storage
+    report = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for kind in ('users', 'test_results'):
+            started = time.perf_counter()
+            synced = failed = batches = 0
+            after = None
+            while max_batches is None or batches < max_batches:
+                records = db.get_unsynced_batch(kind, after, batch_size)
+                if not records:
+                    break
+                batches += 1
+                # Keyset pagination: rows that failed are not fetched again in this run
+                last = records[-1]
+                after = (last[TIMESTAMP_FIELDS[kind]], last[storage.RECORD_KEYS[kind]])
+                pushed = _push(storage, pool, kind, records)
+                db.mark_synced(kind, pushed)
+                synced += len(pushed)
+                failed += len(records) - len(pushed)
+
+            duration = time.perf_counter() - started
+            backlog = db.get_sync_backlog()[kind]
+            metrics.record_sync_run(kind, backlog, synced, failed, duration)
+            report[kind] = {'synced': synced, 'failed': failed, 'batches': batches, 'backlog': backlog,
+                            'seconds': round(duration, 2)}
+    return report
+
+
+def count_files(storage: GitHubStorage) -> dict:
+    """Number of per-record JSON files and NDJSON segments under each kind"""
+    import requests
+
+    response = requests.get(f"{storage.base_url}/git/trees/{storage.branch}", headers=storage.headers,
+                            params={"recursive": "1"})
+    response.raise_for_status()
+    counts = {kind: {'json_files': 0, 'segments': 0} for kind in storage.RECORD_KEYS}
+    for entry in response.json()['tree']:
+        kind = entry['path'].partition('/')[0]
+        if entry['type'] != 'blob' or kind not in counts:
+            continue
+        if entry['path'].endswith(storage.SEGMENT_SUFFIX):
+            counts[kind]['segments'] += 1
+        elif entry['path'].endswith('.json'):
+            counts[kind]['json_files'] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the GitHub backup repository")
+    parser.add_argument('--owner', default=os.environ.get('WIDA_GITHUB_OWNER', 'Unigalactix'))
+    parser.add_argument('--repo', default=os.environ.get('WIDA_GITHUB_REPO', 'MR.COACH'))
+    parser.add_argument('--token', default=os.environ.get('GITHUB_TOKEN'))
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('status', help="Count record files and segments")
+    compact = subparsers.add_parser('compact', help="Merge old daily segments into monthly ones")
+    compact.add_argument('--older-than-days', type=int, default=DEFAULT_COMPACT_AFTER_DAYS,
+                         help="Compact segments of days before this many days ago")
+    reconcile_parser = subparsers.add_parser('reconcile', help="Push rows whose GitHub sync failed")
+    reconcile_parser.add_argument('--db', default='wida_app.db')
+    reconcile_parser.add_argument('--shard-directory', help="Reconcile every shard in this directory.db")
+    reconcile_parser.add_argument('--batch-size', type=int, default=DEFAULT_RECONCILE_BATCH)
+    reconcile_parser.add_argument('--workers', type=int, default=DEFAULT_RECONCILE_WORKERS,
+                                  help="Requests to GitHub in flight at once")
+    reconcile_parser.add_argument('--loop', action='store_true', help="Keep reconciling every --interval seconds")
+    reconcile_parser.add_argument('--interval', type=float, default=DEFAULT_RECONCILE_INTERVAL)
+    args = parser.parse_args()
+
+    # Reconciling writes in the configured format; the maintenance commands work on segments
+    sync_format = None if args.command == 'reconcile' else 'ndjson'
+    storage = GitHubStorage(args.owner, args.repo, token=args.token, sync_format=sync_format)
+    if not storage.token:
+        parser.error("a GitHub token is required (--token or GITHUB_TOKEN)")
+
+    if args.command == 'reconcile':
+        if args.shard_directory:
+            from sharding import ShardDirectory
+            targets = list(ShardDirectory(args.shard_directory).get_schools().values())
+        else:
+            targets = [args.db]
+        databases = [EnhancedDatabaseManager(db_path=path, use_github=False, use_write_queue=False)
+                     for path in targets]
+        while True:
+            for path, db in zip(targets, databases):
+                for kind, result in reconcile(db, storage, args.batch_size, args.workers).items():
+                    print(f"{path}: {kind:<13} synced {result['synced']:,}, failed {result['failed']:,}, "
+                          f"{result['backlog']:,} left ({result['seconds']}s)")
+            if os.environ.get('WIDA_METRICS_FILE'):
+                metrics.write_textfile(os.environ['WIDA_METRICS_FILE'])
+            if not args.loop:
+                break
+            time.sleep(args.interval)
+    elif args.command == 'status':
+        for kind, counts in count_files(storage).items():
+            print(f"{kind:<14} {counts['json_files']:>8,} JSON files  {counts['segments']:>6,} segments")
+    else:
+        before_day = (datetime.now() - timedelta(days=args.older_than_days)).strftime('%Y-%m-%d')
+        report = storage.compact_segments(before_day)
+        if report['truncated']:
+            print("Warning: the repository tree was truncated; some segments may not have been seen")
+        if report['commit']:
+            print(f"Merged {report['segments_merged']} daily segments into {report['segments_written']} "
+                  f"monthly segments ({report['records']:,} records) in {report['commit'][:10]}")
+        else:
+            print(f"No daily segments before {before_day}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""Load users and test results from the GitHub backup into an empty local database.
+
+The whole repository is downloaded as one tarball and read as a stream, so
+nothing is listed or fetched file by file. Both sync formats are understood:
+per-record JSON files and gzip NDJSON segments. Rows are inserted in batches
+with executemany, and each batch commits the position in the tarball along
+with the rows, so an interrupted hydration resumes where it stopped.
+
+Passwords are not part of the backup, which may be public. Hydrated students
+are locked (EnhancedDatabaseManager.LOCKED_PASSWORD_HASH) until a master sets
+a new password for them on the User Management tab.
+
+Usage:
+    python hydration.py --db wida_app.db
+    python hydration.py --status
+
+Set WIDA_HYDRATE_ON_START=1 to hydrate before the app serves its first page.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import tarfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from enhanced_backend import EnhancedDatabaseManager, GitHubStorage, decode_ndjson
+
+logger = logging.getLogger('wida.hydration')
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _timestamp(value: Optional[str]) -> Optional[str]:
+    """ISO timestamps from the backup in the 'YYYY-MM-DD HH:MM:SS' form SQLite uses"""
+    return value[:19].replace('T', ' ') if value else None
+
+
+def _records(member: tarfile.TarInfo, tar: tarfile.TarFile, relative_path: str) -> Iterator[Dict]:
+    data = tar.extractfile(member).read()
+    if relative_path.endswith(GitHubStorage.SEGMENT_SUFFIX):
+        yield from decode_ndjson(gzip.decompress(data))
+    elif relative_path.endswith('.json'):
+        yield json.loads(data)
+
+
+def user_row(record: Dict) -> Tuple:
+    return (record['unique_id'], record.get('role', 'student'), EnhancedDatabaseManager.LOCKED_PASSWORD_HASH,
+            record.get('first_name'), record.get('last_name'), record.get('date_of_birth'),
+            _timestamp(record.get('registered_at')) or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            str(record.get('analytics', {})))
+
+
+def result_row(record: Dict) -> Tuple:
+    return (record['id'], record['student_id'], record['topic_id'], record.get('topic_title', ''),
+            record['score'], record.get('time_taken'),
+            _timestamp(record.get('submitted_at')) or datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+
+
+def hydrate(db: EnhancedDatabaseManager, storage: GitHubStorage = None, batch_size: int = DEFAULT_BATCH_SIZE,
+            restart: bool = False, progress: Callable[[Dict], None] = None) -> Dict:
+    """Stream the backup repository into db and return the final hydration state"""
+    storage = storage or db.github_storage
+    state = db.get_hydration_state()
+    if state and state['status'] == 'complete' and not restart:
+        return state
+
+    source = f"{storage.repo_owner}/{storage.repo_name}@{storage.branch}"
+    started = time.perf_counter()
+    response = storage.open_tarball()
+    users, results = [], []
+    skip = 0
+    report = {'members': 0, 'users_loaded': 0, 'results_loaded': 0, 'bytes': 0, 'seconds': 0.0}
+
+    def flush(members_done: int):
+        users_inserted, results_inserted = db.load_hydration_batch(users, results, members_done)
+        report['users_loaded'] += users_inserted
+        report['results_loaded'] += results_inserted
+        report['bytes'] = response.raw.tell()
+        report['seconds'] = round(time.perf_counter() - started, 1)
+        users.clear()
+        results.clear()
+        if progress:
+            progress(dict(report))
+
+    with tarfile.open(fileobj=response.raw, mode='r|gz') as tar:
+        for index, member in enumerate(tar):
+            report['members'] = index + 1
+            root, _, relative_path = member.name.partition('/')
+            if index == 0:
+                # GitHub names the top directory {owner}-{repo}-{short commit sha}
+                commit_sha = root.rpartition('-')[2]
+                if state and state['status'] == 'running' and state['commit_sha'] == commit_sha and not restart:
+                    skip = state['members_done']
+                    logger.info("Resuming hydration of %s after %d tarball entries", source, skip)
+                else:
+                    db.start_hydration(source, commit_sha)
+            if index < skip or not member.isfile():
+                continue
+
+            kind = relative_path.partition('/')[0]
+            if kind not in GitHubStorage.RECORD_KEYS:
+                continue
+            for record in _records(member, tar, relative_path):
+                if kind == 'users':
+                    users.append(user_row(record))
+                else:
+                    results.append(result_row(record))
+            if len(users) + len(results) >= batch_size:
+                flush(index + 1)
+
+    if report['members'] == 0:
+        db.start_hydration(source)
+    flush(report['members'])
+    db.finish_hydration()
+    response.close()
+    logger.info("Hydrated %d users and %d results from %s in %.1fs", report['users_loaded'],
+                report['results_loaded'], source, time.perf_counter() - started)
+    return db.get_hydration_state()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load users and results from the GitHub backup")
+    parser.add_argument('--db', default='wida_app.db')
+    parser.add_argument('--owner', default=os.environ.get('WIDA_GITHUB_OWNER', 'Unigalactix'))
+    parser.add_argument('--repo', default=os.environ.get('WIDA_GITHUB_REPO', 'MR.COACH'))
+    parser.add_argument('--token', default=os.environ.get('GITHUB_TOKEN'))
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction")
+    parser.add_argument('--restart', action='store_true', help="Start over even if a hydration completed")
+    parser.add_argument('--status', action='store_true', help="Show the state of the last hydration")
+    args = parser.parse_args()
+
+    db = EnhancedDatabaseManager(db_path=args.db, use_github=False, use_write_queue=False)
+    if args.status:
+        state = db.get_hydration_state()
+        print(json.dumps(state, indent=2) if state else "Never hydrated")
+        return
+
+    storage = GitHubStorage(args.owner, args.repo, token=args.token)
+    if not storage.token:
+        parser.error("a GitHub token is required (--token or GITHUB_TOKEN)")
+
+    def show_progress(report: Dict):
+        print(f"  {report['members']:,} entries, {report['bytes'] / 1e6:.1f} MB, {report['users_loaded']:,} users, "
+              f"{report['results_loaded']:,} results ({report['seconds']}s)")
+
+    state = hydrate(db, storage, args.batch_size, args.restart, show_progress)
+    print(f"{state['status']}: {state['users_loaded']:,} users and {state['results_loaded']:,} results "
+          f"from {state['source']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""Cold-start import budgets, measured with python -X importtime.
+
+Each module is imported in a fresh interpreter a few times and the fastest
+cumulative import time is checked against its budget. Modules that must stay
+lazy (pandas, Plotly Express, requests, ...) fail the check if they are
+imported at all.
+
+Usage:
+    python import_budget.py
+    python import_budget.py --budget app=1500 --output import_times.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Cumulative import time in milliseconds for a cold interpreter
+DEFAULT_BUDGETS_MS = {
+    'app': 900,
+    'enhanced_backend': 100,
+    'views.landing': 900,
+    'views.auth': 900,
+    'views.exam': 900,
+}
+
+# Modules that only the chart, analytics and sync code paths may load
+DEFERRED_MODULES = {
+    'app': ['pandas', 'numpy', 'plotly.express', 'requests'],
+    # The landing, login and test pages stay lean; the adaptive test loads NumPy when it starts
+    'views.landing': ['pandas', 'numpy', 'plotly.express', 'requests'],
+    'views.auth': ['pandas', 'numpy', 'plotly.express', 'requests'],
+    'views.exam': ['pandas', 'numpy', 'plotly.express', 'requests'],
+    'enhanced_backend': ['streamlit', 'pandas', 'numpy', 'requests'],
+}
+
+DEFAULT_RUNS = 3
+
+
+def parse_importtime(stderr: str) -> Dict[str, Dict[str, int]]:
+    """Map module name -> {'self_us', 'cumulative_us'} from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = {'self_us': int(self_us), 'cumulative_us': int(cumulative_us)}
+    return modules
+
+
+def measure_import(module: str, runs: int = DEFAULT_RUNS) -> Dict:
+    """Import module in fresh interpreters; report the fastest run and everything it loaded"""
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    best = None
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=project_dir, capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{completed.stderr[-2000:]}")
+        modules = parse_importtime(completed.stderr)
+        if module not in modules:
+            raise RuntimeError(f"No importtime entry for {module}")
+        if best is None or modules[module]['cumulative_us'] < best[module]['cumulative_us']:
+            best = modules
+
+    slowest = sorted(best.items(), key=lambda item: item[1]['self_us'], reverse=True)[:10]
+    return {
+        'module': module,
+        'cumulative_ms': round(best[module]['cumulative_us'] / 1000, 1),
+        'loaded_modules': sorted(best),
+        'slowest_self_ms': [{'module': name, 'self_ms': round(t['self_us'] / 1000, 1)} for name, t in slowest]
+    }
+
+
+def check_budgets(budgets: Dict[str, float], runs: int = DEFAULT_RUNS) -> Tuple[List[Dict], List[str]]:
+    """Measure every budgeted module; return the reports and a list of violations"""
+    reports, violations = [], []
+    for module, budget_ms in budgets.items():
+        report = measure_import(module, runs)
+        reports.append(report)
+        print(f"{module:<20} {report['cumulative_ms']:>8.1f} ms  (budget {budget_ms:g} ms)")
+        for entry in report['slowest_self_ms'][:5]:
+            print(f"    {entry['module']:<50} {entry['self_ms']:>7.1f} ms")
+
+        if report['cumulative_ms'] > budget_ms:
+            violations.append(f"{module} imports in {report['cumulative_ms']} ms, over its {budget_ms:g} ms budget")
+        for deferred in DEFERRED_MODULES.get(module, []):
+            if deferred in report['loaded_modules']:
+                violations.append(f"import {module} loads {deferred}, which should be imported lazily")
+    return reports, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when cold-start import time regresses")
+    parser.add_argument('--budget', action='append', default=[], metavar='MODULE=MS',
+                        help="Override or add a budget, e.g. app=1500")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help="Imports per module (fastest is kept)")
+    parser.add_argument('--output', help="Write per-module import reports to this JSON file")
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS_MS)
+    for override in args.budget:
+        module, _, budget_ms = override.partition('=')
+        budgets[module] = float(budget_ms)
+
+    reports, violations = check_budgets(budgets, args.runs)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    for violation in violations:
+        print(f"BUDGET EXCEEDED: {violation}")
+    if violations:
+        sys.exit(1)
+    print("All import budgets met")
+
+
+if __name__ == '__main__':
+    main()
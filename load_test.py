@@ -0,0 +1,356 @@
+"""Exam-day load generator for EnhancedDatabaseManager.
+
+Simulates students logging in, opening a test and submitting it, from many
+threads across several processes that share one SQLite file. GitHub sync is
+pointed at a local stub server, so no network traffic leaves the machine.
+
+Usage:
+    python load_test.py --students 300 --window 600            # exam-day burst
+    python load_test.py --sweep 10,25,50,100,200,300 --output load.json
+"""
+import argparse
+import base64
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+import bcrypt
+
+from benchmark import summarize_latencies
+from enhanced_backend import EnhancedDatabaseManager, GitHubStorage
+
+LOAD_PASSWORD = 'load-test-password'
+STEPS = ['authenticate_user', 'get_questions_for_topic', 'submit_test_result', 'get_result_by_id']
+LOCK_ERRORS = ('database is locked', 'database table is locked', 'database is busy')
+
+
+class GitHubStubHandler(BaseHTTPRequestHandler):
+    """Accepts GitHub contents API calls and answers like the real API would.
+
+    Files are kept in memory with their blob sha, so NDJSON appends can read a
+    segment back and updates with a stale sha are refused with 409.
+    """
+
+    def _reply(self, status: int, body: Dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_PUT(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        time.sleep(self.server.latency)
+        path = urlsplit(self.path).path
+        content = base64.b64decode(body['content'])
+        sha = hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+        with self.server.lock:
+            self.server.request_count += 1
+            current = self.server.files.get(path)
+            # Creating a file must not send a sha; updating one must send the current sha
+            if current is None and 'sha' in body or current is not None and body.get('sha') != current['sha']:
+                status = 409 if 'sha' in body else 422
+            else:
+                status = 200 if current else 201
+                self.server.files[path] = {'sha': sha, 'content': body['content']}
+        if status in (200, 201):
+            self._reply(status, {'content': {'path': path, 'sha': sha}})
+        else:
+            self._reply(status, {'message': 'sha does not match' if status == 409 else 'sha was not supplied'})
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        path = urlsplit(self.path).path
+        with self.server.lock:
+            self.server.request_count += 1
+            current = self.server.files.get(path)
+        if current is None:
+            self._reply(404, {'message': 'Not Found'})
+        else:
+            self._reply(200, {'path': path, 'sha': current['sha'], 'content': current['content']})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_github_stub(latency: float = 0.05) -> ThreadingHTTPServer:
+    """Start the stub on a free local port; its URL is http://127.0.0.1:<server_port>"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), GitHubStubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.files = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def prepare_database(db_path: str, students: int, with_passwords: bool = True) -> List[str]:
+    """Create the schema and the simulated students, returning their ids"""
+    EnhancedDatabaseManager(db_path=db_path, use_github=False)
+    password_hash = bcrypt.hashpw(LOAD_PASSWORD.encode('utf-8'), bcrypt.gensalt()) if with_passwords else None
+    student_ids = [f"load-student-{i:05d}" for i in range(students)]
+
+    conn = sqlite3.connect(db_path)
+    conn.executemany('''
+        INSERT OR IGNORE INTO users (unique_id, role, password_hash, first_name, last_name)
+        VALUES (?, 'student', ?, 'Load', 'Tester')
+    ''', [(student_id, password_hash) for student_id in student_ids])
+    conn.commit()
+    conn.close()
+    return student_ids
+
+
+def _run_session(db: EnhancedDatabaseManager, student_id: str, topics: List[Dict], password: str,
+                 think_time: float, rng: random.Random) -> Dict:
+    """One student: login, open a test, submit it and view the result"""
+    timings = {}
+    topic = rng.choice(topics)
+    started = time.perf_counter()
+    try:
+        step_started = time.perf_counter()
+        if not db.authenticate_user(student_id, password):
+            return {'ok': False, 'error': 'authentication failed', 'timings': timings}
+        timings['authenticate_user'] = time.perf_counter() - step_started
+
+        step_started = time.perf_counter()
+        questions = db.get_questions_for_topic(topic['id'])
+        timings['get_questions_for_topic'] = time.perf_counter() - step_started
+
+        # Time spent answering is not part of any backend call
+        if think_time:
+            time.sleep(rng.uniform(0.5, 1.5) * think_time)
+        correct = sum(rng.random() < 0.7 for _ in questions)
+        score = round(correct / len(questions) * 100) if questions else 0
+
+        step_started = time.perf_counter()
+        result_id = db.submit_test_result(student_id, topic['id'], topic['title'], score,
+                                          rng.randrange(60, 900))
+        timings['submit_test_result'] = time.perf_counter() - step_started
+
+        step_started = time.perf_counter()
+        db.get_result_by_id(result_id)
+        timings['get_result_by_id'] = time.perf_counter() - step_started
+    except sqlite3.OperationalError as e:
+        locked = any(message in str(e) for message in LOCK_ERRORS)
+        return {'ok': False, 'error': 'locked' if locked else str(e), 'timings': timings}
+    except Exception as e:
+        return {'ok': False, 'error': f"{type(e).__name__}: {e}", 'timings': timings}
+
+    return {'ok': True, 'timings': timings, 'session': time.perf_counter() - started}
+
+
+def _run_worker(job: Dict) -> List[Dict]:
+    """Process entry point: run this process's share of sessions from a pool of threads"""
+    storage = GitHubStorage('load-test', 'stub', token='load-test', api_url=job['github_url'])
+    db = EnhancedDatabaseManager(db_path=job['db_path'], github_storage=storage,
+                                 **job.get('manager_options', {}))
+    topics = [t for t in db.get_topics() if db.get_questions_for_topic(t['id'])]
+    sessions = job['sessions']
+    outcomes = []
+    outcomes_lock = threading.Lock()
+    next_index = iter(range(len(sessions)))
+    index_lock = threading.Lock()
+    start_at = job['start_at']
+
+    def run_thread(thread_number: int):
+        rng = random.Random(job['seed'] * 1000 + thread_number)
+        while True:
+            with index_lock:
+                i = next(next_index, None)
+            if i is None:
+                return
+            student_id, arrival = sessions[i]
+            delay = start_at + arrival - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            outcome = _run_session(db, student_id, topics, job['password'], job['think_time'], rng)
+            outcome['finished_at'] = time.time()
+            with outcomes_lock:
+                outcomes.append(outcome)
+
+    threads = [threading.Thread(target=run_thread, args=(n,)) for n in range(job['threads'])]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.close()
+    return outcomes
+
+
+def run_load(db_path: str, student_ids: List[str], concurrency: int, sessions: int, processes: int,
+             github_url: str, window: float = 0.0, think_time: float = 0.0, seed: int = 42,
+             with_passwords: bool = True, manager_options: Dict = None) -> Dict:
+    """Run sessions with the given number of concurrent workers and summarize the outcome.
+
+    Arrivals are spread uniformly over `window` seconds (0 means everyone at once).
+    """
+    rng = random.Random(seed)
+    processes = max(1, min(processes, concurrency))
+    threads_per_process = math.ceil(concurrency / processes)
+    arrivals = sorted(rng.uniform(0, window) for _ in range(sessions))
+    planned = [(student_ids[i % len(student_ids)], arrivals[i]) for i in range(sessions)]
+
+    start_at = time.time() + 1.0
+    jobs = [{
+        'db_path': db_path,
+        'github_url': github_url,
+        'sessions': planned[p::processes],
+        'threads': threads_per_process,
+        'think_time': think_time,
+        'password': LOAD_PASSWORD if with_passwords else None,
+        'seed': seed + p,
+        'start_at': start_at,
+        'manager_options': manager_options or {}
+    } for p in range(processes)]
+
+    with multiprocessing.Pool(processes) as pool:
+        outcomes = [o for worker_outcomes in pool.map(_run_worker, jobs) for o in worker_outcomes]
+    elapsed = max((o['finished_at'] for o in outcomes), default=start_at) - start_at
+
+    completed = [o for o in outcomes if o['ok']]
+    errors = {}
+    for o in outcomes:
+        if not o['ok']:
+            errors[o['error']] = errors.get(o['error'], 0) + 1
+
+    steps = {}
+    for step in STEPS:
+        samples = [o['timings'][step] for o in outcomes if step in o['timings']]
+        if samples:
+            steps[step] = summarize_latencies(samples)
+
+    return {
+        'concurrency': concurrency,
+        'processes': processes,
+        'threads_per_process': threads_per_process,
+        'sessions': sessions,
+        'completed': len(completed),
+        'failed': len(outcomes) - len(completed),
+        'lock_errors': errors.get('locked', 0),
+        'errors': errors,
+        'elapsed_s': round(elapsed, 3),
+        'sessions_per_s': round(len(completed) / elapsed, 2) if elapsed > 0 else 0.0,
+        'session_latency': summarize_latencies([o['session'] for o in completed]),
+        'steps': steps
+    }
+
+
+def find_saturation_point(levels: List[Dict], tolerance: float = 0.05) -> Dict:
+    """The lowest concurrency that already reaches (1 - tolerance) of the best throughput"""
+    if not levels:
+        return {}
+    best = max(level['sessions_per_s'] for level in levels)
+    for level in levels:
+        if level['sessions_per_s'] >= best * (1 - tolerance):
+            return {
+                'concurrency': level['concurrency'],
+                'sessions_per_s': level['sessions_per_s'],
+                'p99_session_ms': level['session_latency']['p99_ms'],
+                'first_lock_errors_at': next((l['concurrency'] for l in levels if l['lock_errors']), None)
+            }
+    return {}
+
+
+def _print_level(result: Dict):
+    print(f"concurrency {result['concurrency']:>4}: {result['completed']:>5}/{result['sessions']:<5} ok  "
+          f"{result['sessions_per_s']:>8.2f} sessions/s  "
+          f"p50 {result['session_latency']['p50_ms']:>9.1f} ms  p99 {result['session_latency']['p99_ms']:>9.1f} ms  "
+          f"locked {result['lock_errors']}")
+
+
+def run_test(args: argparse.Namespace, db_path: str):
+    """Run the burst or sweep described by args against db_path and print or write the report"""
+    with_passwords = not args.no_passwords
+    manager_options = {'use_write_queue': args.write_queue}
+    student_ids = prepare_database(db_path, args.students, with_passwords)
+    stub = start_github_stub(args.github_latency)
+    github_url = f"http://127.0.0.1:{stub.server_port}"
+
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'cpus': os.cpu_count()
+        },
+        'db_path': db_path,
+        'students': args.students,
+        'github_latency_s': args.github_latency,
+        'github_sync_format': os.environ.get('WIDA_GITHUB_SYNC_FORMAT', 'files'),
+        'write_queue': args.write_queue
+    }
+
+    if args.sweep:
+        levels = []
+        for concurrency in [int(level) for level in args.sweep.split(',')]:
+            result = run_load(db_path, student_ids, concurrency, concurrency * args.sessions_per_level,
+                              args.processes, github_url, think_time=args.think_time,
+                              seed=args.seed, with_passwords=with_passwords,
+                              manager_options=manager_options)
+            _print_level(result)
+            levels.append(result)
+        report['levels'] = levels
+        report['saturation'] = find_saturation_point(levels)
+        if report['saturation']:
+            print(f"Saturation at concurrency {report['saturation']['concurrency']} "
+                  f"({report['saturation']['sessions_per_s']} sessions/s)")
+    else:
+        result = run_load(db_path, student_ids, args.students, args.students, args.processes, github_url,
+                          window=args.window, think_time=args.think_time, seed=args.seed,
+                          with_passwords=with_passwords, manager_options=manager_options)
+        _print_level(result)
+        report['burst'] = result
+
+    report['github_requests'] = stub.request_count
+    stub.shutdown()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate concurrent exam-day sessions against SQLite")
+    parser.add_argument('--db', help="SQLite file to load (default: a fresh temporary database)")
+    parser.add_argument('--students', type=int, default=300, help="Students taking the exam")
+    parser.add_argument('--window', type=float, default=0.0,
+                        help="Seconds over which students arrive (600 for a ten-minute burst)")
+    parser.add_argument('--think-time', type=float, default=0.0,
+                        help="Average seconds a student spends answering before submitting")
+    parser.add_argument('--processes', type=int, default=min(os.cpu_count() or 1, 8))
+    parser.add_argument('--sweep', help="Comma-separated concurrency levels to find the saturation point")
+    parser.add_argument('--sessions-per-level', type=int, default=3,
+                        help="Sessions per concurrent worker at each sweep level")
+    parser.add_argument('--github-latency', type=float, default=0.05,
+                        help="Seconds the GitHub stub waits before answering")
+    parser.add_argument('--no-passwords', action='store_true', help="Skip bcrypt by using passwordless students")
+    parser.add_argument('--write-queue', action='store_true',
+                        help="Send writes through the single-writer group-commit queue")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    if args.db:
+        run_test(args, args.db)
+    else:
+        with tempfile.TemporaryDirectory(prefix='wida-load-') as workdir:
+            run_test(args, os.path.join(workdir, 'load.db'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Student x topic mastery matrix built from test results.
+
+Mastery of a topic is the student's average score on it. Students and topics
+are coded as integer row and column indices so the whole class can be handled
+with NumPy array operations; untested cells are NaN.
+
+MasteryMatrix keeps the whole class in memory for the master heatmap and is
+updated one cell per submitted result instead of being re-queried.
+"""
+import threading
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+# A topic counts as mastered at this average score
+MASTERY_THRESHOLD = 70
+DIFFICULTY_ORDER = {'Beginner': 0, 'Intermediate': 1, 'Advanced': 2}
+
+
+def index_of(keys: Sequence[str]) -> Dict[str, int]:
+    """Integer code of each key, in the given order"""
+    return {key: i for i, key in enumerate(keys)}
+
+
+def build_score_arrays(rows: List[Tuple[str, str, int, int]], student_ids: Sequence[str],
+                       topic_ids: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Score sums and attempt counts per (student, topic) from (student_id, topic_id, score_sum, attempts) rows.
+
+    Rows for students or topics outside the given lists are ignored.
+    """
+    sums = np.zeros((len(student_ids), len(topic_ids)), dtype=np.float64)
+    counts = np.zeros((len(student_ids), len(topic_ids)), dtype=np.int32)
+    students, topics = index_of(student_ids), index_of(topic_ids)
+    coded = [(students[s], topics[t], total, n) for s, t, total, n in rows if s in students and t in topics]
+    if coded:
+        rows_index, cols_index, totals, attempts = (np.array(column) for column in zip(*coded))
+        sums[rows_index, cols_index] = totals
+        counts[rows_index, cols_index] = attempts
+    return sums, counts
+
+
+def mastery_matrix(sums: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Average score per cell, NaN where the student has not taken the topic"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+
+class MasteryMatrix:
+    """Class-wide score sums and attempt counts kept in memory.
+
+    Built from SQL once, then kept current by record(), which is registered as
+    a result listener so each new test result updates a single cell. Students
+    and topics first seen in a result get a new row or column; the arrays grow
+    by doubling so adding one is amortised O(1).
+    """
+
+    def __init__(self, student_ids: Sequence[str], topics: List[Dict], sums: np.ndarray, counts: np.ndarray,
+                 loaded_through: Union[int, Dict[str, int]] = None):
+        self._lock = threading.Lock()
+        # Result sequence number the arrays already include (per school when sharded); record() skips those
+        self._loaded_through = loaded_through
+        self._students = index_of(student_ids)
+        self._topics = index_of([t['id'] for t in topics])
+        self._categories = index_of(sorted({t['category'] for t in topics}))
+        self._topic_category = np.array([self._categories[t['category']] for t in topics], dtype=np.int32)
+        self._sums, self._counts = sums, counts
+        # Bumped on every update so rendered views can be cached per version
+        self.version = 0
+
+    @classmethod
+    def from_database(cls, db) -> 'MasteryMatrix':
+        """Build the matrix from every stored result"""
+        student_ids = db.get_student_ids()
+        topics = db.get_topics()
+        rows, loaded_through = db.get_mastery_snapshot()
+        sums, counts = build_score_arrays(rows, student_ids, [t['id'] for t in topics])
+        return cls(student_ids, topics, sums, counts, loaded_through)
+
+    @classmethod
+    def follow(cls, db) -> 'MasteryMatrix':
+        """Build the matrix from db and keep it current with each new result.
+
+        The listener is registered before the build and holds results back until
+        it is done, so a result committed meanwhile is not missed; the ones the
+        build already read are recognised by their sequence number and skipped.
+        """
+        lock = threading.Lock()
+        pending, built = [], []
+
+        def record(result: Dict):
+            with lock:
+                if not built:
+                    pending.append(result)
+                    return
+            built[0].record(result)
+
+        db.add_result_listener(record)
+        matrix = cls.from_database(db)
+        with lock:
+            built.append(matrix)
+            for result in pending:
+                matrix.record(result)
+        return matrix
+
+    def _already_loaded(self, result: Dict) -> bool:
+        loaded_through = self._loaded_through
+        if isinstance(loaded_through, dict):
+            loaded_through = loaded_through.get(result.get('school'))
+        return loaded_through is not None and result.get('seq') is not None and result['seq'] <= loaded_through
+
+    @staticmethod
+    def _grow(array: np.ndarray, rows: int, cols: int) -> np.ndarray:
+        """array with room for at least rows x cols cells, doubling the dimensions that are too small"""
+        if rows <= array.shape[0] and cols <= array.shape[1]:
+            return array
+        shape = tuple(max(needed, 2 * size) if needed > size else size
+                      for needed, size in zip((rows, cols), array.shape))
+        grown = np.zeros(shape, dtype=array.dtype)
+        grown[:array.shape[0], :array.shape[1]] = array
+        return grown
+
+    def record(self, result: Dict):
+        """Add one test result (student_id, topic_id, category, score, seq) to its cell"""
+        if self._already_loaded(result):
+            return
+        with self._lock:
+            row = self._students.setdefault(result['student_id'], len(self._students))
+            col = self._topics.get(result['topic_id'])
+            if col is None:
+                col = self._topics[result['topic_id']] = len(self._topics)
+                category = self._categories.setdefault(result.get('category') or 'Custom', len(self._categories))
+                self._topic_category = np.append(self._topic_category, np.int32(category))
+            self._sums = self._grow(self._sums, len(self._students), len(self._topics))
+            self._counts = self._grow(self._counts, len(self._students), len(self._topics))
+            self._sums[row, col] += result['score']
+            self._counts[row, col] += 1
+            self.version += 1
+
+    def heatmap(self, student_ids: Sequence[str], by: str = 'topic') -> Tuple[List[str], np.ndarray]:
+        """Column keys (topic ids or categories) and average scores for the given students, in their order.
+
+        Students without results have an all-NaN row.
+        """
+        with self._lock:
+            n_topics = len(self._topics)
+            sums = self._sums[:len(self._students), :n_topics]
+            counts = self._counts[:len(self._students), :n_topics]
+            columns = list(self._topics)
+            if by == 'category':
+                # Sum topic columns into their category with one matrix product
+                membership = np.zeros((n_topics, len(self._categories)))
+                membership[np.arange(n_topics), self._topic_category] = 1.0
+                sums, counts = sums @ membership, counts @ membership
+                columns = list(self._categories)
+            rows = np.array([self._students.get(s, -1) for s in student_ids], dtype=np.int64)
+            known = rows >= 0
+            scores = np.full((len(rows), len(columns)), np.nan)
+            scores[known] = mastery_matrix(sums[rows[known]], counts[rows[known]])
+        return columns, scores
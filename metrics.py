@@ -0,0 +1,245 @@
+"""In-process metrics exported in the Prometheus text exposition format.
+
+Metrics live for the lifetime of the server process. They can be scraped from
+a small HTTP endpoint (WIDA_METRICS_PORT) or written to a file for the
+node_exporter textfile collector (WIDA_METRICS_FILE).
+"""
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set"""
+
+    type_name = 'counter'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def total(self) -> float:
+        """Sum over every label set"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+                for key, value in items]
+
+
+class Gauge(Counter):
+    """Value per label set that can go up and down"""
+
+    type_name = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts, sum and count per label set"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+            series['sum'] += value
+            series['count'] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, dict(series, buckets=list(series['buckets'])))
+                           for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series['buckets']):
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(series["sum"])}')
+            lines.append(f'{self.name}_count{labels} {series["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    """A named collection of metrics that renders as one Prometheus exposition"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type_name}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+PAGE_RENDER_SECONDS = registry.histogram(
+    'wida_page_render_seconds', 'Duration of one script run, by page, role and how the run ended',
+    ['page', 'role', 'outcome'])
+SCRIPT_RUNS = registry.counter(
+    'wida_script_runs_total', 'Script runs (initial runs and reruns) per page and role', ['page', 'role'])
+EXPLICIT_RERUNS = registry.counter(
+    'wida_reruns_total', 'Runs that ended in st.rerun(), per page and role', ['page', 'role'])
+
+GITHUB_SYNC_BACKLOG = registry.gauge(
+    'wida_github_sync_backlog', 'Rows waiting to be pushed to GitHub, by kind', ['kind'])
+GITHUB_SYNCED = registry.counter(
+    'wida_github_synced_total', 'Rows pushed to GitHub by the reconciler, by kind', ['kind'])
+GITHUB_SYNC_FAILURES = registry.counter(
+    'wida_github_sync_failures_total', 'Rows the reconciler failed to push, by kind', ['kind'])
+GITHUB_SYNC_DRAIN_RATE = registry.gauge(
+    'wida_github_sync_drain_rate', 'Rows per second pushed by the last reconciler run, by kind', ['kind'])
+
+
+def record_sync_run(kind: str, backlog: int, synced: int, failed: int, duration: float):
+    """Record one reconciler pass over the unsynced rows of one kind"""
+    GITHUB_SYNC_BACKLOG.set(backlog, kind=kind)
+    GITHUB_SYNCED.inc(synced, kind=kind)
+    GITHUB_SYNC_FAILURES.inc(failed, kind=kind)
+    GITHUB_SYNC_DRAIN_RATE.set(synced / duration if duration > 0 else 0.0, kind=kind)
+
+
+def record_script_run(page: str, role: str, outcome: str, duration: float):
+    """Record one run of the Streamlit script; outcome is 'rendered', 'rerun' or 'error'"""
+    SCRIPT_RUNS.inc(page=page, role=role)
+    PAGE_RENDER_SECONDS.observe(duration, page=page, role=role, outcome=outcome)
+    if outcome == 'rerun':
+        EXPLICIT_RERUNS.inc(page=page, role=role)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        payload = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, addr: str = '127.0.0.1',
+                      metrics_registry: MetricsRegistry = registry) -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread"""
+    server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.registry = metrics_registry
+    threading.Thread(target=server.serve_forever, daemon=True, name='wida-metrics').start()
+    return server
+
+
+def write_textfile(path: str, metrics_registry: MetricsRegistry = registry):
+    """Atomically write the exposition to path (for the node_exporter textfile collector)"""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(metrics_registry.render())
+    os.replace(tmp_path, path)
+
+
+class TextfileWriter:
+    """Writes the exposition to a file at most once per interval"""
+
+    def __init__(self, path: str, interval: float = 5.0):
+        self.path = path
+        self.interval = interval
+        self._last_write = 0.0
+        self._lock = threading.Lock()
+
+    def maybe_write(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_write < self.interval:
+                return
+            self._last_write = now
+        write_textfile(self.path)
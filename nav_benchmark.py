@@ -0,0 +1,122 @@
+"""Count the script runs each navigation click costs.
+
+Drives app.py headlessly with Streamlit's AppTest against a fresh database in
+a temporary directory, clicks through the main navigation paths and reads the
+script-run counters from metrics.py. A click that navigates with a callback
+costs one run; one that sets the page and calls st.rerun() costs two.
+
+Usage:
+    python nav_benchmark.py
+    python nav_benchmark.py --repeat 5 --output nav.json --max-runs 1
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+import metrics
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'app.py')
+
+
+def _click(key: str = None, label: str = None) -> Callable:
+    """Action that clicks the button with this key (or label) and runs the script"""
+    def action(at):
+        button = next(b for b in at.button if (key and b.key == key) or (label and b.label == label))
+        button.click().run()
+    return action
+
+
+def _sign_in(unique_id: str) -> Callable:
+    def action(at):
+        at.text_input(key='login_unique_id').input(unique_id)
+        _click(label="Sign In")(at)
+    return action
+
+
+# (name, action), run in order on one session
+SCENARIO: List[Tuple[str, Callable]] = [
+    ('landing -> login', _click(key='nav_login')),
+    ('login -> register', _click(key='nav_register')),
+    ('register -> login', _click(key='nav_login')),
+    ('sign in (student)', _sign_in('student1')),
+    ('dashboard -> analytics', _click(key='nav_analytics')),
+    ('analytics -> dashboard', _click(key='nav_dashboard')),
+    ('dashboard -> test', _click(key='topic_reading-1')),
+    ('submit test', _click(label="Submit Test")),
+    ('result -> dashboard', _click(label="← Back to Dashboard")),
+    ('logout', _click(key='nav_logout')),
+    ('landing -> login (master)', _click(key='nav_login')),
+    ('sign in (master)', _sign_in('KRURA')),
+    ('dashboard -> management', _click(key='nav_syllabus_management')),
+    ('management -> student analytics', _click(key='nav_master_analytics')),
+    ('student analytics -> dashboard', _click(key='nav_dashboard')),
+]
+
+
+def run_scenario() -> List[Dict]:
+    """Runs, reruns and wall time of every step of one pass through the scenario"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=120)
+    at.secrets['github_token'] = ''
+    at.run()
+    steps = []
+    for name, action in SCENARIO:
+        runs, reruns = metrics.SCRIPT_RUNS.total(), metrics.EXPLICIT_RERUNS.total()
+        started = time.perf_counter()
+        action(at)
+        elapsed = time.perf_counter() - started
+        if at.exception:
+            raise RuntimeError(f"{name}: {at.exception[0].value}")
+        steps.append({'step': name, 'page': at.session_state.page,
+                      'runs': int(metrics.SCRIPT_RUNS.total() - runs),
+                      'reruns': int(metrics.EXPLICIT_RERUNS.total() - reruns),
+                      'ms': round(elapsed * 1000, 1)})
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count script runs per navigation click")
+    parser.add_argument('--repeat', type=int, default=3, help="Passes through the scenario; the fastest is kept")
+    parser.add_argument('--output', help="Write the JSON report to this file")
+    parser.add_argument('--max-runs', type=int, help="Fail if any navigation takes more script runs than this")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(APP_PATH))
+    # Each pass starts from an empty database with the seeded demo users
+    passes = []
+    for _ in range(args.repeat):
+        with tempfile.TemporaryDirectory(prefix='wida-nav-') as workdir:
+            previous = os.getcwd()
+            os.chdir(workdir)
+            try:
+                passes.append(run_scenario())
+            finally:
+                os.chdir(previous)
+
+    steps = [dict(step, ms=min(p[i]['ms'] for p in passes)) for i, step in enumerate(passes[0])]
+    print(f"{'Navigation':<34} {'Page':<20} {'Runs':>4} {'Reruns':>6} {'Fastest ms':>10}")
+    for step in steps:
+        print(f"{step['step']:<34} {step['page']:<20} {step['runs']:>4} {step['reruns']:>6} {step['ms']:>10.1f}")
+    total_runs = sum(s['runs'] for s in steps)
+    print(f"{len(steps)} navigations, {total_runs} script runs ({total_runs / len(steps):.2f} per navigation)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'repeat': args.repeat, 'steps': steps}, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.max_runs is not None:
+        over = [s for s in steps if s['runs'] > args.max_runs]
+        for step in over:
+            print(f"TOO MANY RUNS {step['step']}: {step['runs']} > {args.max_runs}")
+        if over:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
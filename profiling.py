@@ -0,0 +1,86 @@
+"""Opt-in cProfile capture of single Streamlit script runs.
+
+Profiling is off unless WIDA_PROFILING=1. When it is on, a master can profile
+one run of a page with ?profile=<page> (or every session's first run of
+WIDA_PROFILE_PAGE). Each run is written as a pstats file to WIDA_PROFILE_DIR,
+named after the page and the data sizes it ran against, and only the newest
+WIDA_PROFILE_RETENTION files are kept.
+
+Inspect a profile with:
+    python -m pstats profiles/<file>.pstats
+"""
+import cProfile
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List
+
+PROFILE_SUFFIX = '.pstats'
+DEFAULT_PROFILE_DIR = 'profiles'
+DEFAULT_RETENTION = 20
+
+
+def profiling_enabled() -> bool:
+    return os.environ.get('WIDA_PROFILING') == '1'
+
+
+def profile_dir() -> str:
+    return os.environ.get('WIDA_PROFILE_DIR', DEFAULT_PROFILE_DIR)
+
+
+def profile_retention() -> int:
+    return int(os.environ.get('WIDA_PROFILE_RETENTION', DEFAULT_RETENTION))
+
+
+def profile_filename(page: str, data_sizes: Dict[str, int]) -> str:
+    """e.g. 20250630T150000123456_master_analytics_users2500-test_results100000.pstats"""
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    safe_page = re.sub(r'[^A-Za-z0-9_]+', '-', page)
+    sizes = '-'.join(f'{name}{count}' for name, count in data_sizes.items())
+    return f"{stamp}_{safe_page}_{sizes}{PROFILE_SUFFIX}"
+
+
+def list_profiles(directory: str) -> List[Dict]:
+    """Profiles in directory, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in os.listdir(directory):
+        if name.endswith(PROFILE_SUFFIX):
+            path = os.path.join(directory, name)
+            profiles.append({'name': name, 'path': path, 'size_bytes': os.path.getsize(path)})
+    profiles.sort(key=lambda p: p['name'], reverse=True)
+    return profiles
+
+
+def enforce_retention(directory: str, keep: int):
+    """Delete all but the newest keep profiles"""
+    for profile in list_profiles(directory)[keep:]:
+        try:
+            os.remove(profile['path'])
+        except FileNotFoundError:
+            pass
+
+
+@contextmanager
+def profile_run(page: str, data_sizes: Callable[[], Dict[str, int]], directory: str = None,
+                retention: int = None) -> Iterator[Dict]:
+    """Profile the enclosed block and write it to a pstats file.
+
+    data_sizes is only called after profiling stops, so counting rows does
+    not show up in the profile. The yielded dict receives the file path.
+    """
+    directory = directory or profile_dir()
+    retention = retention if retention is not None else profile_retention()
+    info = {'path': None}
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield info
+    finally:
+        profiler.disable()
+        os.makedirs(directory, exist_ok=True)
+        info['path'] = os.path.join(directory, profile_filename(page, data_sizes()))
+        profiler.dump_stats(info['path'])
+        enforce_retention(directory, retention)
@@ -0,0 +1,243 @@
+"""Per-statement timing for the SQLite layer.
+
+Connections opened through connect() time every execute/executemany, the
+fetches that follow them and every commit. Each finished statement is
+recorded in a QueryProfiler: a bounded ring buffer of recent statements,
+per-statement totals, and a slow-query log for anything above a threshold.
+"""
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+slow_query_logger = logging.getLogger('wida.slow_queries')
+
+
+def normalize_statement(sql: str) -> str:
+    """Collapse whitespace so the same statement always aggregates under one key"""
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+class QueryProfiler:
+    """Collects timings for every statement run on profiled connections"""
+
+    def __init__(self, capacity: int = 500, slow_query_ms: float = None, slow_log_capacity: int = 200):
+        if slow_query_ms is None:
+            slow_query_ms = float(os.environ.get('WIDA_SLOW_QUERY_MS', 100))
+        self.slow_query_ms = slow_query_ms
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=capacity)
+        self._slow = deque(maxlen=slow_log_capacity)
+        self._stats = {}
+
+    def record(self, sql: str, param_count: Optional[int], row_count: int, duration: float,
+               executions: int = 1):
+        statement = normalize_statement(sql)
+        duration_ms = duration * 1000
+        entry = {
+            'statement': statement,
+            'param_count': param_count,
+            'executions': executions,
+            'row_count': row_count,
+            'duration_ms': round(duration_ms, 3),
+            'recorded_at': datetime.now().isoformat(timespec='milliseconds')
+        }
+
+        with self._lock:
+            self._recent.append(entry)
+            stats = self._stats.get(statement)
+            if stats is None:
+                stats = self._stats[statement] = {
+                    'statement': statement, 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'rows': 0
+                }
+            stats['calls'] += 1
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['rows'] += row_count
+            if duration_ms >= self.slow_query_ms:
+                self._slow.append(entry)
+
+        if duration_ms >= self.slow_query_ms:
+            slow_query_logger.warning("Slow query (%.1f ms, %d rows, %s params): %s",
+                                      duration_ms, row_count, param_count, statement)
+
+    def recent_queries(self) -> List[Dict]:
+        """Most recent statements first"""
+        with self._lock:
+            return list(reversed(self._recent))
+
+    def slow_queries(self) -> List[Dict]:
+        """Statements above the slow-query threshold, most recent first"""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def top_queries(self, limit: int = 20, order_by: str = 'total_ms') -> List[Dict]:
+        """Per-statement totals, by default ordered by total time spent"""
+        with self._lock:
+            stats = [dict(s) for s in self._stats.values()]
+        for s in stats:
+            s['avg_ms'] = round(s['total_ms'] / s['calls'], 3)
+            s['total_ms'] = round(s['total_ms'], 3)
+            s['max_ms'] = round(s['max_ms'], 3)
+        stats.sort(key=lambda s: s[order_by], reverse=True)
+        return stats[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._recent.clear()
+            self._slow.clear()
+            self._stats.clear()
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Cursor that attributes execute and fetch time to the statement that produced the rows"""
+
+    def __init__(self, connection: 'ProfiledConnection'):
+        super().__init__(connection)
+        self._profiler = connection.profiler
+        self._pending = None
+
+    def _start(self, sql: str, param_count: Optional[int], executions: int, duration: float):
+        self._pending = {'sql': sql, 'param_count': param_count, 'executions': executions,
+                         'duration': duration, 'fetched': 0}
+        # Statements without a result set have no fetches to wait for
+        if self.description is None:
+            self._finish()
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        # Queries report the rows fetched; DML reports the rows changed
+        row_count = pending['fetched'] if self.description is not None else max(self.rowcount, 0)
+        self._profiler.record(pending['sql'], pending['param_count'], row_count,
+                              pending['duration'], pending['executions'])
+
+    def _add_fetch(self, duration: float, rows: int):
+        if self._pending is not None:
+            self._pending['duration'] += duration
+            self._pending['fetched'] += rows
+
+    def execute(self, sql, parameters=()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._start(sql, len(parameters), 1, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._finish()
+        executions = param_count = None
+        if isinstance(seq_of_parameters, (list, tuple)):
+            executions = len(seq_of_parameters)
+            param_count = len(seq_of_parameters[0]) if seq_of_parameters else 0
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._start(sql, param_count, executions or max(self.rowcount, 0), time.perf_counter() - started)
+
+    def executescript(self, sql_script):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            self._start(sql_script, 0, 1, time.perf_counter() - started)
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._add_fetch(time.perf_counter() - started, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, size=None):
+        started = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._add_fetch(time.perf_counter() - started, len(rows))
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._add_fetch(time.perf_counter() - started, len(rows))
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._add_fetch(time.perf_counter() - started, 0)
+            self._finish()
+            raise
+        self._add_fetch(time.perf_counter() - started, 1)
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # A cursor dropped before its rows ran out still records its statement
+        try:
+            self._finish()
+        except sqlite3.ProgrammingError:
+            pass
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose cursors and commits are timed by the attached profiler"""
+
+    profiler: QueryProfiler = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cursors = weakref.WeakSet()
+
+    def cursor(self, factory=ProfiledCursor):
+        cursor = super().cursor(factory)
+        if isinstance(cursor, ProfiledCursor):
+            self._cursors.add(cursor)
+        return cursor
+
+    # The C implementations of these shortcuts bypass cursor(), so route them through it
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
+
+    def _finish_cursors(self):
+        for cursor in list(self._cursors):
+            cursor._finish()
+
+    def commit(self):
+        self._finish_cursors()
+        started = time.perf_counter()
+        try:
+            super().commit()
+        finally:
+            self.profiler.record('COMMIT', 0, 0, time.perf_counter() - started)
+
+    def close(self):
+        self._finish_cursors()
+        self._cursors.clear()
+        super().close()
+
+
+def connect(db_path: str, profiler: QueryProfiler, **kwargs) -> sqlite3.Connection:
+    """Open a SQLite connection whose statements are recorded by profiler"""
+    conn = sqlite3.connect(db_path, factory=ProfiledConnection, **kwargs)
+    conn.profiler = profiler
+    return conn
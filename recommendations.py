@@ -0,0 +1,141 @@
+"""Batch next-topic recommendations for every student at once.
+
+From the student x topic mastery matrix (see mastery.py):
+- Prerequisites: within a category, a topic opens up once the student has
+  mastered a topic one difficulty level below it. Topics without an easier
+  topic in their category are always open.
+- Collaborative filtering: a student's score on an untaken topic is predicted
+  from their scores on similar topics, with topic-topic cosine similarity of
+  the mean-centred scores.
+- Priority: the predicted score, plus a bonus for the next step in a category
+  the student is progressing through and for reviewing topics taken but not
+  yet mastered. Mastered and locked topics are never recommended.
+
+The top N topics per student are stored in topic_recommendations, and the
+dashboard reads them with one indexed query.
+
+Usage:
+    python recommendations.py --db wida_app.db --top-n 3
+    python recommendations.py --shard-directory shards/directory.db
+"""
+import argparse
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from mastery import DIFFICULTY_ORDER, MASTERY_THRESHOLD, build_score_arrays, mastery_matrix
+
+DEFAULT_TOP_N = 3
+# Added to the predicted score (as a fraction) by reason for recommending
+REASON_BONUS = {'next_step': 0.3, 'review': 0.2, 'start_here': 0.0}
+
+
+def prerequisite_matrix(categories: np.ndarray, levels: np.ndarray) -> np.ndarray:
+    """prereq[j, t] is True when topic j is one difficulty level below topic t in the same category"""
+    return (categories[:, None] == categories[None, :]) & (levels[:, None] == levels[None, :] - 1)
+
+
+def predict_scores(scores: np.ndarray) -> np.ndarray:
+    """Predicted score for every cell by item-based collaborative filtering"""
+    taken = ~np.isnan(scores)
+    filled = np.where(taken, scores, 0.0)
+    overall = filled.sum() / taken.sum() if taken.any() else 50.0
+    with np.errstate(invalid='ignore', divide='ignore'):
+        topic_mean = np.where(taken.any(axis=0), filled.sum(axis=0) / taken.sum(axis=0), overall)
+        student_mean = filled.sum(axis=1) / taken.sum(axis=1)  # NaN for students with no results
+
+        centred = np.where(taken, scores - student_mean[:, None], 0.0)
+        norms = np.sqrt((centred ** 2).sum(axis=0))
+        similarity = (centred.T @ centred) / np.maximum(np.outer(norms, norms), 1e-9)
+        np.fill_diagonal(similarity, 0.0)
+
+        weight = taken.astype(float) @ np.abs(similarity)
+        deviation = (centred @ similarity) / np.where(weight > 0, weight, 1.0)
+        predicted = np.where(weight > 0, student_mean[:, None] + deviation, topic_mean[None, :])
+        predicted = np.where(np.isnan(predicted), topic_mean[None, :], predicted)
+    return np.clip(predicted, 0.0, 100.0)
+
+
+def recommend(sums: np.ndarray, counts: np.ndarray, topics: List[Dict],
+              top_n: int = DEFAULT_TOP_N) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Rank topics for every student.
+
+    Returns (topic indices, priorities, predicted scores, reason codes), each
+    students x top_n; cells without a recommendation have priority -inf.
+    """
+    reasons = list(REASON_BONUS)
+    scores = mastery_matrix(sums, counts)
+    taken = counts > 0
+    mastered = taken & (np.nan_to_num(scores) >= MASTERY_THRESHOLD)
+
+    categories = np.unique([t['category'] for t in topics], return_inverse=True)[1]
+    levels = np.array([DIFFICULTY_ORDER.get(t['difficulty'], 1) for t in topics])
+    prereq = prerequisite_matrix(categories, levels)
+    has_prereq = prereq.any(axis=0)
+    progressed = (mastered.astype(np.int32) @ prereq.astype(np.int32)) > 0
+    unlocked = progressed | ~has_prereq[None, :]
+
+    predicted = predict_scores(scores)
+    reason = np.where(taken, reasons.index('review'),
+                      np.where(progressed, reasons.index('next_step'), reasons.index('start_here')))
+    bonus = np.array([REASON_BONUS[r] for r in reasons])[reason]
+    priority = np.where(unlocked & ~mastered, predicted / 100.0 + bonus, -np.inf)
+
+    top_n = min(top_n, priority.shape[1])
+    order = np.argsort(-priority, axis=1, kind='stable')[:, :top_n]
+    pick = lambda matrix: np.take_along_axis(matrix, order, axis=1)
+    return order, pick(priority), pick(predicted), pick(reason)
+
+
+def recommendation_rows(student_ids: List[str], topics: List[Dict], sums: np.ndarray, counts: np.ndarray,
+                        top_n: int = DEFAULT_TOP_N) -> List[Tuple[str, int, str, float, float, str]]:
+    """(student_id, rank, topic_id, priority, predicted_score, reason) rows for topic_recommendations"""
+    reasons = list(REASON_BONUS)
+    order, priority, predicted, reason = recommend(sums, counts, topics, top_n)
+    rows = []
+    for s, student_id in enumerate(student_ids):
+        for rank in range(order.shape[1]):
+            if not np.isfinite(priority[s, rank]):
+                break
+            rows.append((student_id, rank + 1, topics[order[s, rank]]['id'], round(float(priority[s, rank]), 4),
+                         round(float(predicted[s, rank]), 1), reasons[reason[s, rank]]))
+    return rows
+
+
+def refresh_recommendations(db, top_n: int = DEFAULT_TOP_N) -> Dict:
+    """Recompute and store recommendations for every student in one database"""
+    started = time.perf_counter()
+    student_ids = db.get_student_ids()
+    topics = db.get_topics()
+    sums, counts = build_score_arrays(db.get_mastery_rows(), student_ids, [t['id'] for t in topics])
+    rows = recommendation_rows(student_ids, topics, sums, counts, top_n)
+    db.save_recommendations(rows)
+    return {'students': len(student_ids), 'topics': len(topics), 'recommendations': len(rows),
+            'seconds': round(time.perf_counter() - started, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute next-topic recommendations for every student")
+    parser.add_argument('--db', default='wida_app.db')
+    parser.add_argument('--shard-directory', help="Recompute for every shard in this directory.db")
+    parser.add_argument('--top-n', type=int, default=DEFAULT_TOP_N, help="Recommendations kept per student")
+    args = parser.parse_args()
+
+    from enhanced_backend import EnhancedDatabaseManager
+
+    if args.shard_directory:
+        from sharding import ShardDirectory
+        targets = list(ShardDirectory(args.shard_directory).get_schools().values())
+    else:
+        targets = [args.db]
+
+    for db_path in targets:
+        db = EnhancedDatabaseManager(db_path=db_path, use_github=False, use_write_queue=False)
+        report = refresh_recommendations(db, args.top_n)
+        print(f"{db_path}: {report['recommendations']:,} recommendations for {report['students']:,} students "
+              f"over {report['topics']} topics in {report['seconds']}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+"""Term report cards for every student, generated in one batch.
+
+The data for all students comes from three set-based queries (see
+get_report_card_data). Each card is a self-contained HTML page with the
+profile, category averages, a weekly trend chart drawn as inline SVG, and the
+goals and achievements from the student's profile. Cards are rendered one
+after another and written into one zip archive as they are rendered;
+rendering takes about as long as compressing, and a process pool forked from
+the app server gained nothing over this.
+
+The pages carry print styles, so a browser's "Save as PDF" gives a one-page
+PDF per student; no PDF library is needed.
+
+Usage:
+    python report_cards.py --db wida_app.db --term "Spring 2025" --since 2025-01-01 --until 2025-07-01
+    python report_cards.py --shard-directory shards/directory.db --out report_cards.zip
+"""
+import argparse
+import html
+import os
+import re
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from typing import IO, Dict, List
+
+from export import remove_stale_spools
+
+# Category averages at or above STRENGTH are strengths, below IMPROVEMENT need work
+STRENGTH, IMPROVEMENT = 80, 60
+SPOOL_PREFIX = 'wida-report-cards-'
+
+CARD_STYLE = """
+body { font-family: 'Comic Neue', 'Fredoka', sans-serif; color: #2E4057; margin: 2rem; }
+h1 { color: #6C5CE7; margin-bottom: 0; }
+h2 { color: #2E4057; border-bottom: 2px solid #FFE5B4; padding-bottom: 0.2rem; }
+.term { color: #888; margin-top: 0.2rem; }
+.stats { display: flex; gap: 2rem; }
+.stat { background: #FFF8DC; border-radius: 12px; padding: 0.8rem 1.2rem; }
+.stat strong { display: block; font-size: 1.6rem; }
+table { border-collapse: collapse; }
+td, th { padding: 0.3rem 0.8rem; text-align: left; }
+@page { size: A4; margin: 1.5cm; }
+@media print { body { margin: 0; } }
+"""
+
+
+def score_color(score: float) -> str:
+    return '#4ade80' if score >= 70 else '#fbbf24' if score >= 50 else '#ef4444'
+
+
+def category_chart(averages: Dict[str, float], width: int = 480, bar_height: int = 22) -> str:
+    """Horizontal bar chart of category averages as inline SVG"""
+    label_width = 140
+    bars = []
+    for i, (category, average) in enumerate(sorted(averages.items())):
+        y = i * (bar_height + 6)
+        length = (width - label_width - 50) * average / 100
+        bars.append(
+            f'<text x="0" y="{y + bar_height - 6}" font-size="13">{html.escape(category)}</text>'
+            f'<rect x="{label_width}" y="{y}" width="{length:.1f}" height="{bar_height}" rx="4" '
+            f'fill="{score_color(average)}"/>'
+            f'<text x="{label_width + length + 6:.1f}" y="{y + bar_height - 6}" font-size="13">{average:.0f}%</text>'
+        )
+    height = len(averages) * (bar_height + 6)
+    return f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">{"".join(bars)}</svg>'
+
+
+def trend_chart(trend: List[Dict], width: int = 480, height: int = 160) -> str:
+    """Weekly average score line (0-100%) as inline SVG"""
+    pad = 24
+    step = (width - 2 * pad) / max(len(trend) - 1, 1)
+    points = [(pad + i * step, height - pad - (height - 2 * pad) * week['avg_score'] / 100)
+              for i, week in enumerate(trend)]
+    line = ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+    markers = ''.join(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="#6C5CE7"><title>'
+                      f'{html.escape(week["bucket"])}: {week["avg_score"]:.0f}%</title></circle>'
+                      for (x, y), week in zip(points, trend))
+    axis = (f'<line x1="{pad}" y1="{height - pad}" x2="{width - pad}" y2="{height - pad}" stroke="#ccc"/>'
+            f'<text x="0" y="{pad}" font-size="11">100%</text>'
+            f'<text x="0" y="{height - pad}" font-size="11">0%</text>'
+            f'<text x="{pad}" y="{height - 6}" font-size="11">{html.escape(trend[0]["bucket"])}</text>'
+            f'<text x="{width - pad}" y="{height - 6}" font-size="11" text-anchor="end">'
+            f'{html.escape(trend[-1]["bucket"])}</text>')
+    return (f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">{axis}'
+            f'<polyline points="{line}" fill="none" stroke="#6C5CE7" stroke-width="2"/>{markers}</svg>')
+
+
+def bullet_list(items: List[str], empty: str) -> str:
+    if not items:
+        return f'<p><em>{empty}</em></p>'
+    return '<ul>' + ''.join(f'<li>{html.escape(str(item))}</li>' for item in items) + '</ul>'
+
+
+def render_report_card(card: Dict, term: str) -> str:
+    """One student's report card as a standalone HTML page"""
+    name = html.escape(f"{card['first_name'] or ''} {card['last_name'] or ''}".strip() or card['unique_id'])
+    total_tests = sum(count for count, _ in card['categories'].values())
+    total_score = sum(score_sum for _, score_sum in card['categories'].values())
+    averages = {category: score_sum / count for category, (count, score_sum) in card['categories'].items()}
+    strengths = [f"{c} ({a:.0f}%)" for c, a in sorted(averages.items()) if a >= STRENGTH]
+    improvements = [f"{c} ({a:.0f}%)" for c, a in sorted(averages.items()) if a < IMPROVEMENT]
+    analytics = card['analytics']
+
+    sections = [
+        f'<h1>{name}</h1><p class="term">{html.escape(term)} report card · ID {html.escape(card["unique_id"])}'
+        f' · born {html.escape(str(card["date_of_birth"] or "-"))}</p>',
+        '<div class="stats">'
+        f'<div class="stat">Tests taken<strong>{total_tests}</strong></div>'
+        f'<div class="stat">Average score<strong>{total_score / total_tests if total_tests else 0:.1f}%</strong></div>'
+        f'<div class="stat">Categories<strong>{len(averages)}</strong></div></div>',
+        '<h2>Scores by Category</h2>',
+        category_chart(averages) if averages else '<p><em>No tests this term.</em></p>',
+    ]
+    if len(card['weekly_trend']) > 1:
+        sections += ['<h2>Weekly Progress</h2>', trend_chart(card['weekly_trend'])]
+    sections += [
+        '<table><tr><th>Strengths</th><th>Keep practising</th></tr><tr>'
+        f'<td>{bullet_list(strengths, "None yet")}</td><td>{bullet_list(improvements, "None")}</td></tr></table>',
+        '<h2>Goals</h2>', bullet_list(analytics.get('goals', []), "No goals set."),
+        '<h2>Achievements</h2>', bullet_list(analytics.get('achievements', []), "No achievements recorded."),
+    ]
+    if analytics.get('study_notes'):
+        sections += ['<h2>Teacher Notes</h2>', f'<p>{html.escape(analytics["study_notes"])}</p>']
+
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{name} - {html.escape(term)}</title>'
+            f'<style>{CARD_STYLE}</style></head><body>{"".join(sections)}</body></html>')
+
+
+def card_filename(card: Dict) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', card['unique_id']) + '.html'
+
+
+def write_report_cards(cards: List[Dict], out: IO[bytes], term: str) -> int:
+    """Render the cards into a zip archive; returns the number of cards"""
+    with zipfile.ZipFile(out, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for card in cards:
+            archive.writestr(card_filename(card), render_report_card(card, term))
+        links = ''.join(f'<li><a href="{card_filename(c)}">{html.escape(c["unique_id"])} - '
+                        f'{html.escape(c["first_name"] or "")} {html.escape(c["last_name"] or "")}</a></li>'
+                        for c in cards)
+        archive.writestr('index.html', f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>'
+                                       f'{html.escape(term)} report cards</title></head><body><h1>'
+                                       f'{html.escape(term)} report cards</h1><ul>{links}</ul></body></html>')
+    return len(cards)
+
+
+def generate_report_cards(db, out: IO[bytes], term: str = None, since: str = None, until: str = None) -> Dict:
+    """Write every student's report card for results in [since, until) to a zip archive"""
+    started = time.perf_counter()
+    term = term or datetime.now().strftime('%B %Y')
+    cards = db.get_report_card_data(since, until)
+    queried = time.perf_counter()
+    count = write_report_cards(cards, out, term)
+    return {'students': count, 'query_seconds': round(queried - started, 2),
+            'render_seconds': round(time.perf_counter() - queried, 2)}
+
+
+def spool_report_cards(db, **options) -> str:
+    """Generate the archive in a temporary file and return its path.
+
+    The caller deletes it when it is replaced; files left behind are swept after export.SPOOL_MAX_AGE.
+    """
+    remove_stale_spools(SPOOL_PREFIX)
+    handle, path = tempfile.mkstemp(prefix=SPOOL_PREFIX, suffix='.zip')
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            generate_report_cards(db, out, **options)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a report card for every student")
+    parser.add_argument('--db', default='wida_app.db')
+    parser.add_argument('--shard-directory', help="Include the students of every shard in this directory.db")
+    parser.add_argument('--term', help="Term name printed on the cards (default: current month)")
+    parser.add_argument('--since', help="Only results submitted on or after this date (YYYY-MM-DD)")
+    parser.add_argument('--until', help="Only results submitted before this date (YYYY-MM-DD)")
+    parser.add_argument('--out', default='report_cards.zip')
+    args = parser.parse_args()
+
+    if args.shard_directory:
+        from sharding import ShardedDatabaseManager
+        db = ShardedDatabaseManager(args.shard_directory, use_github=False, use_write_queue=False)
+    else:
+        from enhanced_backend import EnhancedDatabaseManager
+        db = EnhancedDatabaseManager(db_path=args.db, use_github=False, use_write_queue=False)
+
+    with open(args.out, 'wb') as out:
+        report = generate_report_cards(db, out, args.term, args.since, args.until)
+    print(f"Wrote {report['students']:,} report cards to {args.out} (queries {report['query_seconds']}s, "
+          f"rendering {report['render_seconds']}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Retention policy for test results: move old results to the archive database.
+
+Archived results stay queryable. Reads only open the archive when the date range
+they ask for reaches past the archive watermark.
+
+Usage:
+    python retention.py --older-than-days 365
+    python retention.py --before 2025-01-01 --db wida_app.db --archive wida_archive.db
+    python retention.py --status
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+DEFAULT_RETENTION_DAYS = 365
+
+
+def retention_cutoff(days: int, now: datetime = None) -> str:
+    """Start of the day `days` days ago, in the format test_results.submitted_at uses"""
+    cutoff = (now or datetime.now()) - timedelta(days=days)
+    return cutoff.strftime('%Y-%m-%d 00:00:00')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move old test results into the archive database")
+    parser.add_argument('--db', default='wida_app.db')
+    parser.add_argument('--archive', help="Archive file for the first run (default: <db>_archive.db)")
+    parser.add_argument('--shard-directory', help="Apply the policy to every shard in this directory.db")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--older-than-days', type=int,
+                       default=int(os.environ.get('WIDA_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)),
+                       help="Archive results older than this many days (default: WIDA_RETENTION_DAYS or 365)")
+    group.add_argument('--before', help="Archive results submitted before this date (YYYY-MM-DD)")
+    group.add_argument('--status', action='store_true', help="Show the archive watermark and size")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    from enhanced_backend import EnhancedDatabaseManager
+
+    if args.shard_directory:
+        from sharding import ShardDirectory
+        targets = list(ShardDirectory(args.shard_directory).get_schools().values())
+    else:
+        targets = [args.db]
+
+    cutoff = args.before or retention_cutoff(args.older_than_days)
+    for db_path in targets:
+        db = EnhancedDatabaseManager(db_path=db_path, use_github=False, use_write_queue=False,
+                                     archive_path=args.archive if not args.shard_directory else None)
+        if args.status:
+            status = db.get_archive_status()
+            if status:
+                print(f"{db_path}: {status['archived_count']:,} results before {status['archived_before']} "
+                      f"in {status['archive_path']}")
+            else:
+                print(f"{db_path}: nothing archived")
+            continue
+        moved = db.archive_results(cutoff, batch_size=args.batch_size)
+        print(f"{db_path}: archived {moved:,} results submitted before {cutoff}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,591 @@
+"""Per-school SQLite shards behind one EnhancedDatabaseManager-shaped router.
+
+A small directory database maps each school to its shard file and each
+student to a school. Student-level calls go straight to the student's shard;
+master-level reads fan out to every shard in parallel and are merged. Topics
+and questions are replicated to every shard, so content reads use the default
+shard and add_topic writes to all of them. Every other call is routed
+explicitly; anything the router does not know raises AttributeError.
+
+Usage:
+    python sharding.py split --source wida_app.db --out-dir shards --assignments schools.csv
+    python sharding.py split --source wida_app.db --out-dir shards --schools 4
+    python sharding.py list --directory shards/directory.db
+
+The assignments CSV has a header row and two columns: student_id,school_id.
+Run the app against the shards with WIDA_SHARD_DIRECTORY=shards/directory.db.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from enhanced_backend import EnhancedDatabaseManager
+from query_profiler import QueryProfiler
+
+DEFAULT_SCHOOL = 'default'
+
+# Tables copied to every shard, and tables split by the student column named here
+REPLICATED_TABLES = ['topics', 'questions', 'item_parameters']
+STUDENT_TABLES = {'test_results': 'student_id', 'question_responses': 'student_id'}
+
+
+class ShardDirectory:
+    """Maps schools to shard files and students to schools"""
+
+    def __init__(self, path: str):
+        self.path = path
+        conn = sqlite3.connect(path)
+        conn.executescript('''
+            CREATE TABLE IF NOT EXISTS schools (
+                school_id TEXT PRIMARY KEY,
+                shard_path TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS student_schools (
+                student_id TEXT PRIMARY KEY,
+                school_id TEXT NOT NULL REFERENCES schools (school_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_student_schools_school ON student_schools (school_id);
+        ''')
+        conn.close()
+
+    def _resolve(self, shard_path: str) -> str:
+        # Relative shard paths are stored relative to the directory file
+        if os.path.isabs(shard_path):
+            return shard_path
+        return os.path.join(os.path.dirname(os.path.abspath(self.path)), shard_path)
+
+    def add_school(self, school_id: str, shard_path: str):
+        conn = sqlite3.connect(self.path)
+        conn.execute('''
+            INSERT INTO schools (school_id, shard_path) VALUES (?, ?)
+            ON CONFLICT (school_id) DO UPDATE SET shard_path = excluded.shard_path
+        ''', (school_id, shard_path))
+        conn.commit()
+        conn.close()
+
+    def get_schools(self) -> Dict[str, str]:
+        """school_id -> absolute shard path"""
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute('SELECT school_id, shard_path FROM schools ORDER BY school_id').fetchall()
+        conn.close()
+        return {school_id: self._resolve(path) for school_id, path in rows}
+
+    def assign_students(self, assignments: Dict[str, str]):
+        conn = sqlite3.connect(self.path)
+        conn.executemany('''
+            INSERT INTO student_schools (student_id, school_id) VALUES (?, ?)
+            ON CONFLICT (student_id) DO UPDATE SET school_id = excluded.school_id
+        ''', list(assignments.items()))
+        conn.commit()
+        conn.close()
+
+    def unassign_student(self, student_id: str):
+        conn = sqlite3.connect(self.path)
+        conn.execute('DELETE FROM student_schools WHERE student_id = ?', (student_id,))
+        conn.commit()
+        conn.close()
+
+    def get_assignments(self) -> Dict[str, str]:
+        """student_id -> school_id for every assigned student"""
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute('SELECT student_id, school_id FROM student_schools').fetchall()
+        conn.close()
+        return dict(rows)
+
+    def school_for(self, student_id: str) -> Optional[str]:
+        conn = sqlite3.connect(self.path)
+        row = conn.execute('SELECT school_id FROM student_schools WHERE student_id = ?', (student_id,)).fetchone()
+        conn.close()
+        return row[0] if row else None
+
+    def student_counts(self) -> Dict[str, int]:
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute('''
+            SELECT s.school_id, COUNT(ss.student_id) FROM schools s
+            LEFT JOIN student_schools ss ON ss.school_id = s.school_id
+            GROUP BY s.school_id ORDER BY s.school_id
+        ''').fetchall()
+        conn.close()
+        return dict(rows)
+
+
+class ShardedDatabaseManager:
+    """Routes EnhancedDatabaseManager calls to per-school shards"""
+
+    LEADERBOARD_SIZE = EnhancedDatabaseManager.LEADERBOARD_SIZE
+
+    # Content reads are identical on every shard, so the default shard answers them
+    CONTENT_READS = frozenset({'get_topics', 'get_topics_by_category', 'get_questions_for_topic',
+                               'get_item_parameters', 'search_content'})
+
+    def __init__(self, directory_path: str, default_school: str = DEFAULT_SCHOOL,
+                 query_profiler: QueryProfiler = None, max_workers: int = 8, **manager_options):
+        self.directory = ShardDirectory(directory_path)
+        schools = self.directory.get_schools()
+        if not schools:
+            raise ValueError(f"No schools registered in {directory_path}")
+        self.default_school = default_school if default_school in schools else next(iter(schools))
+
+        # One profiler for every shard so the performance panel sees all statements
+        if query_profiler is None and os.environ.get('WIDA_QUERY_PROFILING', '1') != '0':
+            query_profiler = QueryProfiler()
+        self.query_profiler = query_profiler
+        self.shards = {
+            school_id: EnhancedDatabaseManager(db_path=path, query_profiler=query_profiler, **manager_options)
+            for school_id, path in schools.items()
+        }
+        self._executor = ThreadPoolExecutor(max_workers=min(max_workers, len(self.shards)),
+                                            thread_name_prefix='wida-shard')
+
+    @property
+    def default_shard(self) -> EnhancedDatabaseManager:
+        return self.shards[self.default_school]
+
+    @property
+    def github_storage(self):
+        return self.default_shard.github_storage
+
+    def shard_for(self, student_id: str) -> EnhancedDatabaseManager:
+        """The student's shard; unknown ids (including masters) use the default shard"""
+        school_id = self.directory.school_for(student_id)
+        return self.shards.get(school_id, self.default_shard)
+
+    def _split_by_school(self, rows: List[Tuple], student_index: int) -> Dict[str, List[Tuple]]:
+        """Rows grouped by the school of the student in column student_index, for every school"""
+        assignments = self.directory.get_assignments()
+        grouped = {school_id: [] for school_id in self.shards}
+        for row in rows:
+            school_id = assignments.get(row[student_index])
+            grouped[school_id if school_id in self.shards else self.default_school].append(row)
+        return grouped
+
+    def _fan_out(self, call: Callable[[EnhancedDatabaseManager], object]) -> List:
+        """Run call on every shard in parallel, results in school order"""
+        return list(self._executor.map(call, self.shards.values()))
+
+    def _executor_map(self, call: Callable[[str], object]) -> List:
+        """Run call with every school id in parallel, results in school order"""
+        return list(self._executor.map(call, self.shards))
+
+    def __getattr__(self, name: str):
+        if name not in self.CONTENT_READS:
+            raise AttributeError(f"{type(self).__name__} does not route '{name}'")
+        return getattr(self.default_shard, name)
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+        self._executor.shutdown()
+
+    # Student-level calls
+
+    def authenticate_user(self, unique_id: str, password: str = None) -> Optional[Dict]:
+        return self.shard_for(unique_id).authenticate_user(unique_id, password)
+
+    def is_password_locked(self, unique_id: str) -> bool:
+        return self.shard_for(unique_id).is_password_locked(unique_id)
+
+    def set_password(self, unique_id: str, password: str) -> bool:
+        return self.shard_for(unique_id).set_password(unique_id, password)
+
+    def register_user(self, unique_id: str, password: str = None, first_name: str = None,
+                      last_name: str = None, date_of_birth: str = None, school_id: str = None) -> bool:
+        school_id = school_id or self.default_school
+        if school_id not in self.shards:
+            raise ValueError(f"Unknown school '{school_id}'")
+        if self.directory.school_for(unique_id) is not None:
+            return False
+        if not self.shards[school_id].register_user(unique_id, password, first_name, last_name, date_of_birth):
+            return False
+        self.directory.assign_students({unique_id: school_id})
+        return True
+
+    def get_user_profile(self, unique_id: str) -> Dict:
+        return self.shard_for(unique_id).get_user_profile(unique_id)
+
+    def update_user_analytics(self, unique_id: str, analytics_data: Dict) -> bool:
+        return self.shard_for(unique_id).update_user_analytics(unique_id, analytics_data)
+
+    def calculate_student_analytics(self, unique_id: str) -> Dict:
+        return self.shard_for(unique_id).calculate_student_analytics(unique_id)
+
+    def remove_user(self, unique_id: str) -> bool:
+        removed = self.shard_for(unique_id).remove_user(unique_id)
+        if removed:
+            self.directory.unassign_student(unique_id)
+        return removed
+
+    def submit_test_result(self, student_id: str, topic_id: str, topic_title: str,
+                           score: int, time_taken: int = None, **kwargs) -> str:
+        return self.shard_for(student_id).submit_test_result(student_id, topic_id, topic_title,
+                                                             score, time_taken, **kwargs)
+
+    def get_student_results(self, student_id: str, since: str = None, until: str = None) -> List[Dict]:
+        return self.shard_for(student_id).get_student_results(student_id, since, until)
+
+    def get_recommendations(self, student_id: str) -> List[Dict]:
+        return self.shard_for(student_id).get_recommendations(student_id)
+
+    def save_recommendations(self, rows: List[Tuple[str, int, str, float, float, str]]):
+        # Every shard is replaced, so shards without rows lose their old recommendations too
+        grouped = self._split_by_school(rows, 0)
+        self._executor_map(lambda school_id: self.shards[school_id].save_recommendations(grouped[school_id]))
+
+    def iter_results(self, student_id: str = None, topic_id: str = None, since: str = None, until: str = None,
+                     batch_size: int = 1000) -> Iterator[Tuple]:
+        if student_id is not None:
+            yield from self.shard_for(student_id).iter_results(student_id, topic_id, since, until, batch_size)
+            return
+        # One shard after another: ordered by submission within each shard only
+        for shard in self.shards.values():
+            yield from shard.iter_results(None, topic_id, since, until, batch_size)
+
+    def get_latest_result_id(self, student_id: str) -> Optional[str]:
+        return self.shard_for(student_id).get_latest_result_id(student_id)
+
+    def get_result_by_id(self, result_id: str) -> Optional[Dict]:
+        # Result ids do not encode the school, so ask every shard
+        return next((r for r in self._fan_out(lambda shard: shard.get_result_by_id(result_id)) if r), None)
+
+    def get_results_since(self, after_seq: int = 0, limit: int = 500) -> List[Dict]:
+        # Each shard numbers its own results, so one position cannot cover them all
+        raise NotImplementedError("result sequence numbers are per shard; read each of .shards")
+
+    # GitHub sync and hydration
+
+    def get_sync_backlog(self) -> Dict[str, int]:
+        backlog = {'users': 0, 'test_results': 0}
+        for shard_backlog in self._fan_out(lambda shard: shard.get_sync_backlog()):
+            for kind, count in shard_backlog.items():
+                backlog[kind] += count
+        return backlog
+
+    def get_unsynced_batch(self, kind: str, after: Tuple[str, str] = None, limit: int = 200) -> List[Dict]:
+        # Every shard pages by the same (timestamp, id) key, so the first `limit` of the merge are the next page
+        timestamp, key = ('registered_at', 'unique_id') if kind == 'users' else ('submitted_at', 'id')
+        records = [r for batch in self._fan_out(lambda shard: shard.get_unsynced_batch(kind, after, limit))
+                   for r in batch]
+        records.sort(key=lambda r: (r[timestamp] or '', r[key]))
+        return records[:limit]
+
+    def mark_synced(self, kind: str, ids: List[str]):
+        # Ids from other shards match no rows
+        self._fan_out(lambda shard: shard.mark_synced(kind, ids))
+
+    def get_hydration_state(self) -> Optional[Dict]:
+        # Every shard takes part in each batch, so they share the progress; the counts are per shard
+        states = self._fan_out(lambda shard: shard.get_hydration_state())
+        state = states[list(self.shards).index(self.default_school)]
+        if state is None:
+            return None
+        return dict(state, users_loaded=sum(s['users_loaded'] for s in states if s),
+                    results_loaded=sum(s['results_loaded'] for s in states if s))
+
+    def start_hydration(self, source: str, commit_sha: str = None):
+        self._fan_out(lambda shard: shard.start_hydration(source, commit_sha))
+
+    def load_hydration_batch(self, users: List[Tuple], results: List[Tuple], members_done: int) -> Tuple[int, int]:
+        masters = [u for u in users if u[1] == 'master']
+        students = [u for u in users if u[1] != 'master']
+        # Students the directory does not know yet join the default school
+        assignments = self.directory.get_assignments()
+        self.directory.assign_students({u[0]: self.default_school for u in students if u[0] not in assignments})
+        grouped_users = self._split_by_school(students, 0)
+        grouped_results = self._split_by_school(results, 1)
+        inserted = self._executor_map(lambda school_id: self.shards[school_id].load_hydration_batch(
+            masters + grouped_users[school_id], grouped_results[school_id], members_done))
+        return sum(i[0] for i in inserted), sum(i[1] for i in inserted)
+
+    def finish_hydration(self):
+        self._fan_out(lambda shard: shard.finish_hydration())
+
+    # Writes replicated to every shard
+
+    def add_topic(self, title: str, category: str = "Custom", difficulty: str = "Intermediate",
+                  topic_id: str = None) -> bool:
+        topic_id = topic_id or f"custom-{uuid.uuid4().hex[:8]}"
+        return all(self._fan_out(lambda shard: shard.add_topic(title, category, difficulty, topic_id)))
+
+    def rebuild_leaderboards(self):
+        self._fan_out(lambda shard: shard.rebuild_leaderboards())
+
+    def backfill_rollups(self):
+        self._fan_out(lambda shard: shard.backfill_rollups())
+
+    def rebuild_search_index(self):
+        self._fan_out(lambda shard: shard.rebuild_search_index())
+
+    def archive_results(self, cutoff: str, batch_size: int = 10000) -> int:
+        return sum(self._fan_out(lambda shard: shard.archive_results(cutoff, batch_size)))
+
+    def get_archive_status(self) -> Optional[Dict]:
+        """Archive status over the shards that archived anything; archive_paths is keyed by school"""
+        statuses = dict(zip(self.shards, self._fan_out(lambda shard: shard.get_archive_status())))
+        archived = {school_id: status for school_id, status in statuses.items() if status}
+        if not archived:
+            return None
+        return {
+            'archive_paths': {school_id: status['archive_path'] for school_id, status in archived.items()},
+            'archived_before': min(status['archived_before'] for status in archived.values()),
+            'archived_count': sum(status['archived_count'] for status in archived.values()),
+            'updated_at': max(status['updated_at'] for status in archived.values())
+        }
+
+    def save_item_parameters(self, parameters: List[Tuple[str, float, float, float, int]]):
+        self._fan_out(lambda shard: shard.save_item_parameters(parameters))
+
+    def add_result_listener(self, listener: Callable[[Dict], None]):
+        # Each shard numbers its own results, so tell the listener which school a result is from
+        for school_id, shard in self.shards.items():
+            shard.add_result_listener(lambda result, school_id=school_id: listener(dict(result, school=school_id)))
+
+    # Master-level reads merged across shards
+
+    def get_all_users(self) -> List[Dict]:
+        users = {}
+        for shard_users in self._fan_out(lambda shard: shard.get_all_users()):
+            for user in shard_users:
+                users.setdefault(user['unique_id'], user)  # masters exist in every shard
+        return sorted(users.values(), key=lambda u: (u['role'], u['unique_id']))
+
+    def get_all_results(self, since: str = None, until: str = None) -> List[Dict]:
+        results = [r for shard_results in self._fan_out(lambda shard: shard.get_all_results(since, until))
+                   for r in shard_results]
+        results.sort(key=lambda r: r['submitted_at'] or '', reverse=True)
+        return results
+
+    def get_result_sequence(self) -> int:
+        return sum(self._fan_out(lambda shard: shard.get_result_sequence()))
+
+    def get_student_ids(self) -> List[str]:
+        return sorted(s for ids in self._fan_out(lambda shard: shard.get_student_ids()) for s in ids)
+
+    def get_mastery_rows(self) -> List[Tuple[str, str, int, int]]:
+        # Each student's results live in one shard, so rows never overlap
+        return [row for rows in self._fan_out(lambda shard: shard.get_mastery_rows()) for row in rows]
+
+    def get_mastery_snapshot(self) -> Tuple[List[Tuple[str, str, int, int]], Dict[str, int]]:
+        """Mastery rows of every shard, and the sequence number each shard's rows include, by school"""
+        snapshots = dict(zip(self.shards, self._fan_out(lambda shard: shard.get_mastery_snapshot())))
+        rows = [row for shard_rows, _ in snapshots.values() for row in shard_rows]
+        return rows, {school_id: sequence for school_id, (_, sequence) in snapshots.items()}
+
+    def get_response_data(self) -> List[Tuple[str, str, int]]:
+        return [row for rows in self._fan_out(lambda shard: shard.get_response_data()) for row in rows]
+
+    def get_report_card_data(self, since: str = None, until: str = None) -> List[Dict]:
+        cards = [c for shard_cards in self._fan_out(lambda shard: shard.get_report_card_data(since, until))
+                 for c in shard_cards]
+        return sorted(cards, key=lambda c: c['unique_id'])
+
+    def get_table_counts(self) -> Dict[str, int]:
+        per_shard = self._fan_out(lambda shard: shard.get_table_counts())
+        counts = {table: sum(c[table] for c in per_shard) for table in per_shard[0]}
+        for table in REPLICATED_TABLES:
+            if table in counts:  # not every replicated table is counted
+                counts[table] = per_shard[0][table]
+        counts['users'] = len(self.get_all_users())  # masters are stored in every shard
+        return counts
+
+    def get_analytics_data(self, since: str = None, until: str = None) -> Dict:
+        per_shard = self._fan_out(lambda shard: shard.get_analytics_data(since, until))
+
+        def merge_weighted(section: str, key: str) -> List[Dict]:
+            merged = {}
+            for analytics in per_shard:
+                for row in analytics[section]:
+                    total = merged.setdefault(row[key], {key: row[key], 'score_sum': 0.0, 'test_count': 0})
+                    total['score_sum'] += row['avg_score'] * row['test_count']
+                    total['test_count'] += row['test_count']
+            return [{key: t[key], 'avg_score': t['score_sum'] / t['test_count'], 'test_count': t['test_count']}
+                    for t in merged.values()]
+
+        return {
+            'category_performance': merge_weighted('category_performance', 'category'),
+            'difficulty_performance': merge_weighted('difficulty_performance', 'difficulty'),
+            'student_summary': [s for analytics in per_shard for s in analytics['student_summary']]
+        }
+
+    def get_leaderboard(self, scope: str, scope_key: str, limit: int = None) -> List[Dict]:
+        limit = limit or self.LEADERBOARD_SIZE
+        entries = [e for board in self._fan_out(lambda shard: shard.get_leaderboard(scope, scope_key, limit))
+                   for e in board]
+        entries.sort(key=lambda e: (-e['best_score'], e['achieved_at']))
+        return [dict(e, rank=rank) for rank, e in enumerate(entries[:limit], start=1)]
+
+    def get_rollup_rows(self, scope: str = 'all', scope_key: str = '', period: str = 'week',
+                        since: str = None) -> List:
+        merged = {}
+        for rows in self._fan_out(lambda shard: shard.get_rollup_rows(scope, scope_key, period, since)):
+            for bucket, test_count, score_sum, score_sq_sum in rows:
+                total = merged.setdefault(bucket, [0, 0, 0])
+                total[0] += test_count
+                total[1] += score_sum
+                total[2] += score_sq_sum
+        return [(bucket, *merged[bucket]) for bucket in sorted(merged)]
+
+    def get_score_trend(self, scope: str = 'all', scope_key: str = '', period: str = 'week',
+                        since: str = None) -> List[Dict]:
+        return EnhancedDatabaseManager.trend_from_rollups(self.get_rollup_rows(scope, scope_key, period, since))
+
+
+def _common_columns(cursor: sqlite3.Cursor, table: str) -> List[str]:
+    cursor.execute(f'PRAGMA main.table_info({table})')
+    target = [row[1] for row in cursor.fetchall()]
+    cursor.execute(f'PRAGMA src.table_info({table})')
+    source = {row[1] for row in cursor.fetchall()}
+    return [column for column in target if column in source]
+
+
+def hash_assignments(student_ids: List[str], schools: int) -> Dict[str, str]:
+    """Spread students evenly over school-0 ... school-(n-1), stable across runs"""
+    return {student_id: f"school-{zlib.crc32(student_id.encode('utf-8')) % schools}" for student_id in student_ids}
+
+
+def split_database(source_path: str, out_dir: str, assignments: Dict[str, str],
+                   default_school: str = DEFAULT_SCHOOL, directory_path: str = None) -> Dict[str, Dict]:
+    """Copy source_path into one shard per school and write the shard directory.
+
+    Students missing from assignments go to default_school. Returns per-school
+    row counts.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    directory_path = directory_path or os.path.join(out_dir, 'directory.db')
+
+    source = sqlite3.connect(source_path)
+    students = {row[0] for row in source.execute("SELECT unique_id FROM users WHERE role = 'student'")}
+    # Results of students that no longer have an account still belong somewhere
+    students.update(row[0] for row in source.execute('SELECT DISTINCT student_id FROM test_results'))
+    # Archived results are copied back into each shard's hot table
+    try:
+        source_archive = source.execute('SELECT archive_path FROM archive_state').fetchone()
+    except sqlite3.OperationalError:
+        source_archive = None  # created before archiving existed
+    if source_archive:
+        source.execute('ATTACH DATABASE ? AS archive', source_archive)
+        students.update(row[0] for row in source.execute('SELECT DISTINCT student_id FROM archive.test_results'))
+    source.close()
+
+    placement = {student_id: assignments.get(student_id, default_school) for student_id in students}
+    schools = sorted(set(placement.values()) | {default_school})
+
+    directory = ShardDirectory(directory_path)
+    summary = {}
+    for school_id in schools:
+        shard_file = f"{school_id}.db"
+        shard_path = os.path.join(out_dir, shard_file)
+        if os.path.exists(shard_path):
+            raise FileExistsError(f"{shard_path} already exists")
+
+        shard = EnhancedDatabaseManager(db_path=shard_path, use_github=False, use_write_queue=False)
+        conn = sqlite3.connect(shard_path)
+        cursor = conn.cursor()
+        cursor.execute('ATTACH DATABASE ? AS src', (os.path.abspath(source_path),))
+        cursor.execute('CREATE TEMP TABLE shard_students (student_id TEXT PRIMARY KEY)')
+        cursor.executemany('INSERT INTO shard_students VALUES (?)',
+                           [(s,) for s, school in placement.items() if school == school_id])
+        # A new database is seeded with the demo students; keep them only in their own shard
+        cursor.execute('''
+            DELETE FROM main.users
+            WHERE role = 'student' AND unique_id NOT IN (SELECT student_id FROM shard_students)
+        ''')
+
+        for table in REPLICATED_TABLES:
+            columns = ', '.join(_common_columns(cursor, table))
+            cursor.execute(f'INSERT OR IGNORE INTO main.{table} ({columns}) SELECT {columns} FROM src.{table}')
+
+        columns = ', '.join(_common_columns(cursor, 'users'))
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO main.users ({columns})
+            SELECT {columns} FROM src.users
+            WHERE role = 'master' OR unique_id IN (SELECT student_id FROM shard_students)
+        ''')
+
+        for table, student_column in STUDENT_TABLES.items():
+            columns = ', '.join(_common_columns(cursor, table))
+            cursor.execute(f'''
+                INSERT INTO main.{table} ({columns})
+                SELECT {columns} FROM src.{table}
+                WHERE {student_column} IN (SELECT student_id FROM shard_students)
+            ''')
+
+        if source_archive:
+            cursor.execute('ATTACH DATABASE ? AS src_archive', source_archive)
+            columns = EnhancedDatabaseManager.RESULT_COLUMNS
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO main.test_results ({columns})
+                SELECT {columns} FROM src_archive.test_results
+                WHERE student_id IN (SELECT student_id FROM shard_students)
+            ''')
+
+        conn.commit()
+        counts = {table: conn.execute(f'SELECT COUNT(*) FROM main.{table}').fetchone()[0]
+                  for table in ['users'] + list(STUDENT_TABLES)}
+        conn.close()
+
+        # Derived tables are rebuilt from the shard's own rows
+        shard.rebuild_leaderboards()
+        shard.backfill_rollups()
+        shard.rebuild_search_index()
+
+        directory.add_school(school_id, shard_file)
+        summary[school_id] = counts
+
+    directory.assign_students(placement)
+    return summary
+
+
+def _read_assignments(path: str) -> Dict[str, str]:
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return {row[0].strip(): row[1].strip() for row in reader if len(row) >= 2}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split the WIDA database into per-school shards")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    split = subparsers.add_parser('split', help="Copy an existing database into per-school shards")
+    split.add_argument('--source', default='wida_app.db')
+    split.add_argument('--out-dir', required=True, help="Directory for the shard files and directory.db")
+    group = split.add_mutually_exclusive_group(required=True)
+    group.add_argument('--assignments', help="CSV of student_id,school_id")
+    group.add_argument('--schools', type=int, help="Spread students over this many schools by hash")
+    split.add_argument('--default-school', default=DEFAULT_SCHOOL,
+                       help="School for students without an assignment")
+
+    listing = subparsers.add_parser('list', help="Show schools, shard files and student counts")
+    listing.add_argument('--directory', required=True)
+
+    args = parser.parse_args()
+
+    if args.command == 'split':
+        if args.assignments:
+            assignments = _read_assignments(args.assignments)
+        else:
+            conn = sqlite3.connect(args.source)
+            students = [row[0] for row in conn.execute('''
+                SELECT unique_id FROM users WHERE role = 'student'
+                UNION SELECT student_id FROM test_results
+            ''')]
+            conn.close()
+            assignments = hash_assignments(students, args.schools)
+        summary = split_database(args.source, args.out_dir, assignments, args.default_school)
+        for school_id, counts in summary.items():
+            print(f"{school_id:<20} " + '  '.join(f"{table} {count:,}" for table, count in counts.items()))
+        print(f"Directory written to {os.path.join(args.out_dir, 'directory.db')}")
+    else:
+        directory = ShardDirectory(args.directory)
+        counts = directory.student_counts()
+        for school_id, path in directory.get_schools().items():
+            print(f"{school_id:<20} {counts.get(school_id, 0):>8,} students  {path}")
+
+
+if __name__ == '__main__':
+    main()
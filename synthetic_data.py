@@ -0,0 +1,238 @@
+"""Deterministic synthetic WIDA data for benchmarking EnhancedDatabaseManager.
+
+Usage:
+    python synthetic_data.py --tier 100k --db bench_100k.db
+"""
+import argparse
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import bcrypt
+
+from enhanced_backend import EnhancedDatabaseManager
+
+# Dataset sizes: results across realistic numbers of students, topics and questions
+TIERS = {
+    '1k': {'results': 1_000, 'students': 40, 'topics': 22, 'questions_per_topic': 8},
+    '100k': {'results': 100_000, 'students': 2_500, 'topics': 60, 'questions_per_topic': 25},
+    '10m': {'results': 10_000_000, 'students': 60_000, 'topics': 200, 'questions_per_topic': 60},
+}
+
+# Password shared by every synthetic student, so login benchmarks exercise bcrypt
+SYNTHETIC_PASSWORD = 'benchmark-password'
+
+# Results are spread over the year before this fixed date so runs are reproducible
+ANCHOR_DATE = datetime(2025, 6, 30, 15, 0, 0)
+HISTORY_DAYS = 365
+
+CATEGORIES = ['Reading', 'Listening', 'Speaking', 'Writing', 'Language Functions']
+DIFFICULTIES = ['Beginner', 'Intermediate', 'Advanced']
+FIRST_NAMES = ['Amara', 'Bilal', 'Chen', 'Dalia', 'Emre', 'Fatima', 'Gabriel', 'Hana', 'Ivan', 'Jia',
+               'Kofi', 'Lucia', 'Mateo', 'Nadia', 'Omar', 'Priya', 'Quang', 'Rosa', 'Samir', 'Tariq',
+               'Uma', 'Valentina', 'Wei', 'Ximena', 'Yusuf', 'Zara']
+LAST_NAMES = ['Abebe', 'Borges', 'Castillo', 'Dang', 'Estrada', 'Farah', 'Gupta', 'Haddad', 'Ibrahim',
+              'Jimenez', 'Kim', 'Lopez', 'Mensah', 'Nguyen', 'Okafor', 'Petrov', 'Rahman', 'Silva',
+              'Tran', 'Usman', 'Vargas', 'Wang', 'Yilmaz', 'Zhou']
+VOCABULARY = ['academic', 'analyze', 'argument', 'audience', 'cause', 'claim', 'compare', 'conclusion',
+              'context', 'contrast', 'describe', 'detail', 'evidence', 'explain', 'fluency', 'grammar',
+              'inference', 'instruction', 'lecture', 'listen', 'main idea', 'narrative', 'opinion',
+              'paragraph', 'persuade', 'predict', 'process', 'purpose', 'question', 'reason', 'sequence',
+              'source', 'speaker', 'structure', 'summary', 'support', 'synthesize', 'text', 'theme',
+              'topic sentence', 'transition', 'vocabulary']
+
+BATCH_SIZE = 50_000
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def _generate_topics(rng: random.Random, count: int) -> List[Tuple]:
+    """Synthetic topics on top of the WIDA topics the schema already seeds"""
+    topics = []
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        difficulty = DIFFICULTIES[(i // len(CATEGORIES)) % len(DIFFICULTIES)]
+        title = f"{_sentence(rng, 3).title()} ({category} {i + 1})"
+        topics.append((f"synth-topic-{i:04d}", title, category, difficulty))
+    return topics
+
+
+def _generate_questions(rng: random.Random, topic_ids: List[str], per_topic: int) -> Iterator[Tuple]:
+    for topic_id in topic_ids:
+        for j in range(per_topic):
+            yield (
+                f"synth-q-{topic_id}-{j:03d}",
+                topic_id,
+                f"Which statement best explains {_sentence(rng, 4)}?",
+                _sentence(rng, 3), _sentence(rng, 3), _sentence(rng, 3), _sentence(rng, 3),
+                rng.randrange(4),
+                f"The answer depends on {_sentence(rng, 6)}."
+            )
+
+
+def _generate_students(rng: random.Random, count: int, password_hash: bytes) -> Iterator[Tuple]:
+    for i in range(count):
+        birth_date = datetime(2008, 1, 1) + timedelta(days=rng.randrange(8 * 365))
+        yield (
+            f"synth-student-{i:06d}",
+            'student',
+            password_hash,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            birth_date.strftime('%Y-%m-%d'),
+            True,
+            str({'total_tests': 0, 'average_score': 0.0, 'goals': [], 'achievements': []})
+        )
+
+
+def _generate_results(rng: random.Random, count: int, student_ids: List[str],
+                      topics: List[Tuple[str, str, str]]) -> Iterator[Tuple]:
+    """Results in submission order, with skewed activity per student and per topic"""
+    abilities = [rng.gauss(70, 12) for _ in student_ids]
+    difficulty_penalty = {'Beginner': -8, 'Intermediate': 0, 'Advanced': 10}
+    start = ANCHOR_DATE - timedelta(days=HISTORY_DAYS)
+    seconds_per_result = HISTORY_DAYS * 86400 / count
+
+    for i in range(count):
+        # Squaring a uniform draw makes a minority of students and topics account for most results
+        student = int(len(student_ids) * rng.random() ** 2)
+        topic_id, title, difficulty = topics[int(len(topics) * rng.random() ** 1.5)]
+        score = abilities[student] - difficulty_penalty.get(difficulty, 0) + rng.gauss(0, 15)
+        submitted_at = start + timedelta(seconds=i * seconds_per_result)
+        yield (
+            f"synth-result-{i:08x}",
+            student_ids[student],
+            topic_id,
+            title,
+            max(0, min(100, round(score))),
+            rng.randrange(60, 1800),
+            rng.random() < 0.97,
+            submitted_at.strftime('%Y-%m-%d %H:%M:%S'),
+            i + 1
+        )
+
+
+def _batches(rows: Iterator[Tuple], size: int) -> Iterator[List[Tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_database(db_path: str, tier: str, seed: int = 42, overwrite: bool = False,
+                      progress: Optional[Callable[[str, int, int], None]] = None) -> Dict:
+    """Create a database at db_path filled with the given tier of synthetic data"""
+    if tier not in TIERS:
+        raise ValueError(f"Unknown tier '{tier}', expected one of {', '.join(TIERS)}")
+    if os.path.exists(db_path):
+        if not overwrite:
+            raise FileExistsError(f"{db_path} already exists")
+        os.remove(db_path)
+
+    spec = TIERS[tier]
+    rng = random.Random(seed)
+    report = progress or (lambda stage, done, total: None)
+
+    # Let the manager create the schema and seed content, then bulk-load around it
+    db = EnhancedDatabaseManager(db_path=db_path, use_github=False)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA synchronous = OFF')
+    conn.execute('PRAGMA journal_mode = MEMORY')
+    cursor = conn.cursor()
+
+    cursor.execute('SELECT id, title, category, difficulty_level FROM topics')
+    existing_topics = cursor.fetchall()
+    synthetic_topics = _generate_topics(rng, max(spec['topics'] - len(existing_topics), 0))
+    cursor.executemany('''
+        INSERT INTO topics (id, title, category, difficulty_level) VALUES (?, ?, ?, ?)
+    ''', synthetic_topics)
+    all_topics = existing_topics + synthetic_topics
+    report('topics', len(all_topics), len(all_topics))
+
+    topic_ids = [t[0] for t in all_topics]
+    total_questions = len(topic_ids) * spec['questions_per_topic']
+    loaded = 0
+    for batch in _batches(_generate_questions(rng, topic_ids, spec['questions_per_topic']), BATCH_SIZE):
+        cursor.executemany('''
+            INSERT OR IGNORE INTO questions
+            (id, topic_id, question_text, option_a, option_b, option_c, option_d, correct_answer, explanation)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        loaded += len(batch)
+        report('questions', loaded, total_questions)
+
+    password_hash = bcrypt.hashpw(SYNTHETIC_PASSWORD.encode('utf-8'), bcrypt.gensalt())
+    student_ids = [f"synth-student-{i:06d}" for i in range(spec['students'])]
+    loaded = 0
+    for batch in _batches(_generate_students(rng, spec['students'], password_hash), BATCH_SIZE):
+        cursor.executemany('''
+            INSERT INTO users (unique_id, role, password_hash, first_name, last_name,
+                               date_of_birth, github_synced, profile_analytics)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        loaded += len(batch)
+        report('students', loaded, spec['students'])
+
+    result_topics = [(t[0], t[1], t[3]) for t in all_topics]
+    loaded = 0
+    for batch in _batches(_generate_results(rng, spec['results'], student_ids, result_topics), BATCH_SIZE):
+        cursor.executemany('''
+            INSERT INTO test_results (id, student_id, topic_id, topic_title, score, time_taken,
+                                      github_synced, submitted_at, seq)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', batch)
+        conn.commit()
+        loaded += len(batch)
+        report('results', loaded, spec['results'])
+
+    conn.commit()
+    conn.close()
+
+    # Derived tables are rebuilt set-based instead of row by row
+    db.rebuild_leaderboards()
+    db.backfill_rollups()
+    report('derived tables', 1, 1)
+
+    return {
+        'tier': tier,
+        'seed': seed,
+        'topics': len(all_topics),
+        'questions': total_questions,
+        'students': spec['students'],
+        'results': spec['results'],
+        'student_ids': student_ids,
+        'topic_ids': topic_ids
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic WIDA benchmark database")
+    parser.add_argument('--tier', choices=list(TIERS), default='1k')
+    parser.add_argument('--db', help="Output database path (default: bench_<tier>.db)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--overwrite', action='store_true', help="Replace the database if it exists")
+    args = parser.parse_args()
+
+    db_path = args.db or f"bench_{args.tier}.db"
+    started = time.perf_counter()
+
+    def progress(stage: str, done: int, total: int):
+        print(f"\r{stage}: {done:,}/{total:,}", end='\n' if done == total else '', flush=True)
+
+    summary = generate_database(db_path, args.tier, seed=args.seed, overwrite=args.overwrite, progress=progress)
+    print(f"Generated {summary['results']:,} results for {summary['students']:,} students "
+          f"in {db_path} ({time.perf_counter() - started:.1f}s)")
+
+
+if __name__ == '__main__':
+    main()
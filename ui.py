@@ -0,0 +1,403 @@
+"""Shared pieces of the Streamlit pages: the database, navigation, styling and common widgets.
+
+Every page module imports from here, so it is kept to what the landing, login
+and test pages need; heavier dependencies belong in the page that uses them.
+"""
+import streamlit as st
+import html
+import os
+from typing import Dict, List, Optional
+from enhanced_backend import EnhancedDatabaseManager
+
+# Initialize enhanced database
+@st.cache_resource
+def get_database():
+    # WIDA_SHARD_DIRECTORY points at a directory.db written by `python sharding.py split`
+    shard_directory = os.environ.get('WIDA_SHARD_DIRECTORY')
+    if shard_directory:
+        from sharding import ShardedDatabaseManager
+        return ShardedDatabaseManager(shard_directory)
+    db = EnhancedDatabaseManager()
+    # On hosts where the database does not survive a redeploy, reload it from the GitHub backup
+    if os.environ.get('WIDA_HYDRATE_ON_START') == '1' and db.github_storage and db.github_storage.token:
+        import hydration
+        # Not caught: a failure must not be cached along with an empty database, so the
+        # next run retries, and hydration resumes where it stopped
+        hydration.hydrate(db)
+    return db
+
+def rerun():
+    """st.rerun() that marks the current run as ending in a rerun for the page metrics"""
+    st.session_state.rerun_requested = True
+    st.rerun()
+
+# Navigation is done in button callbacks, which Streamlit runs before the script,
+# so a click renders the new page in the same run instead of rerunning for it.
+def navigate(page: str, **state):
+    """on_click callback: go to page, setting any extra session state first"""
+    st.session_state.update(state)
+    st.session_state.page = page
+
+# Pages that need a signed-in user, and the role they are limited to (None for any role)
+PAGE_ROLES = {
+    'dashboard': None,
+    'test': None,
+    'test_result': None,
+    'analytics': 'student',
+    'syllabus_management': 'master',
+    'master_analytics': 'master'
+}
+
+def resolve_page(page: str, user: Optional[Dict]) -> str:
+    """The page to render: signed-out users go to login, and the wrong role to the dashboard"""
+    if page not in PAGE_ROLES:
+        return page
+    if not user:
+        return 'login'
+    role = PAGE_ROLES[page]
+    return page if role is None or user['role'] == role else 'dashboard'
+
+def apply_custom_css():
+    """Apply custom CSS with child-friendly bright colors and playful design"""
+    st.markdown("""
+    <style>
+    /* Import fun, child-friendly fonts */
+    @import url('https://fonts.googleapis.com/css2?family=Comic+Neue:wght@300;400;700&family=Fredoka:wght@300;400;500;600;700&display=swap');
+    
+    /* Global styles - Bright, fun theme */
+    .stApp {
+        font-family: 'Comic Neue', 'Fredoka', cursive, sans-serif;
+        background: linear-gradient(135deg, #FFE5B4 0%, #FFF8DC 50%, #E6F3FF 100%);
+        color: #2E4057;
+    }
+    
+    /* Main content area */
+    .main .block-container {
+        background: transparent;
+        color: #2E4057;
+    }
+    
+    /* Header styles - Rainbow gradient */
+    .main-header {
+        background: linear-gradient(135deg, #FF6B9D 0%, #C44569 25%, #F8B500 50%, #6C5CE7 75%, #74B9FF 100%);
+        color: white;
+        padding: 2.5rem;
+        border-radius: 25px;
+        margin-bottom: 2rem;
+        box-shadow: 0 15px 35px rgba(0, 0, 0, 0.2);
+        border: 4px solid #FFD700;
+        text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.3);
+    }
+    
+    .main-header h1 {
+        font-size: 3rem;
+        font-weight: 700;
+        margin: 0;
+        color: white;
+        font-family: 'Fredoka', cursive;
+        text-shadow: 3px 3px 6px rgba(0, 0, 0, 0.4);
+    }
+    
+    .main-header p {
+        font-size: 1.3rem;
+        margin: 0.5rem 0 0 0;
+        color: white;
+        text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.3);
+    }
+    
+    /* Card styles - Colorful, rounded cards */
+    .card {
+        background: linear-gradient(135deg, #FFE5F1 0%, #E8F5FF 100%);
+        border-radius: 25px;
+        padding: 2rem;
+        box-shadow: 0 10px 30px rgba(0, 0, 0, 0.15);
+        border: 3px solid #FF6B9D;
+        margin-bottom: 1.5rem;
+        color: #2E4057;
+    }
+    
+    /* Sidebar styles - Bright sidebar */
+    .css-1d391kg {
+        background: linear-gradient(135deg, #FFE5B4 0%, #FFD1DC 100%);
+    }
+    
+    .sidebar-title {
+        color: #C44569;
+        font-size: 1.8rem;
+        font-weight: 700;
+        margin-bottom: 1rem;
+        text-align: center;
+        font-family: 'Fredoka', cursive;
+        text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.1);
+    }
+    
+    /* Button styles - Colorful, fun buttons */
+    .stButton > button {
+        background: linear-gradient(135deg, #FF6B9D 0%, #C44569 100%);
+        color: white !important;
+        border: none;
+        border-radius: 20px;
+        padding: 1rem 2rem;
+        font-weight: 700;
+        font-size: 1.1rem;
+        transition: all 0.3s ease;
+        box-shadow: 0 8px 20px rgba(255, 107, 157, 0.4);
+        text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.2);
+        font-family: 'Fredoka', cursive;
+    }
+    
+    .stButton > button:hover {
+        transform: translateY(-4px) scale(1.05);
+        box-shadow: 0 12px 30px rgba(255, 107, 157, 0.6);
+        background: linear-gradient(135deg, #FF8FA3 0%, #D63384 100%);
+        color: white !important;
+    }
+    
+    .stButton > button:focus {
+        background: linear-gradient(135deg, #E91E63 0%, #AD1457 100%);
+        box-shadow: 0 0 0 4px rgba(255, 107, 157, 0.4);
+        color: white !important;
+    }
+    
+    .stButton > button:active {
+        color: white !important;
+        transform: translateY(-2px) scale(1.02);
+    }
+    
+    /* Input field styles - Bright and friendly */
+    .stTextInput > div > div > input {
+        background: linear-gradient(135deg, #FFFACD 0%, #F0F8FF 100%);
+        color: #2E4057;
+        border: 3px solid #FFB6C1;
+        border-radius: 15px;
+        font-size: 1.1rem;
+        padding: 0.8rem;
+        font-family: 'Comic Neue', cursive;
+    }
+    
+    .stTextInput > div > div > input:focus {
+        border-color: #FF6B9D;
+        box-shadow: 0 0 0 3px rgba(255, 107, 157, 0.3);
+        background: #FFFAFD;
+    }
+    
+    .stSelectbox > div > div > select {
+        background: linear-gradient(135deg, #FFFACD 0%, #F0F8FF 100%);
+        color: #2E4057;
+        border: 3px solid #FFB6C1;
+        border-radius: 15px;
+        font-family: 'Comic Neue', cursive;
+    }
+    
+    .stDateInput > div > div > input {
+        background: linear-gradient(135deg, #FFFACD 0%, #F0F8FF 100%);
+        color: #2E4057;
+        border: 3px solid #FFB6C1;
+        border-radius: 15px;
+        font-family: 'Comic Neue', cursive;
+    }
+    
+    /* Checkbox and radio styles */
+    .stCheckbox {
+        color: #2E4057;
+        font-weight: 600;
+        font-family: 'Comic Neue', cursive;
+    }
+    
+    .stRadio > div {
+        background-color: transparent;
+    }
+    
+    .stRadio label {
+        color: #2E4057;
+        font-weight: 600;
+        font-family: 'Comic Neue', cursive;
+    }
+    
+    /* Form styles - Bright forms */
+    .stForm {
+        background: linear-gradient(135deg, #FFF5EE 0%, #F0FFFF 100%);
+        border: 4px solid #FFB6C1;
+        border-radius: 25px;
+        padding: 2rem;
+        box-shadow: 0 10px 25px rgba(0, 0, 0, 0.1);
+    }
+    
+    /* Success/Error styles - Bright and clear */
+    .success-box {
+        background: linear-gradient(135deg, #90EE90 0%, #98FB98 100%);
+        color: #006400;
+        padding: 1.5rem;
+        border-radius: 20px;
+        margin: 1rem 0;
+        border: 3px solid #32CD32;
+        box-shadow: 0 8px 20px rgba(50, 205, 50, 0.3);
+        font-weight: 600;
+        font-family: 'Fredoka', cursive;
+    }
+    
+    .error-box {
+        background: linear-gradient(135deg, #FFB6C1 0%, #FFC0CB 100%);
+        color: #8B0000;
+        padding: 1.5rem;
+        border-radius: 20px;
+        margin: 1rem 0;
+        border: 3px solid #FF1493;
+        box-shadow: 0 8px 20px rgba(255, 20, 147, 0.3);
+        font-weight: 600;
+        font-family: 'Fredoka', cursive;
+    }
+    
+    /* Progress indicators - Fun progress cards */
+    .progress-card {
+        background: linear-gradient(135deg, #87CEEB 0%, #98FB98 100%);
+        border: 4px solid #FFD700;
+        border-radius: 25px;
+        padding: 2rem;
+        text-align: center;
+        margin: 1rem 0;
+        color: #2E4057;
+        box-shadow: 0 10px 25px rgba(0, 0, 0, 0.15);
+    }
+    
+    .progress-number {
+        font-size: 3rem;
+        font-weight: 700;
+        color: #FF6B9D;
+        text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.2);
+        font-family: 'Fredoka', cursive;
+    }
+    
+    /* Login form styles - Bright and welcoming */
+    .login-container {
+        max-width: 450px;
+        margin: 2rem auto;
+        background: linear-gradient(135deg, #FFE5F1 0%, #E8F5FF 100%);
+        padding: 3rem;
+        border-radius: 30px;
+        box-shadow: 0 15px 40px rgba(0, 0, 0, 0.2);
+        border: 4px solid #FF6B9D;
+        color: #2E4057;
+    }
+    
+    /* Tabs styling */
+    .stTabs [data-baseweb="tab-list"] {
+        gap: 8px;
+    }
+    
+    .stTabs [data-baseweb="tab"] {
+        background: linear-gradient(135deg, #FFB6C1 0%, #FFC0CB 100%);
+        color: #2E4057;
+        border-radius: 15px;
+        font-weight: 600;
+        padding: 0.5rem 1rem;
+        border: 2px solid #FF6B9D;
+        font-family: 'Fredoka', cursive;
+    }
+    
+    .stTabs [aria-selected="true"] {
+        background: linear-gradient(135deg, #FF6B9D 0%, #C44569 100%);
+        color: white;
+        box-shadow: 0 4px 15px rgba(255, 107, 157, 0.4);
+    }
+    
+    /* Text styles */
+    h1, h2, h3, h4, h5, h6 {
+        color: #2E4057;
+        font-family: 'Fredoka', cursive;
+        text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.1);
+    }
+    
+    /* Metrics styling */
+    [data-testid="metric-container"] {
+        background: linear-gradient(135deg, #E8F5FF 0%, #F0FFFF 100%);
+        border: 3px solid #87CEEB;
+        padding: 1rem;
+        border-radius: 20px;
+        box-shadow: 0 5px 15px rgba(0, 0, 0, 0.1);
+    }
+    
+    /* Sidebar button improvements */
+    .css-1d391kg .stButton > button {
+        background: linear-gradient(135deg, #6C5CE7 0%, #A29BFE 100%);
+        color: white !important;
+        border: none;
+        border-radius: 20px;
+        padding: 0.8rem 1.5rem;
+        font-weight: 600;
+        margin: 0.2rem 0;
+        box-shadow: 0 5px 15px rgba(108, 92, 231, 0.4);
+        font-family: 'Fredoka', cursive;
+    }
+    
+    .css-1d391kg .stButton > button:hover {
+        background: linear-gradient(135deg, #5F3DC4 0%, #7950F2 100%);
+        transform: translateY(-2px);
+        box-shadow: 0 8px 20px rgba(108, 92, 231, 0.6);
+    }
+    
+    /* Info, warning, success message styling */
+    .stAlert {
+        border-radius: 15px;
+        border: 3px solid;
+        font-family: 'Comic Neue', cursive;
+        font-weight: 600;
+    }
+    
+    /* Slider styling */
+    .stSlider > div > div > div > div {
+        background: linear-gradient(135deg, #FF6B9D 0%, #C44569 100%);
+        border-radius: 20px;
+    }
+    
+    /* Hide Streamlit branding */
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    header {visibility: hidden;}
+    </style>
+    """, unsafe_allow_html=True)
+
+def show_header(title: str, subtitle: str = ""):
+    """Display the main header"""
+    st.markdown(f"""
+    <div class="main-header">
+        <h1>{title}</h1>
+        {f'<p>{subtitle}</p>' if subtitle else ''}
+    </div>
+    """, unsafe_allow_html=True)
+
+def show_leaderboard(topics: List[Dict], key_prefix: str, highlight_id: str = None):
+    """Display a category or topic leaderboard picked by the user"""
+    db = get_database()
+    
+    categories = sorted({topic.get('category', 'General') for topic in topics})
+    if not categories:
+        st.info("No leaderboards yet.")
+        return
+    
+    selected_category = st.selectbox("Category", categories, key=f"{key_prefix}_lb_category")
+    category_topics = [t for t in topics if t.get('category', 'General') == selected_category]
+    topic_options = ['Whole category'] + [t['title'] for t in category_topics]
+    selected_topic = st.selectbox("Topic", topic_options, key=f"{key_prefix}_lb_topic")
+    
+    if selected_topic == 'Whole category':
+        entries = db.get_leaderboard('category', selected_category)
+    else:
+        topic_id = next(t['id'] for t in category_topics if t['title'] == selected_topic)
+        entries = db.get_leaderboard('topic', topic_id)
+    
+    if not entries:
+        st.info("No scores on this leaderboard yet. Be the first! 🚀")
+        return
+    
+    medals = {1: '🥇', 2: '🥈', 3: '🥉'}
+    for entry in entries:
+        is_me = entry['student_id'] == highlight_id
+        border_color = "#FF6B9D" if is_me else "#87CEEB"
+        name = html.escape(entry['first_name'] or entry['student_id'])
+        st.markdown(f"""
+        <div style="background: linear-gradient(135deg, #E8F5FF 0%, #F0FFFF 100%); padding: 0.6rem 1rem; margin: 0.3rem 0; border-radius: 15px; border: 2px solid {border_color};">
+            <strong style="color: #2E4057; font-family: 'Fredoka', cursive;">{medals.get(entry['rank'], f"#{entry['rank']}")} {name}{' (you!)' if is_me else ''}</strong>
+            <span style="color: #2E4057; float: right; font-family: 'Fredoka', cursive;">{entry['best_score']}%</span>
+        </div>
+        """, unsafe_allow_html=True)
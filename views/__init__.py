@@ -0,0 +1 @@
+"""Page modules of the Streamlit app; app.py imports each one when its page is first shown"""
@@ -0,0 +1,113 @@
+"""Login and registration pages"""
+import streamlit as st
+from ui import get_database, navigate
+
+def sign_in():
+    """Sign In callback: go straight to the dashboard, or leave an error for the login page to show"""
+    unique_id = st.session_state.login_unique_id
+    password = st.session_state.login_password
+    if not unique_id:
+        st.session_state.login_error = "Please enter your Unique ID"
+        return
+    db = get_database()
+    user = db.authenticate_user(unique_id, password if password else None)
+    if user:
+        navigate('dashboard', user=user)
+    elif db.is_password_locked(unique_id):
+        st.session_state.login_error = "This account needs a new password. Please ask your teacher to set one."
+    else:
+        st.session_state.login_error = "Invalid Unique ID or password"
+
+def show_login_page():
+    """Display the login page"""
+    st.markdown("""
+    <div class="login-container">
+        <h2 style="text-align: center; color: white; margin-bottom: 1rem;">Sign In</h2>
+        <p style="text-align: center; color: #cccccc; margin-bottom: 2rem;">Access your WIDA dashboard</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    with st.form("login_form"):
+        st.text_input("Unique ID", placeholder="Your Unique ID", key="login_unique_id")
+        st.text_input("Password (Optional)", type="password", placeholder="Leave blank for demo users",
+                      key="login_password")
+        st.form_submit_button("Sign In", use_container_width=True, on_click=sign_in)
+        
+        error = st.session_state.pop('login_error', None)
+        if error:
+            st.error(error)
+    
+    st.markdown("""
+    <div style="text-align: center; margin-top: 2rem; padding: 1rem; background: linear-gradient(135deg, #2a2a2a 0%, #1a1a1a 100%); border-radius: 10px; border: 1px solid #333333;">
+        <p style="color: white;"><strong>Demo Accounts:</strong></p>
+        <p style="color: #cccccc;">Master Login ID: <code style="background: #1a1a1a; padding: 0.2rem 0.5rem; border-radius: 4px; color: white;">KRURA</code></p>
+        <p style="color: #cccccc;">Student Login ID: <code style="background: #1a1a1a; padding: 0.2rem 0.5rem; border-radius: 4px; color: white;">student1</code></p>
+    </div>
+    """, unsafe_allow_html=True)
+
+def show_register_page():
+    """Display the child-friendly registration page with detailed profile information"""
+    db = get_database()
+    
+    st.markdown("""
+    <div class="login-container">
+        <h2 style="text-align: center; color: #2E4057; margin-bottom: 1rem; font-family: 'Fredoka', cursive;">🌟 Join Our Learning Adventure! 🌟</h2>
+        <p style="text-align: center; color: #2E4057; margin-bottom: 2rem; font-family: 'Comic Neue', cursive; font-weight: 600;">Create your super cool student profile and start your WIDA journey! 🚀</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    with st.form("register_form"):
+        st.markdown("### 👤 Tell Us About Yourself!")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            first_name = st.text_input("🎯 First Name *", placeholder="What's your first name?")
+        with col2:
+            last_name = st.text_input("🎯 Last Name *", placeholder="What's your last name?")
+        
+        date_of_birth = st.date_input("🎂 When is your birthday? *", 
+                                     help="This helps us celebrate your special day and track your awesome progress!")
+        
+        st.markdown("### 🔐 Create Your Account")
+        unique_id = st.text_input("🆔 Choose Your Cool Username *", 
+                                 placeholder="Pick a super cool username just for you!")
+        password = st.text_input("🔒 Secret Password (Optional)", 
+                                type="password", 
+                                placeholder="Create a secret password (or leave it blank)",
+                                help="A password keeps your account extra safe! But it's totally optional 😊")
+        
+        st.markdown("---")
+        
+        # Terms and conditions
+        accept_terms = st.checkbox("✅ I agree to play by the rules and have fun learning!")
+        
+        submit = st.form_submit_button("🚀 Start My Learning Adventure!", use_container_width=True)
+        
+        if submit:
+            if not all([first_name, last_name, unique_id, date_of_birth]):
+                st.error("🚨 Oops! Please fill in all the fields with a ⭐ - we need them to create your awesome profile!")
+            elif not accept_terms:
+                st.error("📝 Please check the box to agree to our fun learning rules!")
+            else:
+                # Convert date to string format
+                dob_str = date_of_birth.strftime('%Y-%m-%d')
+                
+                if db.register_user(unique_id, password if password else None, 
+                                  first_name, last_name, dob_str):
+                    st.markdown("""
+                    <div class="success-box">
+                        <h4 style="color: #006400; margin-bottom: 0.5rem;">🎉 Awesome! You're Part of Our Learning Family!</h4>
+                        <p style="color: #006400; margin: 0;">Welcome aboard, {first_name}! 🌟</p>
+                        <p style="color: #006400; margin: 0.5rem 0 0 0;">Your super cool profile is ready! Let's start your amazing WIDA adventure! 🚀✨</p>
+                    </div>
+                    """.format(first_name=first_name), unsafe_allow_html=True)
+                    
+                    # Show login button
+                    st.button("🎮 Let's Start Learning!", use_container_width=True,
+                              on_click=navigate, args=('login',))
+                else:
+                    st.error("🚨 Oops! That username is already taken by another awesome learner. Try a different one!")
+    
+    # Back to login link
+    st.markdown("---")
+    st.button("← Back to Login", use_container_width=True, on_click=navigate, args=('login',))
@@ -0,0 +1,165 @@
+"""Test pages: the fixed-length and adaptive tests and the result page"""
+import streamlit as st
+from typing import Dict, List, Tuple
+from ui import get_database, navigate, show_header
+
+def submit_test(topic: Dict, questions: List[Dict]):
+    """Submit Test callback: score the answers, save them and go to the result page"""
+    answers = [st.session_state[f"q_{i}"] for i in range(len(questions))]
+    correct_answers = sum(1 for question, answer in zip(questions, answers)
+                          if answer == question['correct_answer'])
+    score = round((correct_answers / len(questions)) * 100)
+    
+    # Save result with each answer, so the questions can be calibrated for adaptive tests
+    result_id = get_database().submit_test_result(
+        st.session_state.user['unique_id'],
+        topic['id'],
+        topic['title'],
+        score,
+        responses=[(q['id'], answer == q['correct_answer']) for q, answer in zip(questions, answers)]
+    )
+    navigate('test_result', current_result_id=result_id)
+
+def show_test_page():
+    """Display the test page"""
+    if 'current_test_topic' not in st.session_state:
+        st.error("No test topic selected")
+        return
+    
+    topic = st.session_state.current_test_topic
+    db = get_database()
+    
+    questions = db.get_questions_for_topic(topic['id'])
+    
+    adaptive = st.toggle("🎯 Adaptive mode", key="adaptive_mode",
+                         help="Questions follow your level, and the test ends as soon as your score is reliable")
+    show_header(f"Test: {topic['title']}", "Answer each question to continue" if adaptive
+                else "Answer all questions to complete the test")
+    
+    if not questions:
+        st.warning("No questions available for this topic yet.")
+        return
+    
+    if adaptive:
+        show_adaptive_test(topic, questions)
+        return
+    
+    with st.form("test_form"):
+        for i, question in enumerate(questions):
+            st.markdown(f"""
+            <div class="question-card">
+                <div class="question-number">Question {i + 1}</div>
+                <h4 style="color: #1e293b; margin: 0.5rem 0 1rem 0;">{question['question_text']}</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            st.radio(
+                f"Select your answer for Question {i + 1}:",
+                options=range(len(question['options'])),
+                format_func=lambda x, options=question['options']: options[x],
+                key=f"q_{i}",
+                label_visibility="collapsed"
+            )
+        
+        st.form_submit_button("Submit Test", use_container_width=True, on_click=submit_test,
+                              args=(topic, questions))
+
+def answer_adaptive_question(topic: Dict, questions: List[Dict], index: int, parameters: Tuple):
+    """Next callback: update the ability estimate, and submit the test once it is reliable enough"""
+    import adaptive_testing
+    
+    a, b, c = parameters
+    state = st.session_state.adaptive_test
+    answer = st.session_state[f"adaptive_q_{len(state['administered']) + 1}"]
+    state['administered'].append(index)
+    state['correct'].append(int(answer == questions[index]['correct_answer']))
+    administered = state['administered']
+    state['theta'], state['se'] = adaptive_testing.estimate_ability(
+        state['correct'], a[administered], b[administered], c[administered])
+    state['threshold'] = adaptive_testing.stopping_threshold(state['theta'], a, b, c)
+    
+    if adaptive_testing.should_stop(state['se'], len(administered), len(questions), state['threshold']):
+        score = adaptive_testing.percent_correct(state['correct'])
+        result_id = get_database().submit_test_result(
+            st.session_state.user['unique_id'],
+            topic['id'],
+            topic['title'],
+            score,
+            responses=[(questions[i]['id'], correct) for i, correct in zip(administered, state['correct'])]
+        )
+        del st.session_state.adaptive_test
+        navigate('test_result', current_result_id=result_id)
+
+def show_adaptive_test(topic: Dict, questions: List[Dict]):
+    """Ask one question at a time, chosen for the student's current ability estimate"""
+    import adaptive_testing
+    
+    db = get_database()
+    question_ids = [q['id'] for q in questions]
+    a, b, c = adaptive_testing.item_arrays(question_ids, db.get_item_parameters(question_ids))
+    
+    # Start over whenever the topic changes
+    state = st.session_state.get('adaptive_test')
+    if not state or state['topic_id'] != topic['id']:
+        state = st.session_state.adaptive_test = {'topic_id': topic['id'], 'administered': [], 'correct': [],
+                                                  'theta': 0.0, 'se': 1.0,
+                                                  'threshold': adaptive_testing.stopping_threshold(0.0, a, b, c)}
+    
+    index = adaptive_testing.select_next_item(state['theta'], a, b, c, state['administered'])
+    question = questions[index]
+    number = len(state['administered']) + 1
+    st.progress(max(0.0, min(1.0, (1.0 - state['se']) / (1.0 - state['threshold']))),
+                text=f"Question {number}")
+    
+    with st.form(f"adaptive_form_{number}"):
+        st.markdown(f"""
+        <div class="question-card">
+            <div class="question-number">Question {number}</div>
+            <h4 style="color: #1e293b; margin: 0.5rem 0 1rem 0;">{question['question_text']}</h4>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.radio(
+            f"Select your answer for Question {number}:",
+            options=range(len(question['options'])),
+            format_func=lambda x: question['options'][x],
+            key=f"adaptive_q_{number}",
+            label_visibility="collapsed"
+        )
+        
+        st.form_submit_button("Next", use_container_width=True, on_click=answer_adaptive_question,
+                              args=(topic, questions, index, (a, b, c)))
+
+def show_test_result_page():
+    """Display the test result page"""
+    if 'current_result_id' not in st.session_state:
+        st.error("No test result found")
+        return
+    
+    db = get_database()
+    result = db.get_result_by_id(st.session_state.current_result_id)
+    
+    if not result:
+        st.error("Result not found")
+        return
+    
+    show_header("Test Results", f"Your performance on {result['topic_title']}")
+    
+    # Show score with visual feedback
+    score_color = "#ffffff" if result['score'] >= 70 else "#cccccc"
+    
+    st.markdown(f"""
+    <div style="text-align: center; padding: 3rem; background: linear-gradient(135deg, #2a2a2a 0%, #1a1a1a 100%); border-radius: 20px; box-shadow: 0 10px 30px rgba(255,255,255,0.1); border: 1px solid #333333;">
+        <div style="font-size: 4rem; font-weight: 800; color: {score_color}; margin-bottom: 1rem;">
+            {result['score']}%
+        </div>
+        <h3 style="color: white; margin-bottom: 0.5rem;">{result['topic_title']}</h3>
+        <p style="color: #cccccc;">Completed on {result['submitted_at'][:10]}</p>
+        
+        <div style="margin-top: 2rem; padding: 1rem; background: #1a1a1a; border-radius: 10px; border: 1px solid #333333;">
+            <strong style="color: white;">{'🎉 Excellent work!' if result['score'] >= 90 else '👍 Good job!' if result['score'] >= 70 else '📚 Keep studying!'}</strong>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.button("← Back to Dashboard", use_container_width=True, on_click=navigate, args=('dashboard',))
@@ -0,0 +1,29 @@
+"""Landing page"""
+import streamlit as st
+
+def show_landing_page():
+    """Display the child-friendly landing page"""
+    st.markdown("""
+    <div style="text-align: center; padding: 4rem 2rem;">
+        <div style="background: linear-gradient(135deg, #FFE5F1 0%, #E8F5FF 100%); padding: 3rem; border-radius: 30px; box-shadow: 0 15px 50px rgba(255,107,157,0.3); max-width: 700px; margin: 0 auto; border: 4px solid #FF6B9D;">
+            <h1 style="font-size: 3.5rem; font-weight: 700; margin-bottom: 1rem; color: #2E4057; font-family: 'Fredoka', cursive; text-shadow: 2px 2px 4px rgba(0,0,0,0.2);">
+                🌟 Welcome to the <span style="color: #FF6B9D;">WIDA</span> Learning Adventure! 🌟
+            </h1>
+            <p style="font-size: 1.4rem; color: #2E4057; margin-bottom: 2rem; font-family: 'Comic Neue', cursive; font-weight: 600;">
+                🚀 Your magical platform for WIDA test preparation! 📚<br>
+                🎯 Learn, practice, and achieve your dreams together! ✨
+            </p>
+            <div style="display: flex; justify-content: center; gap: 2rem; flex-wrap: wrap; margin-top: 2rem;">
+                <div style="background: linear-gradient(135deg, #87CEEB 0%, #98FB98 100%); padding: 1rem; border-radius: 20px; border: 3px solid #FFD700; min-width: 150px;">
+                    <h3 style="color: #2E4057; margin: 0; font-family: 'Fredoka', cursive;">🎮 Fun Tests</h3>
+                </div>
+                <div style="background: linear-gradient(135deg, #FFB6C1 0%, #FFC0CB 100%); padding: 1rem; border-radius: 20px; border: 3px solid #FF6B9D; min-width: 150px;">
+                    <h3 style="color: #2E4057; margin: 0; font-family: 'Fredoka', cursive;">📊 Cool Charts</h3>
+                </div>
+                <div style="background: linear-gradient(135deg, #FFFFE0 0%, #FFFACD 100%); padding: 1rem; border-radius: 20px; border: 3px solid #F8B500; min-width: 150px;">
+                    <h3 style="color: #2E4057; margin: 0; font-family: 'Fredoka', cursive;">🏆 Achievements</h3>
+                </div>
+            </div>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
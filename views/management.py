@@ -0,0 +1,503 @@
+"""Management page: syllabus, cohort trends, exports, the live monitor and system panels"""
+import streamlit as st
+import html
+import os
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional
+import profiling
+from ui import get_database, rerun, show_header, show_leaderboard
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_cohort_trend_chart_spec(result_sequence: int, scope: str, scope_key: str, period: str) -> Optional[Dict]:
+    """Build the cohort score trend chart from the rollup table, keyed by the global result sequence"""
+    import plotly.graph_objects as go
+    
+    trend = get_database().get_score_trend(scope, scope_key, period)
+    if not trend:
+        return None
+
+    buckets = [row['bucket'] for row in trend]
+    averages = [row['avg_score'] for row in trend]
+    fig = go.Figure(data=[
+        go.Scatter(x=buckets, y=[a + row['std_dev'] for a, row in zip(averages, trend)],
+                  mode='lines', line=dict(width=0), hoverinfo='skip'),
+        go.Scatter(x=buckets, y=[a - row['std_dev'] for a, row in zip(averages, trend)],
+                  mode='lines', line=dict(width=0), fill='tonexty',
+                  fillcolor='rgba(116, 185, 255, 0.3)', hoverinfo='skip'),
+        go.Scatter(x=buckets, y=averages, mode='lines+markers',
+                  line=dict(color='#6C5CE7', width=3), marker=dict(size=6),
+                  customdata=[row['test_count'] for row in trend],
+                  hovertemplate='%{x}<br>Average: %{y:.1f}%<br>Tests: %{customdata}<extra></extra>')
+    ])
+    fig.update_layout(
+        title=f"Average Score per {period.title()}",
+        xaxis_title=period.title(),
+        yaxis_title="Average Score (%)",
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white'
+    )
+    return fig.to_dict()
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_topic_scores_chart_spec(result_sequence: int, since: Optional[str], _df_results: 'pd.DataFrame') -> Dict:
+    """Build the cohort 'Average Scores by Topic' chart, keyed by the global result sequence and period"""
+    import plotly.express as px
+    
+    topic_scores = _df_results.groupby('topic_title')['score'].mean().reset_index()
+
+    fig = px.bar(
+        topic_scores,
+        x='topic_title',
+        y='score',
+        title='Average Scores by Topic',
+        color='score',
+        color_continuous_scale='Viridis'
+    )
+    fig.update_layout(
+        xaxis_title="Topic",
+        yaxis_title="Average Score (%)",
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white'
+    )
+    return fig.to_dict()
+
+def show_syllabus_management_page():
+    """Display the syllabus management page"""
+    import pandas as pd
+    
+    db = get_database()
+    
+    show_header("Syllabus & User Hub", "Manage syllabus topics, track student analytics, and administer user accounts")
+    
+    # Tabs for different management sections
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📚 Syllabus Editor", "📊 Student Analytics", "👥 User Management",
+                                             "🏆 Leaderboards", "⚡ Performance"])
+    
+    with tab1:
+        st.markdown("""
+        <div class="card">
+            <h3 style="color: white; margin-bottom: 1rem;">🔎 Search Topics & Questions</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        search_query = st.text_input("Search", placeholder="Search question text, answer options, explanations and topic titles",
+                                     label_visibility="collapsed")
+        if search_query.strip():
+            matches = db.search_content(search_query)
+            if matches['topics'] or matches['questions']:
+                st.caption(f"{len(matches['topics'])} topics and {len(matches['questions'])} questions, "
+                           "best matches first")
+                for match in matches['topics']:
+                    st.markdown(f"""
+                    <div style="padding: 0.8rem 1rem; background: linear-gradient(135deg, #E8F5FF 0%, #F0FFFF 100%); border-radius: 15px; margin: 0.4rem 0; border: 2px solid #87CEEB;">
+                        <strong style="color: #2E4057;">📚 Topic</strong>
+                        <span style="color: #2E4057;"> • {html.escape(match['category'])} • {html.escape(match['difficulty'])}</span><br>
+                        <span style="color: #2E4057;">{match['snippet']}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+                for match in matches['questions']:
+                    with st.expander(f"❓ {match['question_text']}"):
+                        st.markdown(f"<p style='color: #2E4057;'>{match['snippet']}</p>", unsafe_allow_html=True)
+                        st.markdown(f"**Topic:** {match['topic_title'] or match['topic_id']}")
+                        for i, option in enumerate(match['options']):
+                            st.markdown(f"{'✅' if i == match['correct_answer'] else '▫️'} {option}")
+                        st.markdown(f"**Explanation:** {match['explanation']}")
+            else:
+                st.info("No topics or questions match your search.")
+        
+        st.markdown("""
+        <div class="card">
+            <h3 style="color: white; margin-bottom: 1rem;">Add New Topic</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        with st.form("add_topic_form"):
+            new_topic_title = st.text_input("Topic Title", placeholder="Enter new topic title")
+            if st.form_submit_button("Add Topic"):
+                if new_topic_title.strip():
+                    db.add_topic(new_topic_title.strip())
+                    st.success(f"Topic '{new_topic_title}' added successfully!")
+                    rerun()
+                else:
+                    st.error("Topic title cannot be empty.")
+        
+        # Show existing topics
+        topics = db.get_topics()
+        if topics:
+            st.markdown("""
+            <div class="card">
+                <h3 style="color: white; margin-bottom: 1rem;">Existing Topics</h3>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            for topic in topics:
+                st.markdown(f"<p style='color: #cccccc;'>• {topic['title']}</p>", unsafe_allow_html=True)
+        else:
+            st.info("No topics created yet.")
+    
+    with tab2:
+        st.markdown("""
+        <div class="card">
+            <h3 style="color: white; margin-bottom: 1rem;">Student Performance Analytics</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Only the monitor re-runs while it is open, fetching results newer than the last one seen
+        if st.toggle("🔴 Live monitor", key="live_monitor_on"):
+            show_live_monitor()
+        else:
+            st.session_state.pop('live_monitor', None)
+        
+        # Recent periods are served from the hot table; older ones also read the archive
+        periods = {'Last 30 days': 30, 'Last 90 days': 90, 'Last 12 months': 365, 'All time': None}
+        period = st.selectbox("Results from", list(periods), index=2, key="analytics_period")
+        since = None
+        if periods[period]:
+            since = (datetime.now() - timedelta(days=periods[period])).strftime('%Y-%m-%d 00:00:00')
+        
+        results = db.get_all_results(since=since)
+        topics = db.get_topics()
+        
+        if results:
+            # Create analytics chart
+            df_results = pd.DataFrame(results)
+            
+            # Average scores by topic
+            result_sequence = db.get_result_sequence()
+            topic_chart_spec = get_topic_scores_chart_spec(result_sequence, since, df_results)
+            st.plotly_chart(topic_chart_spec, use_container_width=True)
+            
+            # Cohort trend over time, read from the daily/weekly rollups
+            trend_col1, trend_col2 = st.columns(2)
+            with trend_col1:
+                trend_period = st.radio("Trend by", ['week', 'day'], format_func=str.title, horizontal=True)
+            with trend_col2:
+                trend_categories = sorted({t['category'] for t in topics})
+                trend_scope = st.selectbox("Trend for", ['All Categories'] + trend_categories)
+            
+            if trend_scope == 'All Categories':
+                trend_spec = get_cohort_trend_chart_spec(result_sequence, 'all', '', trend_period)
+            else:
+                trend_spec = get_cohort_trend_chart_spec(result_sequence, 'category', trend_scope, trend_period)
+            if trend_spec:
+                st.plotly_chart(trend_spec, use_container_width=True)
+            
+            # Filter options
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                students = df_results['student_id'].unique()
+                selected_student = st.selectbox("Filter by Student", ['All Students'] + list(students))
+            
+            with col2:
+                topic_titles = df_results['topic_title'].unique()
+                selected_topic = st.selectbox("Filter by Topic", ['All Topics'] + list(topic_titles))
+            
+            with col3:
+                if st.button("Reset Filters"):
+                    rerun()
+            
+            # Filter results
+            filtered_df = df_results.copy()
+            if selected_student != 'All Students':
+                filtered_df = filtered_df[filtered_df['student_id'] == selected_student]
+            if selected_topic != 'All Topics':
+                filtered_df = filtered_df[filtered_df['topic_title'] == selected_topic]
+            
+            # Display results table
+            if not filtered_df.empty:
+                # Format the dataframe for display
+                display_df = filtered_df[['student_id', 'topic_title', 'score', 'submitted_at']].copy()
+                display_df['submitted_at'] = pd.to_datetime(display_df['submitted_at']).dt.strftime('%Y-%m-%d')
+                display_df.columns = ['Student ID', 'Topic', 'Score (%)', 'Date']
+                
+                st.dataframe(display_df, use_container_width=True)
+            else:
+                st.info("No results match the selected filters.")
+        else:
+            st.info("No test results available yet.")
+        
+        show_results_export(db, topics)
+    
+    with tab3:
+        st.markdown("""
+        <div class="card">
+            <h3 style="color: white; margin-bottom: 1rem;">User Management</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        users = db.get_all_users()
+        current_user = st.session_state.user
+        
+        # Filter out current user
+        other_users = [u for u in users if u['unique_id'] != current_user['unique_id']]
+        
+        if other_users:
+            for user in other_users:
+                col1, col2 = st.columns([3, 1])
+                
+                with col1:
+                    role_class = "role-master" if user['role'] == 'master' else "role-student"
+                    locked = " 🔒 needs a new password" if user['password_locked'] else ""
+                    st.markdown(f"""
+                    <div style="padding: 1rem; background: linear-gradient(135deg, #2a2a2a 0%, #1a1a1a 100%); border-radius: 8px; margin: 0.5rem 0; border: 1px solid #333333;">
+                        <strong style="color: white;">{user['unique_id']}</strong>
+                        <span class="role-badge {role_class}">{user['role']}</span>{locked}
+                    </div>
+                    """, unsafe_allow_html=True)
+                
+                with col2:
+                    if user['role'] != 'master':
+                        if st.button(f"Remove", key=f"remove_{user['unique_id']}"):
+                            if db.remove_user(user['unique_id']):
+                                st.success(f"User {user['unique_id']} removed successfully!")
+                                rerun()
+                            else:
+                                st.error("Cannot remove master users.")
+            show_set_password(db, other_users)
+        else:
+            st.info("No other users found.")
+    
+    with tab4:
+        st.markdown("""
+        <div class="card">
+            <h3 style="color: white; margin-bottom: 1rem;">Leaderboards</h3>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        show_leaderboard(db.get_topics(), "management")
+    
+    with tab5:
+        show_performance_panel()
+        show_run_profiles()
+        show_sync_status()
+
+def show_set_password(db, users: List[Dict]):
+    """Let a master give a student a new password, which unlocks students restored from the backup"""
+    locked = [u['unique_id'] for u in users if u['password_locked']]
+    students = locked + [u['unique_id'] for u in users if u['role'] == 'student' and not u['password_locked']]
+    if not students:
+        return
+    
+    st.markdown("#### 🔑 Set a Student Password")
+    if locked:
+        st.caption(f"Restored from the backup and unable to sign in until given a new password: {len(locked)}")
+    with st.form("set_password_form", clear_on_submit=True):
+        student_id = st.selectbox("Student", students)
+        new_password = st.text_input("New password", type="password")
+        if st.form_submit_button("Set Password"):
+            if not new_password:
+                st.error("Please enter a password.")
+            elif db.set_password(student_id, new_password):
+                st.success(f"Password set for {student_id}.")
+            else:
+                st.error(f"{student_id} is not a student.")
+
+def show_results_export(db, topics: List[Dict]):
+    """Filtered CSV/Excel export, written to a temporary file a batch of rows at a time"""
+    import export
+    
+    with st.expander("📥 Export Results"):
+        col1, col2 = st.columns(2)
+        with col1:
+            student_id = st.selectbox("Student", [None] + db.get_student_ids(), key="export_student",
+                                      format_func=lambda s: "All Students" if s is None else s)
+            date_range = st.date_input("Submitted between", value=(), key="export_dates")
+        with col2:
+            topic_titles = {t['id']: t['title'] for t in topics}
+            topic_id = st.selectbox("Topic", [None] + list(topic_titles), key="export_topic",
+                                    format_func=lambda t: "All Topics" if t is None else topic_titles[t])
+            formats = ['csv', 'xlsx'] if export.excel_available() else ['csv']
+            fmt = st.radio("Format", formats, horizontal=True, key="export_format",
+                           format_func=lambda f: "CSV" if f == 'csv' else "Excel")
+        if not export.excel_available():
+            st.caption("Install openpyxl to export Excel workbooks.")
+        
+        since = until = None
+        if len(date_range) == 2:
+            since = date_range[0].strftime('%Y-%m-%d')
+            until = (date_range[1] + timedelta(days=1)).strftime('%Y-%m-%d')
+        
+        if st.button("Prepare Export", key="export_prepare"):
+            previous = st.session_state.pop('export_file', None)
+            if previous and os.path.exists(previous['path']):
+                os.remove(previous['path'])
+            with st.spinner("Writing results..."):
+                path = export.spool_export(db, fmt, student_id=student_id, topic_id=topic_id,
+                                           since=since, until=until)
+            st.session_state.export_file = {'path': path, 'format': fmt,
+                                            'name': f"wida_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"}
+        
+        export_file = st.session_state.get('export_file')
+        if export_file and os.path.exists(export_file['path']):
+            with open(export_file['path'], 'rb') as data:
+                st.download_button(f"⬇️ Download {export_file['name']}", data, file_name=export_file['name'],
+                                   mime=export.FORMATS[export_file['format']], key="export_download")
+
+# Poll interval of the live class monitor (WIDA_LIVE_MONITOR_SECONDS) and rows it keeps on screen
+LIVE_MONITOR_INTERVAL = float(os.environ.get('WIDA_LIVE_MONITOR_SECONDS', 5))
+
+LIVE_MONITOR_ROWS = 200
+
+@st.fragment(run_every=LIVE_MONITOR_INTERVAL)
+def show_live_monitor():
+    """Results submitted since the monitor was opened, fetched by sequence number and merged in place"""
+    import plotly.graph_objects as go
+    
+    db = get_database()
+    shards = db.shards if hasattr(db, 'shards') else {'': db}
+    monitor = st.session_state.get('live_monitor')
+    if monitor is None:
+        # Each shard numbers its own results, so keep the last seen number per shard
+        monitor = st.session_state.live_monitor = {
+            'after': {school: shard.get_result_sequence() for school, shard in shards.items()},
+            'recent': [],
+            'topics': {},
+            'total': 0
+        }
+    
+    new_results = []
+    for school, shard in shards.items():
+        results = shard.get_results_since(monitor['after'].get(school, 0))
+        if results:
+            monitor['after'][school] = results[-1]['seq']
+            new_results.extend(results)
+    new_results.sort(key=lambda r: r['submitted_at'])
+    
+    for result in new_results:
+        topic = monitor['topics'].setdefault(result['topic_title'], [0, 0])
+        topic[0] += result['score']
+        topic[1] += 1
+    monitor['total'] += len(new_results)
+    monitor['recent'] = (new_results[::-1] + monitor['recent'])[:LIVE_MONITOR_ROWS]
+    
+    col1, col2 = st.columns(2)
+    col1.metric("Results since opened", monitor['total'], delta=len(new_results) or None)
+    col2.caption(f"Checking for new results every {LIVE_MONITOR_INTERVAL:g}s · "
+                 f"last check {datetime.now().strftime('%H:%M:%S')}")
+    if not monitor['total']:
+        st.info("Waiting for new results...")
+        return
+    
+    titles = list(monitor['topics'])
+    averages = [monitor['topics'][t][0] / monitor['topics'][t][1] for t in titles]
+    fig = go.Figure(data=[go.Bar(x=titles, y=averages, customdata=[monitor['topics'][t][1] for t in titles],
+                                 marker_color=['#4ade80' if a >= 70 else '#fbbf24' if a >= 50 else '#ef4444'
+                                               for a in averages],
+                                 hovertemplate='%{x}<br>Average: %{y:.1f}%<br>Tests: %{customdata}<extra></extra>')])
+    fig.update_layout(
+        title="Live Average Score by Topic",
+        yaxis=dict(title="Average Score (%)", range=[0, 100]),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white',
+        showlegend=False
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.dataframe([{'Student ID': r['student_id'], 'Topic': r['topic_title'], 'Score (%)': r['score'],
+                   'Submitted': r['submitted_at']} for r in monitor['recent']], use_container_width=True)
+
+def show_performance_panel():
+    """Display query timings collected by the database layer (master only)"""
+    db = get_database()
+    profiler = db.query_profiler
+    
+    st.markdown("""
+    <div class="card">
+        <h3 style="color: white; margin-bottom: 1rem;">⚡ Database Performance</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    if not profiler:
+        st.info("Query profiling is turned off (WIDA_QUERY_PROFILING=0).")
+        return
+    
+    top_queries = profiler.top_queries(limit=25)
+    if top_queries:
+        st.markdown("#### 🐢 Top Queries by Total Time")
+        st.dataframe([{
+            'Statement': q['statement'][:200],
+            'Calls': q['calls'],
+            'Total (ms)': q['total_ms'],
+            'Avg (ms)': q['avg_ms'],
+            'Max (ms)': q['max_ms'],
+            'Rows': q['rows']
+        } for q in top_queries], use_container_width=True)
+    else:
+        st.info("No queries recorded yet.")
+    
+    slow_queries = profiler.slow_queries()
+    st.markdown(f"#### 🚨 Slow Queries (≥ {profiler.slow_query_ms:g} ms)")
+    if slow_queries:
+        st.dataframe([{
+            'When': q['recorded_at'],
+            'Duration (ms)': q['duration_ms'],
+            'Rows': q['row_count'],
+            'Params': q['param_count'],
+            'Statement': q['statement'][:200]
+        } for q in slow_queries], use_container_width=True)
+    else:
+        st.success("No slow queries recorded.")
+    
+    if st.button("🔄 Reset Query Statistics"):
+        profiler.reset()
+        rerun()
+
+def show_run_profiles():
+    """List captured script-run profiles for download (master only)"""
+    st.markdown("#### 🔬 Script Run Profiles")
+    if not profiling.profiling_enabled():
+        st.info("Run profiling is turned off. Start the app with WIDA_PROFILING=1, then open "
+                "any page with ?profile=<page> to capture one run.")
+        return
+    
+    profiles = profiling.list_profiles(profiling.profile_dir())
+    if not profiles:
+        st.info("No profiles captured yet. Add ?profile=<page> to the URL, e.g. ?profile=master_analytics.")
+        return
+    
+    names = [p['name'] for p in profiles]
+    selected = st.selectbox("Profile", names, key="run_profile_select")
+    path = profiles[names.index(selected)]['path']
+    with open(path, 'rb') as data:
+        st.download_button("⬇️ Download pstats", data.read(), file_name=selected,
+                           mime="application/octet-stream")
+    st.caption(f"Open with `python -m pstats {selected}` or snakeviz.")
+
+def show_sync_status():
+    """Show how many rows are waiting for GitHub and push them on demand (master only)"""
+    st.markdown("#### ☁️ GitHub Sync")
+    db = get_database()
+    shards = list(db.shards.values()) if hasattr(db, 'shards') else [db]
+    backlog = {'users': 0, 'test_results': 0}
+    for shard in shards:
+        for kind, count in shard.get_sync_backlog().items():
+            backlog[kind] += count
+    
+    col1, col2 = st.columns(2)
+    col1.metric("Students waiting", backlog['users'])
+    col2.metric("Results waiting", backlog['test_results'])
+    
+    storage = shards[0].github_storage
+    if not storage or not storage.token:
+        st.info("GitHub sync is not configured, so nothing will be pushed.")
+        return
+    if sum(backlog.values()) and st.button("☁️ Sync Now"):
+        import github_sync
+        with st.spinner("Pushing unsynced rows to GitHub..."):
+            synced = failed = 0
+            for shard in shards:
+                for result in github_sync.reconcile(shard).values():
+                    synced += result['synced']
+                    failed += result['failed']
+        if failed:
+            st.warning(f"Synced {synced} rows; {failed} failed and will be retried.")
+        else:
+            st.success(f"Synced {synced} rows.")
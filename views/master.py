@@ -0,0 +1,285 @@
+"""Master dashboard and student analytics pages"""
+import streamlit as st
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+from ui import get_database, navigate, rerun, show_header
+
+@st.cache_resource
+def get_mastery_matrix():
+    """Class mastery matrix loaded from the database once per process and kept current by each submission"""
+    from mastery import MasteryMatrix
+    return MasteryMatrix.follow(get_database())
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def get_mastery_heatmap_spec(matrix_version: int, by: str, student_ids: Tuple[str, ...],
+                             student_labels: Tuple[str, ...], column_labels: Tuple[Tuple[str, str], ...]) -> Dict:
+    """Build the class mastery heatmap, keyed by the matrix version so it is only rebuilt after new results"""
+    import plotly.graph_objects as go
+    
+    columns, scores = get_mastery_matrix().heatmap(student_ids, by)
+    names = dict(column_labels)
+    fig = go.Figure(data=go.Heatmap(
+        z=scores, x=[names.get(c, c) for c in columns], y=list(student_labels),
+        zmin=0, zmax=100, colorscale='RdYlGn', hoverongaps=False,
+        colorbar=dict(title="Score (%)"),
+        hovertemplate='%{y}<br>%{x}<br>Average: %{z:.0f}%<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Average Score per {'Category' if by == 'category' else 'Topic'}",
+        height=min(max(300, 18 * len(student_ids) + 150), 1200),
+        yaxis=dict(autorange='reversed', showticklabels=len(student_ids) <= 60),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color='white'
+    )
+    return fig.to_dict()
+
+def show_master_dashboard():
+    """Display the master dashboard"""
+    show_header("Dashboard", "Syllabus Management")
+    
+    st.markdown("""
+    <div class="card" style="text-align: center; padding: 3rem;">
+        <h3 style="color: white; margin-bottom: 1rem;">🎯 Syllabus & User Management</h3>
+        <p style="color: #cccccc; margin-bottom: 2rem;">Manage syllabus content and track all student progress.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.button("🔧 Go to Management Dashboard", use_container_width=True,
+              on_click=navigate, args=('syllabus_management',))
+
+def show_class_heatmap(db, students: List[Dict]):
+    """Whole-class students x topics (or categories) heatmap from the in-memory mastery matrix"""
+    with st.expander("🗺️ Class Mastery Heatmap", expanded=True):
+        by = st.radio("Columns", ['topic', 'category'], horizontal=True, key="heatmap_by",
+                      format_func=lambda value: "Topics" if value == 'topic' else "Categories")
+        matrix = get_mastery_matrix()
+        column_labels = tuple((t['id'], t['title']) for t in db.get_topics()) if by == 'topic' else ()
+        spec = get_mastery_heatmap_spec(
+            matrix.version, by,
+            tuple(s['unique_id'] for s in students),
+            tuple(f"{s['first_name']} {s['last_name']} ({s['unique_id']})" for s in students),
+            column_labels
+        )
+        st.plotly_chart(spec, use_container_width=True)
+
+def show_report_cards(db):
+    """Generate every student's term report card into one zip archive for download"""
+    with st.expander("🗂️ Term Report Cards"):
+        col1, col2 = st.columns(2)
+        with col1:
+            term = st.text_input("Term name", value=datetime.now().strftime('%B %Y'), key="report_term")
+        with col2:
+            date_range = st.date_input("Results between", value=(), key="report_dates")
+        
+        since = until = None
+        if len(date_range) == 2:
+            since = date_range[0].strftime('%Y-%m-%d')
+            until = (date_range[1] + timedelta(days=1)).strftime('%Y-%m-%d')
+        
+        if st.button("Generate Report Cards", key="report_generate"):
+            import report_cards
+            previous = st.session_state.pop('report_cards_file', None)
+            if previous and os.path.exists(previous['path']):
+                os.remove(previous['path'])
+            with st.spinner("Rendering report cards..."):
+                path = report_cards.spool_report_cards(db, term=term, since=since, until=until)
+            st.session_state.report_cards_file = {
+                'path': path,
+                'name': f"report_cards_{term.replace(' ', '_')}.zip"
+            }
+        
+        report_file = st.session_state.get('report_cards_file')
+        if report_file and os.path.exists(report_file['path']):
+            with open(report_file['path'], 'rb') as data:
+                st.download_button(f"⬇️ Download {report_file['name']}", data, file_name=report_file['name'],
+                                   mime='application/zip', key="report_download")
+            st.caption("One HTML page per student; open a page and print it to save it as a PDF.")
+
+def show_master_analytics():
+    """Display master analytics page where KRURA can edit student profiles"""
+    db = get_database()
+    
+    show_header("Student Analytics Management", "Edit and monitor all student profiles")
+    
+    # Get all students
+    all_users = db.get_all_users()
+    students = [user for user in all_users if user['role'] == 'student']
+    
+    if not students:
+        st.markdown("""
+        <div class="card" style="text-align: center; padding: 3rem;">
+            <h3 style="color: white; margin-bottom: 1rem;">👥 No Students Registered</h3>
+            <p style="color: #cccccc;">Students will appear here once they register.</p>
+        </div>
+        """, unsafe_allow_html=True)
+        return
+    
+    show_class_heatmap(db, students)
+    show_report_cards(db)
+    
+    # Student selection
+    st.markdown("""
+    <div class="card">
+        <h3 style="color: white; margin-bottom: 1rem;">👨‍🎓 Select Student to Manage</h3>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    selected_student = st.selectbox(
+        "Choose a student:",
+        options=[f"{s['unique_id']} - {s['first_name']} {s['last_name']}" for s in students],
+        format_func=lambda x: x
+    )
+    
+    if selected_student:
+        student_id = selected_student.split(' - ')[0]
+        student_profile = db.get_user_profile(student_id)
+        
+        if student_profile:
+            # Student Profile Overview
+            col1, col2 = st.columns([1, 1])
+            
+            with col1:
+                st.markdown(f"""
+                <div class="card">
+                    <h4 style="color: white; margin-bottom: 1rem;">📋 Profile Information</h4>
+                    <p style="color: #cccccc;"><strong>Name:</strong> {student_profile['first_name']} {student_profile['last_name']}</p>
+                    <p style="color: #cccccc;"><strong>ID:</strong> {student_profile['unique_id']}</p>
+                    <p style="color: #cccccc;"><strong>DOB:</strong> {student_profile['date_of_birth']}</p>
+                    <p style="color: #cccccc;"><strong>Joined:</strong> {student_profile['created_at'][:10]}</p>
+                    <p style="color: #cccccc;"><strong>Backup Status:</strong> {'☁️ Synced' if student_profile['github_synced'] else '💾 Local'}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            with col2:
+                # Current analytics
+                analytics = db.calculate_student_analytics(student_id)
+                st.markdown(f"""
+                <div class="card">
+                    <h4 style="color: white; margin-bottom: 1rem;">📊 Current Statistics</h4>
+                    <p style="color: #cccccc;"><strong>Total Tests:</strong> {analytics['total_tests']}</p>
+                    <p style="color: #cccccc;"><strong>Average Score:</strong> {analytics['average_score']}%</p>
+                    <p style="color: #cccccc;"><strong>Strong Areas:</strong> {len(analytics['strengths'])}</p>
+                    <p style="color: #cccccc;"><strong>Focus Areas:</strong> {len(analytics['areas_for_improvement'])}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            # Editable Analytics Section
+            st.markdown("""
+            <div class="card">
+                <h3 style="color: white; margin-bottom: 1rem;">✏️ Edit Student Analytics Profile</h3>
+                <p style="color: #cccccc; margin-bottom: 1rem;">Customize goals, achievements, and notes for this student.</p>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            with st.form(f"edit_analytics_{student_id}"):
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("#### 🎯 Learning Goals")
+                    current_goals = student_profile.get('analytics', {}).get('goals', [])
+                    goals_text = '\n'.join(current_goals) if current_goals else ""
+                    new_goals = st.text_area(
+                        "Enter learning goals (one per line):",
+                        value=goals_text,
+                        height=100,
+                        help="Set specific learning objectives for this student"
+                    )
+                    
+                    st.markdown("#### 🏆 Achievements")
+                    current_achievements = student_profile.get('analytics', {}).get('achievements', [])
+                    achievements_text = '\n'.join(current_achievements) if current_achievements else ""
+                    new_achievements = st.text_area(
+                        "Enter achievements (one per line):",
+                        value=achievements_text,
+                        height=100,
+                        help="Record notable accomplishments and milestones"
+                    )
+                
+                with col2:
+                    st.markdown("#### 📝 Study Notes")
+                    current_notes = student_profile.get('analytics', {}).get('study_notes', '')
+                    study_notes = st.text_area(
+                        "Study notes and observations:",
+                        value=current_notes,
+                        height=100,
+                        help="Add observations about learning style, preferences, etc."
+                    )
+                    
+                    st.markdown("#### ⏰ Study Schedule")
+                    current_schedule = student_profile.get('analytics', {}).get('study_schedule', '')
+                    study_schedule = st.text_area(
+                        "Recommended study schedule:",
+                        value=current_schedule,
+                        height=100,
+                        help="Suggest optimal study times and duration"
+                    )
+                
+                # Motivation level slider
+                current_motivation = student_profile.get('analytics', {}).get('motivation_level', 5)
+                motivation_level = st.slider(
+                    "Current Motivation Level:",
+                    min_value=1, max_value=10, 
+                    value=current_motivation,
+                    help="Rate the student's current motivation level (1-10)"
+                )
+                
+                # Additional settings
+                col1, col2 = st.columns(2)
+                with col1:
+                    send_reminders = st.checkbox(
+                        "Send Study Reminders",
+                        value=student_profile.get('analytics', {}).get('reminders_enabled', False),
+                        help="Enable automated study reminders"
+                    )
+                
+                with col2:
+                    priority_student = st.checkbox(
+                        "Priority Student",
+                        value=student_profile.get('analytics', {}).get('priority_student', False),
+                        help="Mark as priority for additional attention"
+                    )
+                
+                if st.form_submit_button("💾 Save Analytics Changes", use_container_width=True):
+                    # Prepare updated analytics
+                    updated_analytics = student_profile.get('analytics', {})
+                    updated_analytics.update({
+                        'goals': [goal.strip() for goal in new_goals.split('\n') if goal.strip()],
+                        'achievements': [ach.strip() for ach in new_achievements.split('\n') if ach.strip()],
+                        'study_notes': study_notes,
+                        'study_schedule': study_schedule,
+                        'motivation_level': motivation_level,
+                        'reminders_enabled': send_reminders,
+                        'priority_student': priority_student,
+                        'last_updated_by': 'KRURA',
+                        'last_updated_at': datetime.now().isoformat()
+                    })
+                    
+                    # Update the analytics
+                    if db.update_user_analytics(student_id, updated_analytics):
+                        st.success("✅ Analytics profile updated successfully!")
+                        rerun()
+                    else:
+                        st.error("❌ Failed to update analytics profile.")
+            
+            # Display current test results
+            student_results = db.get_student_results(student_id)
+            if student_results:
+                st.markdown("""
+                <div class="card">
+                    <h4 style="color: white; margin-bottom: 1rem;">📈 Recent Test Results</h4>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                for result in student_results[:5]:  # Show last 5 results
+                    score_color = "#4ade80" if result['score'] >= 70 else "#fbbf24" if result['score'] >= 50 else "#ef4444"
+                    sync_icon = "☁️" if result.get('github_synced', False) else "💾"
+                    
+                    col1, col2, col3 = st.columns([3, 1, 1])
+                    with col1:
+                        st.markdown(f"**{result['topic_title']}** {sync_icon}")
+                    with col2:
+                        st.markdown(f"<span style='color: {score_color}; font-weight: 600;'>{result['score']}%</span>", unsafe_allow_html=True)
+                    with col3:
+                        st.markdown(f"<span style='color: #cccccc;'>{result['submitted_at'][:10]}</span>", unsafe_allow_html=True)
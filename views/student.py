@@ -0,0 +1,362 @@
+"""Student dashboard and analytics pages"""
+import streamlit as st
+from typing import Dict
+from ui import get_database, navigate, show_header, show_leaderboard
+
+# Figure specs are cached as plain dicts and only rebuilt when new results arrive.
+# Parameters starting with an underscore are not part of the cache key.
+# Plotly is imported where a figure is built, so the dashboard, which shares
+# this module, does not load it.
+@st.cache_data(max_entries=1000, show_spinner=False)
+def get_student_chart_specs(student_id: str, latest_result_id: str, _analytics: Dict) -> Dict:
+    """Build the category and trend charts for a student, keyed by their latest result"""
+    import plotly.graph_objects as go
+    
+    specs = {'category': None, 'trend': None, 'weekly': None}
+
+    if _analytics.get('category_averages'):
+        categories = list(_analytics['category_averages'].keys())
+        scores = list(_analytics['category_averages'].values())
+
+        fig = go.Figure(data=[
+            go.Bar(x=categories, y=scores,
+                  marker_color=['#4ade80' if s >= 70 else '#fbbf24' if s >= 50 else '#ef4444' for s in scores])
+        ])
+        fig.update_layout(
+            title="Average Scores by Category",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            showlegend=False
+        )
+        specs['category'] = fig.to_dict()
+
+    if _analytics.get('performance_trend'):
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(
+            y=_analytics['performance_trend'],
+            x=list(range(1, len(_analytics['performance_trend']) + 1)),
+            mode='lines+markers',
+            line=dict(color='#4ade80', width=3),
+            marker=dict(size=8)
+        ))
+        fig.update_layout(
+            title="Recent Performance Trend",
+            xaxis_title="Test Number",
+            yaxis_title="Score (%)",
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            showlegend=False
+        )
+        specs['trend'] = fig.to_dict()
+
+    if _analytics.get('weekly_trend'):
+        weeks = _analytics['weekly_trend']
+        fig = go.Figure(data=[
+            go.Bar(x=[w['bucket'] for w in weeks], y=[w['test_count'] for w in weeks],
+                  name='Tests', marker_color='#87CEEB', yaxis='y2', opacity=0.5),
+            go.Scatter(x=[w['bucket'] for w in weeks], y=[w['avg_score'] for w in weeks],
+                      name='Average Score', mode='lines+markers',
+                      line=dict(color='#FF6B9D', width=3), marker=dict(size=8))
+        ])
+        fig.update_layout(
+            title="Weekly Progress",
+            xaxis_title="Week",
+            yaxis=dict(title="Average Score (%)", range=[0, 100]),
+            yaxis2=dict(title="Tests", overlaying='y', side='right', showgrid=False),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font_color='white',
+            showlegend=False
+        )
+        specs['weekly'] = fig.to_dict()
+
+    return specs
+
+def show_student_dashboard():
+    """Display the student dashboard with enhanced WIDA topics"""
+    db = get_database()
+    user = st.session_state.user
+    
+    show_header("🎮 Your Learning Dashboard", f"Hey there, {user['unique_id']}! Ready for some fun? 🌟")
+    
+    # Get topics and student results
+    topics = db.get_topics()
+    student_results = db.get_student_results(user['unique_id'])
+    
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        # Ready-made by the nightly recommendations job (recommendations.py)
+        recommendations = db.get_recommendations(user['unique_id'])
+        if recommendations:
+            st.markdown("""
+            <div class="card">
+                <h3 style="color: #2E4057; margin-bottom: 1rem; font-family: 'Fredoka', cursive;">✨ Picked Just for You!</h3>
+            </div>
+            """, unsafe_allow_html=True)
+            reason_labels = {
+                'next_step': "🚀 Your next step",
+                'review': "🔁 Practice makes perfect",
+                'start_here': "🌱 A great place to start"
+            }
+            for topic, col in zip(recommendations, st.columns(len(recommendations))):
+                with col:
+                    st.button(f"{topic['title']}", key=f"recommended_{topic['id']}", use_container_width=True,
+                              on_click=navigate, args=('test',), kwargs={'current_test_topic': topic})
+                    st.caption(f"{reason_labels.get(topic['reason'], '')} • {topic['category']} • {topic['difficulty']}")
+        
+        st.markdown("""
+        <div class="card">
+            <h3 style="color: #2E4057; margin-bottom: 1rem; font-family: 'Fredoka', cursive;">🎯 Amazing WIDA Learning Adventures!</h3>
+            <p style="color: #2E4057; font-family: 'Comic Neue', cursive;">Choose a topic and start your learning journey! Each one is super fun! 🚀</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        if topics:
+            # Group topics by category
+            categories = {}
+            for topic in topics:
+                category = topic.get('category', 'General')
+                if category not in categories:
+                    categories[category] = []
+                categories[category].append(topic)
+            
+            # Create tabs for each category
+            category_tabs = st.tabs(list(categories.keys()))
+            
+            for i, (category, category_topics) in enumerate(categories.items()):
+                with category_tabs[i]:
+                    st.markdown(f"""
+                    <div style="padding: 1.5rem; background: linear-gradient(135deg, #E8F5FF 0%, #F0FFFF 100%); border-radius: 20px; margin: 1rem 0; border: 3px solid #87CEEB;">
+                        <h4 style="color: #2E4057; margin-bottom: 1rem; font-family: 'Fredoka', cursive;">🎯 {category} Adventures!</h4>
+                        <p style="color: #2E4057; font-family: 'Comic Neue', cursive; margin: 0;">Click on any topic to start your learning adventure! 🚀</p>
+                    </div>
+                    """, unsafe_allow_html=True)
+                    
+                    for topic in category_topics:
+                        difficulty_color = {
+                            'Beginner': '#90EE90',
+                            'Intermediate': '#FFD700', 
+                            'Advanced': '#FF6B9D'
+                        }.get(topic.get('difficulty', 'Intermediate'), '#FFD700')
+                        
+                        difficulty_emoji = {
+                            'Beginner': '🌱',
+                            'Intermediate': '⭐', 
+                            'Advanced': '🏆'
+                        }.get(topic.get('difficulty', 'Intermediate'), '⭐')
+                        
+                        col_topic, col_difficulty = st.columns([3, 1])
+                        
+                        with col_topic:
+                            st.button(f"� {topic['title']}", key=f"topic_{topic['id']}", use_container_width=True,
+                                      on_click=navigate, args=('test',), kwargs={'current_test_topic': topic})
+                        
+                        with col_difficulty:
+                            st.markdown(f"""
+                            <div style="text-align: center; padding: 0.5rem; background: {difficulty_color}; color: #2E4057; border-radius: 15px; font-size: 0.9rem; font-weight: 700; font-family: 'Fredoka', cursive; border: 2px solid #2E4057;">
+                                {difficulty_emoji} {topic.get('difficulty', 'Intermediate')}
+                            </div>
+                            """, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div class="card" style="text-align: center;">
+                <h3 style="color: #2E4057; margin-bottom: 1rem; font-family: 'Fredoka', cursive;">🔍 No Adventures Yet!</h3>
+                <p style="color: #2E4057; font-family: 'Comic Neue', cursive;">New learning adventures will appear here soon! Stay tuned! 🌟</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div class="progress-card">
+            <div class="progress-number">{len(student_results)}</div>
+            <p style="color: #2E4057; margin: 0; font-family: 'Fredoka', cursive;">🎯 Adventures Completed!</p>
+            <p style="color: #2E4057; font-size: 0.9rem; margin: 0.5rem 0 0 0; font-family: 'Comic Neue', cursive;">You're doing amazing! Keep going! 🌟</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Show GitHub sync status
+        if student_results:
+            synced_count = sum(1 for r in student_results if r.get('github_synced', False))
+            st.markdown(f"""
+            <div style="text-align: center; padding: 1rem; background: linear-gradient(135deg, #E8F5FF 0%, #F0FFFF 100%); border-radius: 20px; margin: 1rem 0; border: 3px solid #87CEEB;">
+                <div style="color: #2E4057; font-size: 1.2rem; font-weight: 700; font-family: 'Fredoka', cursive;">{synced_count}/{len(student_results)}</div>
+                <p style="color: #2E4057; margin: 0; font-size: 0.9rem; font-family: 'Comic Neue', cursive;">☁️ Results Saved in the Cloud!</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        if student_results:
+            st.markdown("""
+            <div class="card">
+                <h4 style="color: #2E4057; margin-bottom: 1rem; font-family: 'Fredoka', cursive;">🏆 Your Recent Adventures!</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            for result in student_results[:3]:  # Show last 3 results
+                score_color = "#4ade80" if result['score'] >= 70 else "#fbbf24" if result['score'] >= 50 else "#ff6b9d"
+                score_emoji = "🌟" if result['score'] >= 70 else "👍" if result['score'] >= 50 else "💪"
+                sync_icon = "☁️" if result.get('github_synced', False) else "💾"
+                st.markdown(f"""
+                <div style="background: linear-gradient(135deg, #E8F5FF 0%, #F0FFFF 100%); padding: 1rem; margin: 0.5rem 0; border-radius: 15px; border-left: 4px solid {score_color}; border: 2px solid #87CEEB;">
+                    <strong style="color: #2E4057; font-family: 'Fredoka', cursive;">{result['topic_title']}</strong> {sync_icon}<br>
+                    <span style="color: {score_color}; font-weight: 700; font-family: 'Fredoka', cursive;">{score_emoji} {result['score']}%</span>
+                    <span style="color: #2E4057; font-size: 0.9rem; font-family: 'Comic Neue', cursive;"> • {result['submitted_at'][:10]}</span>
+                </div>
+                """, unsafe_allow_html=True)
+        
+        st.markdown("""
+        <div class="card">
+            <h4 style="color: #2E4057; margin-bottom: 1rem; font-family: 'Fredoka', cursive;">🏆 Leaderboards</h4>
+        </div>
+        """, unsafe_allow_html=True)
+        show_leaderboard(topics, "student", highlight_id=user['unique_id'])
+
+def show_student_analytics():
+    """Display comprehensive student analytics (read-only for students)"""
+    db = get_database()
+    user = st.session_state.user
+    
+    show_header("My Analytics", f"Performance Overview for {user['unique_id']}")
+    
+    # Get user profile and analytics
+    profile = db.get_user_profile(user['unique_id'])
+    analytics = db.calculate_student_analytics(user['unique_id'])
+    
+    if profile:
+        # Profile Header
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            st.markdown(f"""
+            <div class="card" style="text-align: center; padding: 2rem;">
+                <h3 style="color: white; margin-bottom: 1rem;">👤 Student Profile</h3>
+                <h4 style="color: #cccccc;">{profile['first_name']} {profile['last_name']}</h4>
+                <p style="color: #cccccc; margin: 0.5rem 0;">ID: {profile['unique_id']}</p>
+                <p style="color: #cccccc; margin: 0;">Born: {profile['date_of_birth']}</p>
+                <p style="color: #cccccc; margin: 0.5rem 0 0 0;">Member since: {profile['created_at'][:10]}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # Analytics Overview
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.markdown(f"""
+        <div class="progress-card">
+            <div class="progress-number">{analytics['total_tests']}</div>
+            <p style="color: #cccccc; margin: 0;">Total Tests</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        avg_color = "#4ade80" if analytics['average_score'] >= 70 else "#fbbf24" if analytics['average_score'] >= 50 else "#ef4444"
+        st.markdown(f"""
+        <div class="progress-card">
+            <div class="progress-number" style="color: {avg_color};">{analytics['average_score']}%</div>
+            <p style="color: #cccccc; margin: 0;">Average Score</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div class="progress-card">
+            <div class="progress-number">{len(analytics['strengths'])}</div>
+            <p style="color: #cccccc; margin: 0;">Strong Areas</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col4:
+        improvement_areas = len(analytics['areas_for_improvement'])
+        st.markdown(f"""
+        <div class="progress-card">
+            <div class="progress-number">{improvement_areas}</div>
+            <p style="color: #cccccc; margin: 0;">Focus Areas</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    if analytics['total_tests'] > 0:
+        # Performance Charts
+        latest_result_id = db.get_latest_result_id(user['unique_id'])
+        chart_specs = get_student_chart_specs(user['unique_id'], latest_result_id, analytics)
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("""
+            <div class="card">
+                <h4 style="color: white; margin-bottom: 1rem;">📊 Category Performance</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            if chart_specs['category']:
+                st.plotly_chart(chart_specs['category'], use_container_width=True)
+        
+        with col2:
+            st.markdown("""
+            <div class="card">
+                <h4 style="color: white; margin-bottom: 1rem;">📈 Performance Trend</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            if chart_specs['trend']:
+                st.plotly_chart(chart_specs['trend'], use_container_width=True)
+        
+        if chart_specs['weekly']:
+            st.markdown("""
+            <div class="card">
+                <h4 style="color: white; margin-bottom: 1rem;">📅 Weekly Progress</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            st.plotly_chart(chart_specs['weekly'], use_container_width=True)
+        
+        # Strengths and Areas for Improvement
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.markdown("""
+            <div class="card">
+                <h4 style="color: white; margin-bottom: 1rem;">💪 Your Strengths</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            if analytics['strengths']:
+                for strength in analytics['strengths']:
+                    st.markdown(f"""
+                    <div style="background: linear-gradient(135deg, #065f46 0%, #047857 100%); padding: 0.8rem; margin: 0.5rem 0; border-radius: 8px; border-left: 4px solid #4ade80;">
+                        <span style="color: white;">✅ {strength}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+            else:
+                st.info("Complete more tests to identify your strengths!")
+        
+        with col2:
+            st.markdown("""
+            <div class="card">
+                <h4 style="color: white; margin-bottom: 1rem;">🎯 Focus Areas</h4>
+            </div>
+            """, unsafe_allow_html=True)
+            
+            if analytics['areas_for_improvement']:
+                for area in analytics['areas_for_improvement']:
+                    st.markdown(f"""
+                    <div style="background: linear-gradient(135deg, #7c2d12 0%, #9a3412 100%); padding: 0.8rem; margin: 0.5rem 0; border-radius: 8px; border-left: 4px solid #fbbf24;">
+                        <span style="color: white;">📚 {area}</span>
+                    </div>
+                    """, unsafe_allow_html=True)
+            else:
+                st.success("Great job! No specific areas need improvement right now.")
+    
+    else:
+        st.markdown("""
+        <div class="card" style="text-align: center; padding: 3rem;">
+            <h3 style="color: white; margin-bottom: 1rem;">📊 No Analytics Yet</h3>
+            <p style="color: #cccccc; margin-bottom: 2rem;">Complete some tests to see your performance analytics!</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Read-only notice
+    st.markdown("""
+    <div style="background: linear-gradient(135deg, #1e3a8a 0%, #1e40af 100%); padding: 1rem; margin: 2rem 0; border-radius: 8px; border-left: 4px solid #3b82f6;">
+        <p style="color: white; margin: 0;">ℹ️ This analytics page is read-only. Only Master (KRURA) can edit student analytics profiles.</p>
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,110 @@
+"""Single-writer queue with group commit for SQLite.
+
+All writes go through one thread and one connection. The writer drains
+whatever requests are waiting, runs them in one transaction (each in its own
+savepoint, so one failing request does not undo the others) and commits once.
+Callers get their result or exception back through a Future after the commit.
+"""
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+WriteFunction = Callable[[sqlite3.Cursor], T]
+
+
+class WriteQueue:
+    """Runs write functions on a dedicated connection, committing them in groups"""
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_batch: int = 128,
+                 max_wait: float = 0.002, prepare: Optional[Callable[[sqlite3.Connection], object]] = None):
+        self._connect = connect
+        # Called with the writer's connection before each batch, outside any transaction
+        self._prepare = prepare
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._closed = False
+        self.batches_committed = 0
+        self.writes_committed = 0
+        self._thread = threading.Thread(target=self._run, daemon=True, name='wida-writer')
+        self._thread.start()
+
+    def submit(self, fn: WriteFunction) -> Future:
+        """Queue fn(cursor) to run inside the next group transaction"""
+        if self._closed:
+            raise RuntimeError("Write queue is closed")
+        future = Future()
+        self._queue.put((fn, future))
+        return future
+
+    def run(self, fn: WriteFunction, timeout: Optional[float] = None) -> T:
+        """Queue fn(cursor) and wait until it has been committed"""
+        return self.submit(fn).result(timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Finish the queued writes and stop the writer thread"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _next_batch(self) -> list:
+        batch = [self._queue.get()]
+        while batch[-1] is not None and len(batch) < self.max_batch:
+            try:
+                # A short wait lets requests that arrive together share one commit
+                batch.append(self._queue.get(timeout=self.max_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = self._connect()
+        conn.isolation_level = None  # transactions are managed explicitly below
+        conn.execute('PRAGMA synchronous = NORMAL')
+        cursor = conn.cursor()
+
+        while True:
+            batch = self._next_batch()
+            stopping = batch[-1] is None
+            items = [item for item in batch if item is not None and item[1].set_running_or_notify_cancel()]
+            if items:
+                if self._prepare:
+                    self._prepare(conn)
+                self._commit_batch(cursor, items)
+            if stopping:
+                break
+        conn.close()
+
+    def _commit_batch(self, cursor: sqlite3.Cursor, items: list):
+        outcomes = []
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            for fn, future in items:
+                cursor.execute('SAVEPOINT write_item')
+                try:
+                    outcomes.append((future, fn(cursor), None))
+                    cursor.execute('RELEASE write_item')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO write_item')
+                    cursor.execute('RELEASE write_item')
+                    outcomes.append((future, None, e))
+            cursor.execute('COMMIT')
+        except Exception as e:
+            if cursor.connection.in_transaction:
+                cursor.execute('ROLLBACK')
+            for _, future in items:
+                future.set_exception(e)
+            return
+
+        self.batches_committed += 1
+        self.writes_committed += len(items)
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)